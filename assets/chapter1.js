@@ -0,0 +1,90 @@
+// chapter 1, outs chart in the browser.
+// rule of 4 and 2 and the exact odds are closed form, the monte carlo curve is
+// read from the "ch1-curves" store, so moving the outs slider never calls the server.
+// keep update_chart in step with update_chart in chapter1.py
+// (check: python -m utils.clientside_check). number formatting: pyformat.js
+
+window.dash_clientside = Object.assign({}, window.dash_clientside, {
+    chapter1: {
+        // same numbers as utils/hypergeom.py: binomials are exact integers and the
+        // "at least one" tail is summed from the top, like the table there
+        _comb: function (n, k) {
+            if (k < 0 || k > n || n < 0) {
+                return 0;
+            }
+            var c = 1;
+            for (var i = 1; i <= k; i++) {
+                c = c * (n - k + i) / i;
+            }
+            return c;
+        },
+
+        _curve: function (method, cardsLeft, data) {
+            var key = String(cardsLeft), unseen = data.unseen[key], out = [];
+            for (var o = 0; o <= data.max_outs; o++) {
+                if (method === "monte") {
+                    out.push(data.monte[key][o]);
+                } else if (method === "rule") {
+                    out.push(Math.min(Math.max(o * (cardsLeft === 2 ? 4 : 2) / 100, 0), 1));
+                } else {
+                    var outs = Math.min(o, unseen), p = 0, total = this._comb(unseen, cardsLeft);
+                    for (var h = cardsLeft; h >= 1; h--) {
+                        p += this._comb(outs, h) * this._comb(unseen - outs, cardsLeft - h) / total;
+                    }
+                    out.push(p);
+                }
+            }
+            return out;
+        },
+
+        update_chart: function (outs, cardsLeft, method, data) {
+            if (!data) {
+                return window.dash_clientside.no_update;
+            }
+            var self = window.dash_clientside.chapter1;
+            var curves = {};
+            data.methods.forEach(function (m) { curves[m] = self._curve(m, cardsLeft, data); });
+            var prob = curves[method][outs] * 100;
+
+            var methodText = data.text[method];
+            if (method === "monte") {
+                var half = data.monte_half_width[String(cardsLeft)][outs] * 100;
+                methodText = "Monte Carlo simulation (approximate, 95% CI ±" + pyFixed(half, 1) + "%).";
+            }
+
+            var x = [];
+            for (var i = 0; i <= data.max_outs; i++) {
+                x.push(i);
+            }
+            var traces = data.methods.map(function (m) {
+                return {
+                    type: "scatter", x: x, y: curves[m].map(function (p) { return p * 100; }),
+                    mode: "lines", name: data.label[m],
+                    line: {color: data.color[m], width: m === method ? 4 : 1.5,
+                           dash: m === method ? "solid" : "dot"}
+                };
+            });
+            traces.push({
+                type: "scatter", x: [outs], y: [prob], mode: "markers+text", name: "Your spot",
+                marker: {size: 13, color: data.color[method]},
+                text: [pyFixed(prob, 1) + "%"], textposition: "top left", showlegend: false
+            });
+
+            var fig = {
+                data: traces,
+                layout: {
+                    title: {text: "Estimated Win Probability (%) by Number of Outs"},
+                    xaxis: {title: {text: "Outs"}, dtick: 2},
+                    yaxis: {title: {text: "Probability (%)"}, range: [0, 100]},
+                    template: data.template, legend: {orientation: "h", y: -0.2},
+                    margin: {l: 40, r: 20, t: 50, b: 40}
+                }
+            };
+
+            var tip = " With " + outs + " outs and " + cardsLeft + " card(s) left, this is your chance to hit.";
+            var explain = "You have **" + outs + " outs**, and **" + cardsLeft + " card(s)** to come. " +
+                          "Estimated win: **" + pyFixed(prob, 1) + "%**. " + methodText;
+            return [fig, explain, tip];
+        }
+    }
+});
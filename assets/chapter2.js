@@ -0,0 +1,89 @@
+// chapter 2, in-browser renderer.
+// the whole preflop table sits in a dcc.Store ("ch2-data"), so moving the
+// player slider or switching the content mode recolors the grid right here.
+// keep grid_figure in step with grid_values / grid_heatmap_figure in chapter2.py.
+window.dash_clientside = Object.assign({}, window.dash_clientside, {
+    chapter2: {
+        grid_figure: function (pc, mode, eq, renderer, data) {
+            if (renderer !== "client" || !data) {
+                return window.dash_clientside.no_update;
+            }
+            var key = String(pc);
+            var wins = data.win[key], evs = data.ev[key], recs = data.rec[key];
+            var n = data.grid.length;
+
+            var values, lines, scale = data.viridis, zmin = 0, zmax = 1;
+            if (mode === "range") {
+                values = (eq || []).map(function (e) { return e === null ? NaN : e; });
+                lines = values.map(function (e) { return [isNaN(e) ? "Eq: -" : "Eq: " + e.toFixed(2)]; });
+            } else if (mode === "ev") {
+                values = evs;
+                zmin = Math.min.apply(null, evs);
+                zmax = Math.max.apply(null, evs);
+                lines = evs.map(function (e) { return ["EV: " + e.toFixed(2)]; });
+            } else if (mode === "rec") {
+                values = recs.map(function (r) {
+                    var i = data.actions.indexOf(String(r).trim().toUpperCase());
+                    return (i < 0 ? data.actions.length - 1 : i) + 0.5;
+                });
+                scale = data.action_scale;
+                zmax = data.actions.length;
+                lines = recs.map(function (r) { return [String(r)]; });
+            } else {
+                values = wins;
+                lines = wins.map(function (w, k) {
+                    var out = ["Win: " + w.toFixed(2)];
+                    if (mode === "all") {
+                        out.push("EV: " + evs[k].toFixed(2), String(recs[k]));
+                    }
+                    return out;
+                });
+            }
+
+            var z = [], text = [], idx = [];
+            for (var r = 0; r < n; r++) {
+                z.push([]); text.push([]); idx.push([]);
+                for (var c = 0; c < n; c++) {
+                    var k = r * n + c;
+                    z[r].push(values[k] === undefined ? NaN : values[k]);
+                    text[r].push("<b>" + data.labels[k] + "</b><br>" + (lines[k] || []).join("<br>"));
+                    idx[r].push(k);
+                }
+            }
+
+            return {
+                data: [{
+                    type: "heatmap", z: z, x: data.grid, y: data.grid, text: text,
+                    texttemplate: "%{text}", textfont: {size: 9},
+                    colorscale: scale, zmin: zmin, zmax: zmax, showscale: false,
+                    customdata: idx, xgap: 1, ygap: 1,
+                    hovertemplate: "%{text}<extra></extra>"
+                }],
+                layout: {
+                    xaxis: {side: "top", showgrid: false, fixedrange: true},
+                    yaxis: {autorange: "reversed", showgrid: false, fixedrange: true},
+                    margin: {l: 20, r: 10, t: 30, b: 10}, height: 720,
+                    plot_bgcolor: "#888"
+                }
+            };
+        },
+
+        // prebuilt legends (LEGENDS in chapter2.py): pick one, never call the server
+        legend: function (mode, pc, legends) {
+            var bar = {width: "100%", height: "720px"}, hide = {display: "none"};
+            if (!legends) {
+                return window.dash_clientside.no_update;
+            }
+            if (mode === "rec") {
+                return [legends.empty, hide, {display: "block"}];
+            }
+            if (mode === "ev") {
+                return [legends.ev[String(pc)] || legends.win, bar, hide];
+            }
+            if (mode === "range") {
+                return [legends.range, bar, hide];
+            }
+            return [legends.win, bar, hide];
+        }
+    }
+});
@@ -0,0 +1,57 @@
+// chapter 6, bluff mix in the browser.
+// b / (1 + b) plus a donut chart: nothing here needs the server.
+// keep update_bluff_pie in step with update_bluff_pie in chapter6.py
+// (check: python -m utils.clientside_check). number formatting: pyformat.js
+
+window.dash_clientside = Object.assign({}, window.dash_clientside, {
+    chapter6: {
+        // same as calc_bluff_ratio / get_example / get_warning in chapter6.py
+        _ratios: function (b) {
+            var bluff = b >= 0 ? b / (1 + b) : 0;
+            var value = 1 - bluff;
+            return [Math.max(value, 0), Math.max(bluff, 0)];
+        },
+
+        _example: function (value, bluff, valueCount) {
+            var bluffCount = value === 0 ? 0 : pyRound((bluff / value) * valueCount);
+            return "If your value betting range has " + valueCount + " combinations, you can add about " +
+                   bluffCount + " bluff combos for balance.";
+        },
+
+        _warning: function (b) {
+            if (b < 0.05) {
+                return "Note: Extremely small bets are rare in real games; this theoretical frequency is for reference only.";
+            } else if (b > 1.5) {
+                return "Note: Oversized bets are seldom seen except in specific spots; use the theory as a guideline.";
+            }
+            return "";
+        },
+
+        update_bluff_pie: function (betPotRatio, template) {
+            var self = window.dash_clientside.chapter6;
+            var r = self._ratios(betPotRatio), value = r[0], bluff = r[1];
+            var valuePct = pyRound(value * 100), bluffPct = pyRound(bluff * 100);
+
+            var fig = {
+                data: [{
+                    type: "pie", labels: ["Value bet", "Bluff"], values: [value, bluff], hole: 0.45,
+                    marker: {colors: ["#0072B2", "#E69F00"]},
+                    textinfo: "label+percent", sort: false, pull: [0.01, 0.01]
+                }],
+                layout: {
+                    template: template, showlegend: true,
+                    legend: {orientation: "h", y: -0.13, x: 0.21, font: {size: 15}},
+                    margin: {l: 10, r: 10, t: 20, b: 20},
+                    annotations: [{
+                        text: valuePct + "% : " + bluffPct + "%",
+                        x: 0.5, y: 0.5, font: {size: 28}, showarrow: false
+                    }]
+                }
+            };
+
+            var ratioStr = "Current bet size: " + pyRound(betPotRatio * 100) + "% of pot — Value bet: " +
+                           valuePct + "%, Bluff: " + bluffPct + "%";
+            return [fig, ratioStr, self._example(value, bluff, 30), self._warning(betPotRatio)];
+        }
+    }
+});
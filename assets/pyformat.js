@@ -0,0 +1,20 @@
+// number formatting shared by the clientside callbacks (chapter1.js, chapter6.js),
+// so the browser prints the same text as the python callbacks did.
+
+// python's round() / format(): ties go to the even digit, js rounds them up.
+// a double is an exact tie at d decimals only when x * 2^(d+1) is an odd integer.
+function pyFixed(x, d) {
+    var t = x * Math.pow(2, d + 1);
+    if (Number.isInteger(t) && Math.abs(t) % 2 === 1) {
+        var n = Math.floor(x * Math.pow(10, d));
+        if (n % 2 !== 0) {
+            n += 1;
+        }
+        return (n / Math.pow(10, d)).toFixed(d);
+    }
+    return x.toFixed(d);
+}
+
+function pyRound(x) {
+    return Number(pyFixed(x, 0));
+}
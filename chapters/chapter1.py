@@ -1,11 +1,34 @@
-from dash import html, dcc, Input, Output, State
+from dash import html, dcc, Input, Output, State, ClientsideFunction
 import plotly.graph_objs as go
-import random
-from collections import Counter   # (left here on purpose; I sometimes import it when prototyping)
-
-# simple rank map for quick checks
-rank_map = {'2':2, '3':3, '4':4, '5':5, '6':6, '7':7,
-            '8':8, '9':9, 'T':10, 'J':11, 'Q':12, 'K':13, 'A':14}
+import plotly.io as pio
+
+from utils import cards
+from utils import probability
+from utils import quiz_bank
+
+
+# labels / colors for the three methods (Okabe–Ito colors)
+METHOD_TEXT = {
+    "rule":  "Rule of 4 and 2: fast estimate.",
+    "exact": "Exact odds from probability theory.",
+    "monte": "Monte Carlo simulation (approximate)."
+}
+METHOD_LABEL = {"rule": "Rule of 4 and 2", "exact": "Exact", "monte": "Monte Carlo"}
+METHOD_COLOR = {"rule": "#E69F00", "exact": "#0072B2", "monte": "#009E73"}
+
+# what the browser needs for the chart: rule / exact are closed form in js,
+# monte carlo is read from here (same table as probability.outs_curves)
+CLIENT_CURVES = {
+    "max_outs": probability.MAX_OUTS,
+    "unseen": {str(cl): probability.default_unseen(cl) for cl in (1, 2)},
+    "monte": {str(cl): probability.outs_curves(cards_left=cl)["monte"].tolist() for cl in (1, 2)},
+    "monte_half_width": {str(cl): probability.outs_curves(cards_left=cl)["monte_half_width"].tolist()
+                         for cl in (1, 2)},
+    "methods": list(probability.METHODS),
+    "text": METHOD_TEXT, "label": METHOD_LABEL, "color": METHOD_COLOR,
+    # plotly.js has no named templates, so the one the server used ships as data
+    "template": pio.templates["plotly_white"].to_plotly_json(),
+}
 
 
 # ========== Layout ==========
@@ -60,13 +83,22 @@ def get_layout():
 
         html.Hr(),
         dcc.Graph(id="probability_chart"),
+        dcc.Store(id="ch1-curves", data=CLIENT_CURVES),
         html.Div(id="explanation", style={"marginTop": "20px", "fontSize": "16px"}),
 
         html.Hr(),
         html.H3(" Practice Time: Count the Outs!"),
+        dcc.RadioItems(
+            id="quiz-difficulty",
+            options=[{"label": "Any", "value": "any"}] +
+                    [{"label": d.capitalize(), "value": d} for d in quiz_bank.DIFFICULTIES],
+            value="any",
+            labelStyle={"display": "inline-block", "marginRight": "15px"},
+            style={"marginBottom": "10px"}
+        ),
         html.Div(id="quiz-question-text", style={"fontSize": "18px", "marginBottom": "10px"}),
 
-        dcc.Input(id="quiz-input", type="number", placeholder="Enter outs", min=0, max=20),
+        dcc.Input(id="quiz-input", type="number", placeholder="Enter outs", min=0, max=30),
         html.Button("Check Answer", id="quiz-submit", n_clicks=0),
         html.Button("Next Question", id="quiz-next", n_clicks=0, style={"marginLeft": "10px"}),
         html.Div(id="quiz-feedback", style={"marginTop": "20px", "fontWeight": "bold"}),
@@ -83,122 +115,78 @@ layout = get_layout()
 
 
 
-# ========== Callbacks ==========
-def register_callbacks(app):
+# ========== Chart (reference version of the clientside callback) ==========
+def update_chart(outs, cards_left, method):
+    """chart + texts for one spot. runs in the browser (assets/chapter1.js); this
+    is the reference the js is checked against (python -m utils.clientside_check)."""
+    # all three methods for 0..20 outs in one table gather (shared with the simulator page)
+    curves = probability.outs_curves(cards_left=cards_left)
+    prob = float(curves[method][outs]) * 100
+
+    method_text = METHOD_TEXT[method]
+    if method == "monte":
+        half = float(curves["monte_half_width"][outs]) * 100
+        method_text = f"Monte Carlo simulation (approximate, 95% CI ±{half:.1f}%)."
+
+    # comparison curve: every method across 0..20 outs, selected one drawn bold
+    x = list(range(probability.MAX_OUTS + 1))
+    fig = go.Figure()
+    for m in probability.METHODS:
+        fig.add_trace(go.Scatter(
+            x=x, y=curves[m] * 100, mode="lines", name=METHOD_LABEL[m],
+            line=dict(color=METHOD_COLOR[m], width=4 if m == method else 1.5,
+                      dash="solid" if m == method else "dot")
+        ))
+    fig.add_trace(go.Scatter(
+        x=[outs], y=[prob], mode="markers+text", name="Your spot",
+        marker=dict(size=13, color=METHOD_COLOR[method]),
+        text=[f"{prob:.1f}%"], textposition="top left", showlegend=False
+    ))
+    fig.update_layout(
+        title="Estimated Win Probability (%) by Number of Outs",
+        xaxis=dict(title="Outs", dtick=2), yaxis=dict(title="Probability (%)", range=[0, 100]),
+        template="plotly_white", legend=dict(orientation="h", y=-0.2),
+        margin=dict(l=40, r=20, t=50, b=40)
+    )
 
-    # real Monte Carlo: sample without replacement from unseen cards
-    # note: I keep it simple on purpose. we treat "outs" as the first N indices
-    def monte_prob(outs, cards_left, trials=20000):
-        deck_size = 47 if cards_left == 2 else 46    # 47 unseen with two to come, else 46
-        hits = 0
+    tip = f" With {outs} outs and {cards_left} card(s) left, this is your chance to hit."
+    # I leave the ** here; I sometimes like the look even if it is just plain text
+    explain = f"You have **{outs} outs**, and **{cards_left} card(s)** to come. Estimated win: **{prob:.1f}%**. {method_text}"
 
-        for _ in range(trials):
-            draw = random.sample(range(deck_size), cards_left)
-            # if any drawn index falls in [0, outs), we say we hit an out
-            if any(x < outs for x in draw):
-                hits += 1
+    return fig, explain, tip
 
-        return hits / trials * 100.0   # return percent
 
 
+# ========== Callbacks ==========
+def register_callbacks(app):
 
-    @app.callback(
+    # pure arithmetic + a table gather: runs in the browser, no server round trip.
+    # the monte carlo curve is precomputed, so it ships in the "ch1-curves" store.
+    app.clientside_callback(
+        ClientsideFunction(namespace="chapter1", function_name="update_chart"),
         Output("probability_chart", "figure"),
         Output("explanation", "children"),
         Output("outs-tip", "children"),
         Input("outs", "value"),
         Input("cards_left", "value"),
-        Input("method", "value")
+        Input("method", "value"),
+        State("ch1-curves", "data")
     )
-    def update_chart(outs, cards_left, method):
-        # choose the method: quick rule, exact, or simulation
-        if method == "rule":
-            # mental math: 4x on turn+river, 2x on one street
-            prob = outs * (4 if cards_left == 2 else 2)
-            method_text = "Rule of 4 and 2: fast estimate."
-
-        elif method == "exact":
-            # exact math. this is the standard way for ≥1 success
-            if cards_left == 2:
-                # 1 - [(47-outs)/47] * [(46-outs)/46]
-                prob = 1 - ((47 - outs) / 47) * ((46 - outs) / 46)
-            else:
-                # for one card to come we have outs/46
-                prob = outs / 46
-            prob *= 100
-            method_text = "Exact odds from probability theory."
-
-        else:
-            # Monte Carlo. bigger trials → smoother number, but slower
-            prob = monte_prob(outs, cards_left, trials=20000)
-            method_text = "Monte Carlo simulation (approximate)."
-
-        # clamp to [0,100] just in case
-        prob = max(0, min(100, prob))
-
-        # gauge is okay for a single percentage
-        fig = go.Figure(go.Indicator(
-            mode="gauge+number",
-            value=prob,
-            title={'text': "Estimated Win Probability (%)"},
-            gauge={'axis': {'range': [0, 100]}}
-        ))
-
-        tip = f" With {outs} outs and {cards_left} card(s) left, this is your chance to hit."
-        # I leave the ** here; I sometimes like the look even if it is just plain text
-        explain = f"You have **{outs} outs**, and **{cards_left} card(s)** to come. Estimated win: **{prob:.1f}%**. {method_text}"
-
-        return fig, explain, tip
-
-
-
-    # quick random quiz: we draw 5 cards (2 hole + 3 flop)
-    def generate_quiz():
-        suits = ["♠", "♥", "♦", "♣"]
-        ranks = list(rank_map.keys())
-        deck = [r + s for r in ranks for s in suits]
-        cards = random.sample(deck, 5)
-        return {"hole": cards[:2], "flop": cards[2:]}
-
-
-
-    # compute a very rough outs count:
-    # - flush draw → 9
-    # - straight draw (gutshot approx) → 4
-    # this is enough for a small practice widget
-    def compute_outs(hole, flop):
-        suits = [c[1] for c in hole + flop]
-        ranks = [rank_map[c[0]] for c in hole + flop]
-
-        flush_outs = 9 if any(suits.count(s) == 4 for s in set(suits)) else 0
-
-        values = sorted(set(ranks))
-        straight_outs = 0
-        for v in values:
-            # if we have 4 in a 5-long window, we call it a gutshot-like thing
-            if sum((v + i in values) for i in range(5)) == 4:
-                straight_outs = 4
-                break
-
-        total = flush_outs + straight_outs
-
-        explain = []
-        if flush_outs:    explain.append("Flush draw → 9 outs")
-        if straight_outs: explain.append("Straight draw → approx. 4 outs")
-
-        return total, explain
 
 
 
+    # questions come from the precomputed bank (utils/quiz_bank.py):
+    # picking one is a random row inside the chosen difficulty bucket
     @app.callback(
         Output("quiz-question-store", "data"),
         Output("quiz-question-text", "children"),
-        Input("quiz-next", "n_clicks")
+        Input("quiz-next", "n_clicks"),
+        Input("quiz-difficulty", "value")
     )
-    def serve_question(n):
-        # just give a new random question each time
-        q = generate_quiz()
-        txt = f"You hold {q['hole'][0]} and {q['hole'][1]}. Flop: {q['flop'][0]}, {q['flop'][1]}, {q['flop'][2]}"
+    def serve_question(n, difficulty):
+        q = quiz_bank.question(quiz_bank.pick_question(difficulty))
+        hole, flop = [cards.card_str(c) for c in q["hole"]], [cards.card_str(c) for c in q["flop"]]
+        txt = f"You hold {hole[0]} and {hole[1]}. Flop: {flop[0]}, {flop[1]}, {flop[2]}"
         return q, txt
 
 
@@ -215,7 +203,8 @@ def register_callbacks(app):
         if not q or user_ans is None:
             return " Please input a number."
 
-        correct, explain = compute_outs(q['hole'], q['flop'])
+        # answer is stored with the question; nothing to compute here
+        correct, explain, draw_type = quiz_bank.answer(q["id"])
 
         # small corner case: user says 1~2 while true is 0 (often thinking runner-runner)
         if correct == 0 and user_ans in [1, 2]:
@@ -229,6 +218,6 @@ def register_callbacks(app):
             ])
 
         if user_ans == correct:
-            return f" Correct! {' | '.join(explain)}" if explain else " Correct! No major draws."
+            return f" Correct! {draw_type}: {' | '.join(explain)}" if explain else " Correct! No major draws."
 
-        return f" Not quite. Correct = {correct}. " + (" | ".join(explain) if explain else "No major draws.")
+        return f" Not quite. Correct = {correct}. " + (f"{draw_type}: " + " | ".join(explain) if explain else "No major draws.")
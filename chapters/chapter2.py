@@ -1,20 +1,17 @@
-from dash import html, dcc, Input, Output, State, ctx, ALL
+from dash import html, dcc, Input, Output, State, ctx, ALL, Patch, no_update, ClientsideFunction
+import numpy as np
 import pandas as pd
 import plotly.graph_objs as go
 import plotly.express as px
 import re
 
-# ====== Data load ======
-# note: local csv path. I keep it as-is.
-import os
-CURRENT_DIR = os.path.dirname(__file__)
-DATA_PATH = os.path.join(CURRENT_DIR, "..", "data", "date_ready_for_using.csv")
-
-df = pd.read_csv(DATA_PATH)
-df.columns = df.columns.str.strip()
-df["hand"] = df["hand"].str.strip()   # keep standard hand code like AJs, T9o
-NAME_SET = set(df["hand"])            # quick membership check (used in find helper)
+from utils.hand_classes import STD_LABELS
+from utils.preflop_matrix import equity_vs_range, range_vector
+from utils.preflop_data import TABLE, WIN, EV, REC, hand_index
 
+# ====== Data load ======
+# the csv is loaded once in utils/preflop_data.py; row k = grid cell k (row * 13 + col)
+df = TABLE
 
 
 # ====== rank order and 13x13 grid (keep 'T', do not use '10') ======
@@ -29,6 +26,9 @@ hands_grid = [[
     for c in GRID_ORDER] for r in GRID_ORDER
 ]
 
+# default villain range for the "vs range" mode (grid index = row * 13 + col)
+DEFAULT_RANGE = [STD_LABELS.index(h) for h in ["AA", "KK", "QQ", "JJ", "TT", "AKs", "AQs", "AKo"]]
+
 
 
 # ====== continuous colormap (viridis) helper ======
@@ -61,33 +61,15 @@ def action_color(rec):
 
 
 # ====== tolerant lookup for a row by hand name ======
-# supports: AA / AAs / AAo, AKo / KAo, and "10" -> "T"
+# supports: AA / AAs / AAo, AKo / KAo, and "10" -> "T" (alias dict, built once)
 def find_row_by_hand(hand_str):
-    h = str(hand_str).strip().upper().replace("10", "T")
-    cand = {h}
-
-    # pairs: allow AA, AAs, AAo
-    if len(h) >= 2 and h[0] == h[1]:
-        base = h[0] * 2
-        cand |= {base, base + "O", base + "S"}
-
-    # non-pair with suffix: AKo / AKs, also try KAo / KAs
-    if len(h) == 3 and h[2] in ("S", "O"):
-        a, b, suf = h[0], h[1], h[2]
-        cand |= {a + b + suf, b + a + suf}
-
-    # non-pair no suffix: AK -> try AKo/AKs and KAo/KAs
-    if len(h) == 2 and h[0] != h[1]:
-        a, b = h[0], h[1]
-        cand |= {a + b + "O", a + b + "S", b + a + "O", b + a + "S"}
-
-    sub = df[df["hand"].astype(str).str.strip().str.upper().isin(cand)]
-    return None if sub.empty else sub.iloc[0]
+    idx = hand_index(hand_str)
+    return None if idx is None else df.iloc[idx]
 
 
 
 # ====== tiny figure to show only a colorbar (no heatmap body) ======
-def _legend_figure_win():
+def _legend_figure_win(title="Win Rate"):
     # trick: transparent heatmap to keep only the colorbar
     fig = go.Figure(go.Heatmap(
         z=[[0, 1]],
@@ -95,7 +77,7 @@ def _legend_figure_win():
         colorscale=viridis,
         opacity=0,                    # hide the body
         colorbar=dict(
-            title=dict(text="Win Rate", side="right", font=dict(size=12)),
+            title=dict(text=title, side="right", font=dict(size=12)),
             tickformat=".0%",
             thickness=18,
             len=0.95,
@@ -113,6 +95,162 @@ def _legend_figure_win():
 
 
 
+def legend_for(mode, pc):
+    """(legend figure, its style, category chips, chips style) for a mode / player count."""
+    # win / all → show continuous colorbar; hide category legend
+    if mode in ("win", "all"):
+        fig = _legend_figure_win()
+        return fig, {"width": "100%", "height": "720px"}, None, {"display": "none"}
+
+    elif mode == "range":
+        fig = _legend_figure_win("Equity vs Range")
+        return fig, {"width": "100%", "height": "720px"}, None, {"display": "none"}
+
+    # EV → also a continuous bar but with EV ticks
+    elif mode == "ev":
+        ev_min, ev_max = -1.0, 1.0
+
+        if pc in EV:
+            ev_min = float(EV[pc].min())
+            ev_max = float(EV[pc].max())
+            if ev_max <= ev_min:
+                ev_max = ev_min + 1e-6
+
+        tickvals = [0.0, 0.25, 0.5, 0.75, 1.0]
+        ticktext = [f"{ev_min + (ev_max-ev_min)*t:.2f}" for t in tickvals]
+
+        fig = go.Figure(go.Heatmap(
+            z=[[0, 1]],
+            showscale=True,
+            colorscale=viridis,
+            opacity=0,
+            colorbar=dict(
+                title=dict(text=f"EV ({pc}P)", side="right", font=dict(size=12)),
+                thickness=18, len=0.95,
+                tickvals=tickvals, ticktext=ticktext,
+                tickfont=dict(size=11),
+            )
+        ))
+        fig.update_layout(
+            xaxis=dict(visible=False),
+            yaxis=dict(visible=False),
+            margin=dict(l=0, r=0, t=0, b=0),
+            paper_bgcolor="rgba(0,0,0,0)",
+            plot_bgcolor="rgba(0,0,0,0)",
+        )
+        return fig, {"width": "100%", "height": "720px"}, None, {"display": "none"}
+
+    # rec → hide continuous bar, show discrete legend chips
+    else:
+        chips = []
+        for label in ["Raise", "Call", "Fold", "Check", "N/A"]:
+            chips.append(
+                html.Div([
+                    html.Div(style={
+                        "display": "inline-block", "width": "14px", "height": "14px",
+                        "backgroundColor": ACTION_COLORS[label.upper()], "marginRight": "6px",
+                        "border": "1px solid #777"
+                    }),
+                    html.Span(label)
+                ], style={"marginBottom": "8px"})
+            )
+
+        cat = html.Div(chips, style={"fontSize": "12px", "lineHeight": "16px"})
+        empty_fig = go.Figure(); empty_fig.update_layout(margin=dict(l=0, r=0, t=0, b=0))
+        return empty_fig, {"display": "none"}, cat, {"display": "block"}
+
+
+# every legend is prebuilt once and shipped in a dcc.Store; the browser only
+# picks one (assets/chapter2.js), so mode / slider changes never hit the server
+def _bare(fig):
+    # drop the default template: it is most of the json and a colorbar does not need it
+    out = fig.to_plotly_json()
+    out["layout"].pop("template", None)
+    return out
+
+
+LEGENDS = {
+    "win": _bare(legend_for("win", 2)[0]),
+    "range": _bare(legend_for("range", 2)[0]),
+    "ev": {str(pc): _bare(legend_for("ev", pc)[0]) for pc in EV},
+    "empty": _bare(legend_for("rec", 2)[0]),
+}
+CAT_CHIPS = legend_for("rec", 2)[2]
+
+
+
+# ====== single-figure grid (heatmap renderer) ======
+# one Heatmap trace instead of 169 Divs: z drives the color, text is the label.
+# mode / player changes only touch data[0] through a Patch.
+ACTION_ORDER = ["RAISE", "CALL", "FOLD", "CHECK", "N/A"]
+# stepped colorscale so each action code 0..4 gets one flat color
+ACTION_SCALE = [[stop, ACTION_COLORS[a]] for i, a in enumerate(ACTION_ORDER)
+                for stop in (i / len(ACTION_ORDER), (i + 1) / len(ACTION_ORDER))]
+
+
+def grid_values(pc, mode, range_hands):
+    """per-cell (z for color, text, colorscale, zmin, zmax) for the heatmap renderer."""
+    wins = np.asarray(WIN.get(pc, [0.2] * 169), dtype=float)
+    evs = np.asarray(EV.get(pc, [0.0] * 169), dtype=float)
+    recs = np.asarray(REC.get(pc, ["N/A"] * 169))
+    labels = [h for row in hands_grid for h in row]
+
+    if mode == "range":
+        eq = equity_vs_range(range_vector(range_hands or []))
+        z, scale, zmin, zmax = eq, viridis, 0, 1
+        lines = [[f"Eq: {e:.2f}" if e == e else "Eq: -"] for e in eq]
+    elif mode == "ev":
+        z, scale, zmin, zmax = evs, viridis, float(evs.min()), float(evs.max())
+        lines = [[f"EV: {e:.2f}"] for e in evs]
+    elif mode == "rec":
+        codes = {a: i for i, a in enumerate(ACTION_ORDER)}
+        z = np.array([codes.get(str(r).strip().upper(), 4) + 0.5 for r in recs])
+        scale, zmin, zmax = ACTION_SCALE, 0, len(ACTION_ORDER)
+        lines = [[f"{r}"] for r in recs]
+    else:
+        z, scale, zmin, zmax = wins, viridis, 0, 1
+        lines = [[f"Win: {w:.2f}"] for w in wins]
+        if mode == "all":
+            for line, e, r in zip(lines, evs, recs):
+                line += [f"EV: {e:.2f}", f"{r}"]
+
+    text = [f"<b>{h}</b><br>" + "<br>".join(line) for h, line in zip(labels, lines)]
+    shape = (len(GRID_ORDER), len(GRID_ORDER))
+    return (np.asarray(z, dtype=float).reshape(shape),
+            np.array(text, dtype=object).reshape(shape).tolist(), scale, zmin, zmax)
+
+
+def grid_heatmap_figure(pc, mode, range_hands):
+    z, text, scale, zmin, zmax = grid_values(pc, mode, range_hands)
+    fig = go.Figure(go.Heatmap(
+        z=z, x=GRID_ORDER, y=GRID_ORDER, text=text, texttemplate="%{text}",
+        textfont=dict(size=9), colorscale=scale, zmin=zmin, zmax=zmax, showscale=False,
+        customdata=np.arange(169).reshape(13, 13), xgap=1, ygap=1,
+        hovertemplate="%{text}<extra></extra>"
+    ))
+    fig.update_layout(
+        xaxis=dict(side="top", showgrid=False, fixedrange=True),
+        yaxis=dict(autorange="reversed", showgrid=False, fixedrange=True),
+        margin=dict(l=20, r=10, t=30, b=10), height=720,
+        plot_bgcolor="#888",
+    )
+    return fig
+
+
+# the whole table the in-browser renderer needs (~60 KB), sent once with the layout
+CLIENT_DATA = {
+    "grid": GRID_ORDER,
+    "labels": [h for row in hands_grid for h in row],
+    "win": {str(pc): WIN[pc].tolist() for pc in WIN},
+    "ev": {str(pc): EV[pc].tolist() for pc in EV},
+    "rec": {str(pc): REC[pc].tolist() for pc in REC},
+    "viridis": viridis,
+    "actions": ACTION_ORDER,
+    "action_scale": ACTION_SCALE,
+}
+
+
+
 # ====== Layout ======
 def get_layout():
     legend_fig = _legend_figure_win()
@@ -143,19 +281,49 @@ def get_layout():
                     {"label": "Only Win Rate", "value": "win"},
                     {"label": "Only EV", "value": "ev"},
                     {"label": "Only Action", "value": "rec"},
+                    {"label": "Equity vs Selected Range (heads-up)", "value": "range"},
                 ],
                 value="all", clearable=False, style={"width": "60%"}
+            ),
+
+            html.Label(" Villain Range (used by 'Equity vs Selected Range'):"),
+            dcc.Dropdown(
+                id="range-hands",
+                options=[{"label": h, "value": k} for k, h in enumerate(STD_LABELS)],
+                value=DEFAULT_RANGE, multi=True,
+                placeholder="Pick the hands villain goes all-in with",
+                style={"width": "60%"}
+            ),
+
+            html.Label(" Grid Renderer:"),
+            dcc.RadioItems(
+                id="grid-renderer",
+                options=[
+                    {"label": " Flip cards", "value": "cards"},
+                    {"label": " Single heatmap (faster)", "value": "heatmap"},
+                    {"label": " Heatmap, in-browser (no server calls)", "value": "client"},
+                ],
+                value="cards", inline=True, inputStyle={"marginLeft": "10px"}
             )
         ], style={"padding": "10px"}),
 
         # hand grid + legend (continuous or discrete) + detail card
         html.Div([
-            html.Div(id="card-grid", className="grid", style={"width": "70%"}),
+            html.Div([
+                html.Div(id="card-grid", className="grid"),
+                dcc.Graph(id="grid-heatmap", style={"display": "none"},
+                          config={"displayModeBar": False}),
+                dcc.Graph(id="grid-heatmap-client", style={"display": "none"},
+                          config={"displayModeBar": False}),
+                dcc.Store(id="ch2-data", data=CLIENT_DATA),
+                dcc.Store(id="ch2-legends", data=LEGENDS),
+                dcc.Store(id="ch2-range-eq")
+            ], style={"width": "70%"}),
 
             html.Div([
                 dcc.Graph(id="color-legend", figure=legend_fig,
                           style={"width": "100%", "height": "720px"}),
-                html.Div(id="cat-legend", style={"display": "none", "padding": "6px 0"})
+                html.Div(CAT_CHIPS, id="cat-legend", style={"display": "none", "padding": "6px 0"})
             ], style={"width": "8%"}),     # a bit wider so the title does not clip
 
             html.Div(id="detail-card", style={"width": "22%", "paddingLeft": "20px"})
@@ -206,27 +374,112 @@ layout = get_layout()
 
 def register_callbacks(app):
 
+    @app.callback(
+        Output("card-grid", "style"),
+        Output("grid-heatmap", "style"),
+        Output("grid-heatmap-client", "style"),
+        Input("grid-renderer", "value")
+    )
+    def toggle_renderer(renderer):
+        shown, hidden = {"display": "block", "height": "720px"}, {"display": "none"}
+        if renderer == "heatmap":
+            return hidden, shown, hidden
+        if renderer == "client":
+            return hidden, hidden, shown
+        return {"display": "block"}, hidden, hidden
+
+
+
+    # ---- in-browser renderer: the server only answers when the range changes ----
+    @app.callback(
+        Output("ch2-range-eq", "data"),
+        Input("range-hands", "value")
+    )
+    def range_equity(range_hands):
+        eq = equity_vs_range(range_vector(range_hands or []))
+        return [None if e != e else float(e) for e in eq]
+
+    app.clientside_callback(
+        ClientsideFunction(namespace="chapter2", function_name="grid_figure"),
+        Output("grid-heatmap-client", "figure"),
+        Input("player-slider", "value"),
+        Input("info-mode", "value"),
+        Input("ch2-range-eq", "data"),
+        Input("grid-renderer", "value"),
+        State("ch2-data", "data")
+    )
+
+    # legends are prebuilt; the browser just picks one
+    app.clientside_callback(
+        ClientsideFunction(namespace="chapter2", function_name="legend"),
+        Output("color-legend", "figure"),
+        Output("color-legend", "style"),
+        Output("cat-legend", "style"),
+        Input("info-mode", "value"),
+        Input("player-slider", "value"),
+        State("ch2-legends", "data")
+    )
+
+
+
+    @app.callback(
+        Output("grid-heatmap", "figure"),
+        Input("player-slider", "value"),
+        Input("info-mode", "value"),
+        Input("range-hands", "value"),
+        Input("grid-renderer", "value"),
+        State("grid-heatmap", "figure")
+    )
+    def update_heatmap(pc, mode, range_hands, renderer, current):
+        # hidden renderer: nothing to do
+        if renderer != "heatmap":
+            return no_update
+        if not current or not current.get("data"):
+            return grid_heatmap_figure(pc, mode, range_hands)
+
+        # figure already on screen: only swap the trace values
+        z, text, scale, zmin, zmax = grid_values(pc, mode, range_hands)
+        patch = Patch()
+        patch["data"][0]["z"] = z.tolist()
+        patch["data"][0]["text"] = text
+        patch["data"][0]["colorscale"] = scale
+        patch["data"][0]["zmin"] = zmin
+        patch["data"][0]["zmax"] = zmax
+        return patch
+
+
+
     @app.callback(
         Output("card-grid", "children"),
         Input("player-slider", "value"),
         Input("info-mode", "value"),
-        Input("detail-card", "children")
+        Input("range-hands", "value"),
+        Input("grid-renderer", "value")
     )
-    def update_grid(pc, mode, _):
-        # columns depend on player count (pc): e.g. "2_win", "EV_2p", "rec_2p"
-        win_col, ev_col, rec_col = f"{pc}_win", f"EV_{pc}p", f"rec_{pc}p"
+    def update_grid(pc, mode, range_hands, renderer="cards"):
+        # heatmap renderers: drop the 169 divs (also clears stale clicks)
+        if renderer in ("heatmap", "client"):
+            return []
+
+        # one array per player count, row k = grid cell k; missing count -> defaults
+        wins = WIN.get(pc, [0.2] * 169)
+        evs = EV.get(pc, [0.0] * 169)
+        recs = REC.get(pc, ["N/A"] * 169)
 
         # pre-calc EV min/max (used only for EV mode)
         ev_min = ev_max = None
-        if mode == "ev" and ev_col in df.columns:
-            ev_series = pd.to_numeric(df[ev_col], errors="coerce").dropna()
-            if not ev_series.empty:
-                ev_min = float(ev_series.min())
-                ev_max = float(ev_series.max())
+        if mode == "ev" and pc in EV:
+            ev_min = float(EV[pc].min())
+            ev_max = float(EV[pc].max())
+
+        # heads-up equity of every class vs the picked range: one dot product per cell
+        vs_range = equity_vs_range(range_vector(range_hands or []))
 
-        def color_from_mode(win, ev, rec):
+        def color_from_mode(win, ev, rec, eq):
             # decide the tile color based on current mode
-            if mode in ("win", "all"):
+            if mode == "range":
+                return map_color(eq)
+            elif mode in ("win", "all"):
                 return map_color(win)       # win ∈ [0,1]
             elif mode == "ev":
                 if ev_min is None or ev_max is None or ev_max <= ev_min:
@@ -241,15 +494,11 @@ def register_callbacks(app):
             cards = []
             for c_idx, hand in enumerate(row):
 
-                # defaults in case we cannot find the row
-                win, ev, rec = (0.2, 0.0, "N/A")
-                rowdata = find_row_by_hand(hand)
-                if rowdata is not None:
-                    win = float(rowdata.get(win_col, win))
-                    ev  = float(rowdata.get(ev_col, ev))
-                    rec = str(rowdata.get(rec_col, rec))
+                k = r_idx * 13 + c_idx
+                win, ev, rec = float(wins[k]), float(evs[k]), str(recs[k])
 
-                bg = color_from_mode(win, ev, rec)
+                eq = vs_range[k]
+                bg = color_from_mode(win, ev, rec, eq)
 
                 style_front = {
                     "backgroundColor": bg,
@@ -262,6 +511,7 @@ def register_callbacks(app):
                 if mode in ("win", "all"): content.append(html.P(f"Win: {win:.2f}"))
                 if mode in ("ev",  "all"): content.append(html.P(f"EV: {ev:.2f}"))
                 if mode in ("rec", "all"): content.append(html.P(f"Action: {rec}"))
+                if mode == "range": content.append(html.P(f"Eq: {eq:.2f}" if eq == eq else "Eq: -"))
 
                 cards.append(html.Div([
                     html.Div(hand, className="flip-card-front", style=style_front),
@@ -276,103 +526,46 @@ def register_callbacks(app):
 
 
 
-    @app.callback(
-        Output("color-legend", "figure"),
-        Output("color-legend", "style"),
-        Output("cat-legend", "children"),
-        Output("cat-legend", "style"),
-        Input("info-mode", "value"),
-        Input("player-slider", "value")
-    )
-    def update_legend(mode, pc):
-        # win / all → show continuous colorbar; hide category legend
-        if mode in ("win", "all"):
-            fig = _legend_figure_win()
-            return fig, {"width": "100%", "height": "720px"}, None, {"display": "none"}
-
-        # EV → also a continuous bar but with EV ticks
-        elif mode == "ev":
-            ev_col = f"EV_{pc}p"
-            ev_min, ev_max = -1.0, 1.0
-
-            if ev_col in df.columns:
-                ev_series = pd.to_numeric(df[ev_col], errors="coerce").dropna()
-                if not ev_series.empty:
-                    ev_min = float(ev_series.min())
-                    ev_max = float(ev_series.max())
-                    if ev_max <= ev_min:
-                        ev_max = ev_min + 1e-6
-
-            tickvals = [0.0, 0.25, 0.5, 0.75, 1.0]
-            ticktext = [f"{ev_min + (ev_max-ev_min)*t:.2f}" for t in tickvals]
-
-            fig = go.Figure(go.Heatmap(
-                z=[[0, 1]],
-                showscale=True,
-                colorscale=viridis,
-                opacity=0,
-                colorbar=dict(
-                    title=dict(text=f"EV ({pc}P)", side="right", font=dict(size=12)),
-                    thickness=18, len=0.95,
-                    tickvals=tickvals, ticktext=ticktext,
-                    tickfont=dict(size=11),
-                )
-            ))
-            fig.update_layout(
-                xaxis=dict(visible=False),
-                yaxis=dict(visible=False),
-                margin=dict(l=0, r=0, t=0, b=0),
-                paper_bgcolor="rgba(0,0,0,0)",
-                plot_bgcolor="rgba(0,0,0,0)",
-            )
-            return fig, {"width": "100%", "height": "720px"}, None, {"display": "none"}
-
-        # rec → hide continuous bar, show discrete legend chips
-        else:
-            chips = []
-            for label in ["Raise", "Call", "Fold", "Check", "N/A"]:
-                chips.append(
-                    html.Div([
-                        html.Div(style={
-                            "display": "inline-block", "width": "14px", "height": "14px",
-                            "backgroundColor": ACTION_COLORS[label.upper()], "marginRight": "6px",
-                            "border": "1px solid #777"
-                        }),
-                        html.Span(label)
-                    ], style={"marginBottom": "8px"})
-                )
-
-            cat = html.Div(chips, style={"fontSize": "12px", "lineHeight": "16px"})
-            empty_fig = go.Figure(); empty_fig.update_layout(margin=dict(l=0, r=0, t=0, b=0))
-            return empty_fig, {"display": "none"}, cat, {"display": "block"}
-
-
-
     @app.callback(
         Output("detail-card", "children"),
         Input({'type': 'card', 'index': ALL}, 'n_clicks'),
+        Input("grid-heatmap", "clickData"),
+        Input("grid-heatmap-client", "clickData"),
         State({'type': 'card', 'index': ALL}, 'data-hand'),
-        State("player-slider", "value")
+        State("player-slider", "value"),
+        State("range-hands", "value")
     )
-    def update_detail(n_clicks_list, hands, pc):
+    def update_detail(n_clicks_list, click_data, client_click, hands, pc, range_hands):
+        # heatmap click: the cell index rides along as customdata
+        if ctx.triggered_id == "grid-heatmap-client":
+            click_data = client_click
+        if ctx.triggered_id in ("grid-heatmap", "grid-heatmap-client") and click_data:
+            idx = int(click_data["points"][0]["customdata"])
+            selected = hands_grid[idx // 13][idx % 13]
+
         # if nothing clicked yet
-        if not n_clicks_list or max(n_clicks_list) is None:
+        elif not n_clicks_list or max(n_clicks_list) is None:
             return html.Div("Click a card to view details.")
 
-        idx = n_clicks_list.index(max(n_clicks_list))
-        selected = hands[idx]
+        else:
+            idx = n_clicks_list.index(max(n_clicks_list))
+            selected = hands[idx]
 
         rowdata = find_row_by_hand(selected)
         if rowdata is None:
             return html.Div(f"No data for {selected} under current filters.", style={"color": "#b00"})
 
         d = rowdata
-        return html.Div([
+        lines = [
             html.H4(f"{selected} Details:"),
             html.P(f"Win Rate ({pc}P): {d[f'{pc}_win']:.2f}"),
             html.P(f"EV ({pc}P): {d[f'EV_{pc}p']:.2f}"),
             html.P(f"Suggested Action: {d[f'rec_{pc}p']}")
-        ], style={"border": "1px solid #ccc", "padding": "10px", "borderRadius": "6px"})
+        ]
+        if range_hands:
+            eq = equity_vs_range(range_vector(range_hands))[idx]
+            lines.append(html.P(f"Equity vs Selected Range (HU): {eq:.2f}"))
+        return html.Div(lines, style={"border": "1px solid #ccc", "padding": "10px", "borderRadius": "6px"})
 
 
 
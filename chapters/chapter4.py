@@ -1,8 +1,14 @@
+from functools import lru_cache
 from dash import dcc, html, Input, Output, State, ctx
 import dash_bootstrap_components as dbc
 import plotly.graph_objs as go
 import numpy as np
 
+from utils import cards
+from utils import canonical
+from utils import equity
+from utils.ranges import Range
+
 
 # ====================== Scenarios (preset) ======================
 # note: small, hand-crafted examples. clear and easy to follow.
@@ -50,12 +56,30 @@ SCENARIOS = [
 
 
 
+# card ids, parsed once here; the strings above stay for reading / editing
+for _s in SCENARIOS:
+    _s["hole_ids"] = cards.parse_cards(_s["hole"])
+    _s["villain_ids"] = [cards.parse_cards(v) for v in _s["villain_hands"]]
+    _s["board_ids"] = cards.parse_cards(_s["board"])
+    _s["players"] = len(_s["villain_hands"]) + 1
+    # exact equity at flop / turn / river (full enumeration, a few ms); stored once
+    _s["equity"] = equity.street_equity(_s["hole_ids"], _s["villain_ids"], _s["board_ids"])
+
+
+
 # ====================== Helpers ======================
-def get_board_visual(hole, villain_hands, board, street, player_cnt):
-    """small visual block: hero hand + hidden villains + board (progressive)."""
-    suits = {"♠": "#1e88e5", "♥": "#e53935", "♦": "#fb8c00", "♣": "#43a047"}
+SUIT_COLORS = ["#1e88e5", "#e53935", "#fb8c00", "#43a047"]     # ♠ ♥ ♦ ♣ (same order as cards.SUITS)
 
-    hero_cards = [html.Span(card, style={"color": suits.get(card[-1], "#333"),
+# one fixed color per hand type so slices keep their color between streets
+HANDTYPE_COLORS = dict(zip(equity.HANDTYPE_LABELS,
+                           ["#bdbdbd", "#90caf9", "#1E88E5", "#43A047", "#fb8c00",
+                            "#8e24aa", "#e53935", "#6d4c41", "#757575"]))
+
+
+def get_board_visual(hole, villain_hands, board, street, player_cnt):
+    """small visual block: hero hand + hidden villains + board (progressive).
+       cards are ids from utils.cards."""
+    hero_cards = [html.Span(cards.card_str(card), style={"color": SUIT_COLORS[cards.suit_of(card)],
                                          "fontWeight": "bold", "fontSize": "22px", "marginRight": "8px"})
                   for card in hole]
 
@@ -64,10 +88,10 @@ def get_board_visual(hole, villain_hands, board, street, player_cnt):
                      for _ in range(player_cnt - 1)]
 
     flop = board[:3]
-    turn = board[3] if street > 0 else "?"
-    river = board[4] if street > 1 else "?"
+    turn = cards.card_str(board[3]) if street > 0 else "?"
+    river = cards.card_str(board[4]) if street > 1 else "?"
 
-    flop_cards = [html.Span(card, style={"color": suits.get(card[-1], "#333"),
+    flop_cards = [html.Span(cards.card_str(card), style={"color": SUIT_COLORS[cards.suit_of(card)],
                                          "fontWeight": "bold", "fontSize": "21px", "marginRight": "6px"})
                   for card in flop]
 
@@ -82,26 +106,56 @@ def get_board_visual(hole, villain_hands, board, street, player_cnt):
     ])
 
 
+HIGH_RANKS = 0b1111100000000     # T J Q K A
+LOW_RANKS  = 0b0000000111111     # 2 .. 7
+JT_RANKS   = 0b0011000000000
+
+
+def flop_texture(flop):
+    """(suit pattern, paired?) of a flop. renaming suits keeps it, so it can be
+       counted on the suit-distinct flops."""
+    mask  = cards.to_mask(flop)
+    suits = sum(1 for c in cards.suit_counts(mask) if c)
+    return ("Monotone", "Two-tone", "Rainbow")[suits - 1], cards.rank_mask(mask).bit_count() < 3
+
+
+@lru_cache(maxsize=None)
+def texture_shares():
+    """share of all 22,100 flops per texture: the 1,755 distinct flops, each
+       counted as many times as it stands for (utils/canonical.py)."""
+    flops, weights = canonical.canonical_flops()
+    out = {}
+    for flop, w in zip(flops.tolist(), weights.tolist()):
+        key = flop_texture(flop)
+        out[key] = out.get(key, 0) + w
+    return {key: n / weights.sum() for key, n in out.items()}
+
+
 def get_board_texture_tip(board):
-    """tiny text tip based on flop texture; very rough rules on purpose."""
-    suits = [b[-1] for b in board[:3] if b != "?"]
-    ranks = [b[:-1] for b in board[:3] if b != "?"]
+    """tiny text tip based on flop texture; very rough rules on purpose.
+       board is a list of card ids; only the flop is read."""
+    flop  = cards.to_mask(board[:3])
+    ranks = cards.rank_mask(flop)
     tip = []
 
-    if len(set(suits)) == 3:
+    if sum(1 for c in cards.suit_counts(flop) if c) == 3:
         tip.append("Rainbow flop: Flush draws impossible.")
     else:
         tip.append("Two-tone: Flush draws possible, extra caution needed.")
 
-    if any(r in ['A','K','Q','J','T'] for r in ranks) and any(r in ['2','3','4','5','6','7'] for r in ranks):
+    if ranks & HIGH_RANKS and ranks & LOW_RANKS:
         tip.append("High card + low card: Aggression can fold out many weak hands.")
 
-    if "J" in ranks and "T" in ranks:
+    if ranks & JT_RANKS == JT_RANKS:
         tip.append("Watch out for straight draws (QK, 98, etc).")
 
-    if len(set(ranks)) < len(ranks):
+    if ranks.bit_count() < len(board[:3]):
         tip.append("Paired board: Sets and two-pair more likely.")
 
+    pattern, paired = flop_texture(board[:3])
+    tip.append(f"({pattern}{', paired' if paired else ''} flops come up "
+               f"{texture_shares()[pattern, paired]:.0%} of the time.)")
+
     return " ".join(tip) if tip else "Standard flop—play balanced."
 
 
@@ -118,25 +172,41 @@ def get_strategy_hint(street, scenario):
 
 
 def get_winrate_curve(scenario, street):
-    """mock equity curves; hero up, villains down. visual effect only."""
-    hero = np.clip(np.linspace(0.42, 0.87, 4), 0, 1)
-
-    # note: if no 'players' key, default to 4 players (3 villains).
-    # tiny quirk: using SCENARIOS[0] as default source; I keep it as-is (do not change logic).
-    num_villains = max(1, (SCENARIOS[0].get('players', 4) - 1))
-
-    villains = [np.clip(np.linspace(0.58, 0.13, 4), 0, 1) for _ in range(num_villains)]
-    return hero[:street + 2], [vill[:street + 2] for vill in villains]
+    """exact equity per street (hero, then each villain), up to the current street.
+       computed once per scenario at import; see utils/equity.py."""
+    hero, villains = scenario["equity"]
+    return hero[:street + 1], [v[:street + 1] for v in villains]
 
 
 def get_handtype_dist(scenario, street):
-    """pie slices by street; not from a solver, just for teaching."""
-    stage = ["Flop", "Turn", "River"][street]
-    if stage == "Flop":
-        return {"Top Pair": 0.45, "Draw": 0.25, "Middle Pair": 0.15, "Air": 0.15}
-    if stage == "Turn":
-        return {"Top Pair": 0.35, "Draw": 0.15, "Made Hand": 0.30, "Air": 0.20}
-    return {"Top Pair": 0.2, "Made Hand": 0.55, "Missed": 0.25}
+    """exact share of your final hand type over every runout left (your view: villain
+       cards are unknown). turn / river just filter the flop enumeration."""
+    return equity.handtype_distribution(scenario["hole_ids"], scenario["board_ids"], street)
+
+
+CUSTOM_BUDGET_MS = 150     # the custom-spot callback never spends longer than this on equity
+
+
+def parse_villain(text):
+    """villain input -> list of combos, or None for an empty seat. raises ValueError."""
+    text = (text or "").strip()
+    if not text:
+        return None
+    if text == "?":
+        text = "random"
+    try:
+        hand = cards.parse_cards(text)
+        if len(hand) == 2:
+            return [hand]
+    except ValueError:
+        pass
+    try:
+        combos = Range.parse(text).combos()
+    except ValueError:
+        raise ValueError(f"could not read villain hand {text!r}") from None
+    if not combos:
+        raise ValueError(f"could not read villain hand {text!r}")
+    return combos
 
 
 def get_quiz_for_scenario(scenario, street):
@@ -200,6 +270,28 @@ layout = dbc.Container([
         dbc.Col([html.Div(id="chapter4-quiz-block", style={'marginTop': '8px'})], width=5)
     ]),
 
+    html.Hr(),
+
+    # custom spot: any hand vs up to three villains on any partial board
+    html.H4("Try Your Own Spot"),
+    html.Div(
+        "Villains can be exact cards (K♣Q♦ or KcQd), ranges (QQ+, ATs+, 76s-54s), or 'random'. "
+        "Leave a villain empty to leave that seat out. Board: 0, 3, 4 or 5 cards.",
+        style={'fontSize': '15px', 'color': '#555', 'marginBottom': '8px'}
+    ),
+    dbc.Row([
+        dbc.Col([html.Label("Your hand"), dbc.Input(id="chapter4-custom-hero", value="A♠ J♠")], width=2),
+        dbc.Col([html.Label("Villain 1"), dbc.Input(id="chapter4-custom-v1", value="K♣ Q♦")], width=2),
+        dbc.Col([html.Label("Villain 2"), dbc.Input(id="chapter4-custom-v2", value="random")], width=2),
+        dbc.Col([html.Label("Villain 3"), dbc.Input(id="chapter4-custom-v3", value="")], width=2),
+        dbc.Col([html.Label("Board"),     dbc.Input(id="chapter4-custom-board", value="J♣ 7♠ 5♦")], width=2),
+        dbc.Col([dbc.Button("Calculate", id="chapter4-custom-run", color="primary", style={'marginTop': '24px'})], width=2),
+    ]),
+    dbc.Row([
+        dbc.Col([dcc.Graph(id="chapter4-custom-graph", style={'height': '240px'})], width=8),
+        dbc.Col([html.Div(id="chapter4-custom-summary", style={'fontSize': '15px', 'marginTop': '20px'})], width=4),
+    ]),
+
     html.Hr(),
     html.Div([
         dcc.Link("← Previous: Table Position & Strategy Visualization", href="/chapter-3", style={'marginRight': '40px'}),
@@ -263,10 +355,10 @@ def register_callbacks(app):
             idx = 0
 
         scenario = SCENARIOS[idx]
-        board    = scenario["board"]
+        board    = scenario["board_ids"]
 
-        visual = get_board_visual(scenario["hole"], scenario["villain_hands"],
-                                  board, street, scenario.get("players", 4))
+        visual = get_board_visual(scenario["hole_ids"], scenario["villain_ids"],
+                                  board, street, scenario["players"])
 
         hero, villains = get_winrate_curve(scenario, street)
 
@@ -287,7 +379,7 @@ def register_callbacks(app):
 
         dist = get_handtype_dist(scenario, street)
         pie_fig = go.Figure(data=[go.Pie(labels=list(dist.keys()), values=list(dist.values()),
-                                         hole=.45, marker=dict(colors=["#43A047","#1E88E5","#fb8c00","#bdbdbd"]))])
+                                         hole=.45, marker=dict(colors=[HANDTYPE_COLORS[k] for k in dist]))])
         pie_fig.update_layout(height=210, margin=dict(l=8, r=8, t=28, b=12), title="Your Hand Type Dist.")
 
         tip  = get_board_texture_tip(board)
@@ -310,6 +402,63 @@ def register_callbacks(app):
         return visual, fig, pie_fig, tip, strat, quiz_block
 
 
+    # custom spot: exact when small, otherwise monte carlo inside CUSTOM_BUDGET_MS
+    @app.callback(
+        Output("chapter4-custom-graph", "figure"),
+        Output("chapter4-custom-summary", "children"),
+        Input("chapter4-custom-run", "n_clicks"),
+        State("chapter4-custom-hero", "value"),
+        State("chapter4-custom-v1", "value"),
+        State("chapter4-custom-v2", "value"),
+        State("chapter4-custom-v3", "value"),
+        State("chapter4-custom-board", "value")
+    )
+    def custom_spot(_, hero_txt, v1, v2, v3, board_txt):
+        empty = go.Figure()
+        empty.update_layout(template="plotly_white", height=240, margin=dict(l=30, r=20, t=30, b=30))
+        try:
+            hero  = cards.parse_cards(hero_txt or "")
+            board = cards.parse_cards(board_txt or "") if (board_txt or "").strip() else []
+            seats = [(f"Villain {i+1}", parse_villain(v)) for i, v in enumerate([v1, v2, v3])]
+            seats = [(name, combos) for name, combos in seats if combos is not None]
+        except ValueError as e:
+            return empty, html.Span(str(e), style={'color': '#E53935'})
+
+        if len(hero) != 2 or len(board) not in (0, 3, 4, 5) or not seats:
+            return empty, html.Span("Need 2 hole cards, at least one villain and 0/3/4/5 board cards.",
+                                    style={'color': '#E53935'})
+        if len(set(hero + board)) != len(hero + board):
+            return empty, html.Span("A card is used twice.", style={'color': '#E53935'})
+
+        # drop villain combos that clash with hero / board (card removal)
+        known = cards.to_mask(hero + board)
+        seats = [(name, [c for c in combos if not cards.to_mask(c) & known]) for name, combos in seats]
+        if any(not combos for _, combos in seats):
+            return empty, html.Span("A villain hand clashes with your cards or the board.", style={'color': '#E53935'})
+
+        try:
+            res = equity.equity_anytime(hero, [combos for _, combos in seats], board, budget_ms=CUSTOM_BUDGET_MS)
+        except ValueError as e:
+            return empty, html.Span(str(e), style={'color': '#E53935'})
+
+        names = ["You"] + [name for name, _ in seats]
+        fig = go.Figure(go.Bar(
+            x=names, y=res["equity"],
+            error_y=dict(type="data", array=res["half_width"], visible=res["method"] == "monte"),
+            marker_color=["#43A047"] + ["#1E88E5"] * len(seats),
+            text=[f"{e:.1%}" for e in res["equity"]], textposition="outside"
+        ))
+        fig.update_layout(title="Equity", yaxis=dict(range=[0, 1.1], tickformat=".0%"),
+                          template="plotly_white", height=240, margin=dict(l=30, r=20, t=34, b=30))
+
+        if res["method"] == "exact":
+            how = f"Exact: all {res['samples']:,} deals enumerated"
+        else:
+            how = (f"Monte Carlo: {res['samples']:,} deals in {res['elapsed_ms']:.0f} ms, "
+                   f"95% CI ±{res['half_width'][0]:.1%} for you")
+        return fig, how
+
+
     # quiz feedback
     @app.callback(
         Output("chapter4-quiz-feedback", "children"),
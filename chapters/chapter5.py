@@ -1,4 +1,3 @@
-# TODO(r): revisit shrink factors after we add real data
 # chapter_5.py - Poker Range Filtering Visualization (robust, human-notes)
 from dash import dcc, html, Input, Output, State, callback_context
 import dash_bootstrap_components as dbc
@@ -6,6 +5,11 @@ import plotly.graph_objects as go
 import numpy as np
 import pandas as pd
 
+from utils import cards
+from utils.narrowing import narrow, BUCKETS
+from utils.preflop_data import top_classes
+from utils.ranges import Range
+
 
 # --------------------------- Basic Hand Grid and Classification ---------------------------
 # build a 13x13 matrix for starting hands
@@ -31,68 +35,70 @@ for i, r in enumerate(hand_order):
 
 
 
-# --- Top 15% Starting Hand Example (just a tiny preset to play with) ---
-top_15_range = set([
-    'AA','KK','QQ','JJ','TT','99','88','AKs','AKo','AQs','AQo','AJs','AJo',
-    'KQs','KQo','KJs','KJo','QJs','QJo','ATs','KTs','QTs','JTs','A9s','JTo'
-])
+# --- Top ~13% Starting Hand Example (just a tiny preset to play with) ---
+# same 25 hands as before, now as real combos (AKo = 12, AKs = 4, AA = 6)
+TOP_15_TEXT = "88+, AQ+, AJ, KQ, KJ, QJ, ATs, KTs, QTs, JTs, A9s, JTo"
+top_15_range = Range.parse(TOP_15_TEXT)
+
+# --- example board the line is played on (flop + turn) ---
+DEFAULT_BOARD = "K♠ 9♥ 4♦ 7♣"
+BOARD_PRESETS = {
+    "Dry high card":  "K♠ 9♥ 4♦ 7♣",
+    "Wet two-tone":   "J♥ T♥ 8♣ 2♦",
+    "Paired low":     "7♠ 7♦ 3♣ Q♥",
+    "Monotone":       "A♦ 8♦ 5♦ K♣",
+}
+BUCKET_COLORS = ["#2e7d32", "#43a047", "#9ccc65", "#1e88e5", "#90caf9", "#bdbdbd"]
+STAGE_LABELS = {"Start": "All combos", "Preflop": "Preflop Raise", "CBet": "Flop C-Bet", "Turn": "Turn Barrel"}
+
 
-# quick-n-dirty tags. simple buckets, nothing fancy.
-hand_type_dict = {}
-for h in labels:
-    if h in ['AA','KK','QQ','JJ','TT','99','88']:
-        hand_type_dict[h] = 'Strong Pair'
-    elif 's' in h and h[0] in 'AKQJ' and h[1] in 'AKQJ':
-        hand_type_dict[h] = 'Suited Broadway'
-    elif h in ['AK','AQ','KQ','AJ','KJ']:   # note: these are bare codes; keeping as-is on purpose
-        hand_type_dict[h] = 'Offsuit Broadway'
-    elif h in ['A5s','A4s','A3s','A2s','KTs','QTs','JTs']:
-        hand_type_dict[h] = 'Suited Connector'
-    else:
-        hand_type_dict[h] = 'Air/Other'
 
+def parse_board(text):
+    """board text -> list of 3 or 4 card ids, or None if it cannot be read."""
+    try:
+        board = cards.parse_cards(text or "")
+    except ValueError:
+        return None
+    if len(board) not in (3, 4) or len(set(board)) != len(board):
+        return None
+    return board
 
 
-def get_range(filters):
-    """Filter hand range by action sequence. Return initial range if no actions.
-       tiny rule set: keep behavior exactly as before."""
-    r = set(top_15_range)
-    if not filters:
-        return r
+def preflop_range(source, pct, players, metric):
+    """the raiser's starting range: the hand-picked preset or "top X%" from the csv."""
+    if source == "percent":
+        return Range.from_classes(top_classes(pct or 0, int(players or 6), metric or "win"))
+    return top_15_range
 
-    # after a flop c-bet → keep stronger made hands and good draws
-    if "CBet" in filters:
-        r = {h for h in r if (hand_type_dict[h] in ['Strong Pair','Suited Broadway','Suited Connector'])}
 
-    # after turn barrel → even tighter
-    if "Turn" in filters:
-        r = {h for h in r if (hand_type_dict[h] in ['Strong Pair','Suited Broadway'])}
+def get_range(filters, board, start=None):
+    """narrow the raising range along the action line on this board.
+       no preflop raise → start from any two cards. returns the stage list."""
+    start = top_15_range if start is None else start
+    filters = filters or []
+    if "PFR" not in filters:
+        stages = narrow(Range.full().weights, board, filters)
+        stages[0] = dict(stages[0], name="Start")
+        return stages
 
-    return r
+    # a leading stage with every live combo, so the sankey starts from the deck
+    everything = narrow(Range.full().weights, board, [])[0]
+    return [dict(everything, name="Start")] + narrow(start.weights, board, filters)
 
 
 
-def hand_matrix_figure(current_range):
+def hand_matrix_figure(weights):
     """Generate dynamic matrix highlighting filtered hands (robust).
-       1 = highlight, 0 = dim."""
-    z = []
-    for i, r in enumerate(hand_order):
-        row = []
-        for j, c in enumerate(hand_order):
-            h = matrix_hands[i][j]
-            row.append(1 if h in current_range else 0)
-        z.append(row)
-
-    # guard: if nothing selected, still render a valid matrix
-    if sum(sum(row) for row in z) == 0:
-        z = [[0]*n for _ in range(n)]
+       cell = share of that hand's combos still in range (1 = highlight, 0 = dim)."""
+    z = Range(weights).class_weights().reshape(n, n).tolist()
 
     colorscale = [[0, '#E0E0E0'], [1, '#29B6F6']]
 
     fig = go.Figure(go.Heatmap(
         z=z, x=hand_order, y=hand_order, colorscale=colorscale, showscale=False,
-        hoverinfo='x+y+z',
-        hovertemplate='<b>%{y}%{x}</b> <extra></extra>'   # show like "KAo" etc.
+        zmin=0, zmax=1,
+        customdata=matrix_hands,
+        hovertemplate='<b>%{customdata}</b>: %{z:.0%} in range<extra></extra>'
     ))
     fig.update_layout(
         title="Hand Combination Matrix – Highlighted: Current Opponent Range",
@@ -102,77 +108,59 @@ def hand_matrix_figure(current_range):
 
 
 
-def sankey_figure(filters, cur_count, total_count):
-    """Build a small Sankey to show the narrowing process.
-       Note: numbers are illustrative; keep original math."""
-    stages = ['Start', 'PFR', 'CBet', 'Turn']
-    selected = ['Start']
-
-    if "PFR"  in filters: selected.append("PFR")
-    if "CBet" in filters: selected.append("CBet")
-    if "Turn" in filters: selected.append("Turn")
-
-    vals = [total_count]
-    cur  = total_count
+def sankey_figure(stages):
+    """Sankey of the narrowing: each stage keeps some combos, the rest drop out.
+       all numbers are real (weighted) combo counts on this board."""
+    names = [STAGE_LABELS.get(s["name"], s["name"]) for s in stages]
+    totals = [float(s["weights"].sum()) for s in stages]
 
-    # shrink factors (kept as-is, just annotated)
-    shrink = [1, 0.15, 0.08, 0.05]
-    for i, s in enumerate(["PFR", "CBet", "Turn"]):
-        if s in filters:
-            cur = int(cur * shrink[i+1] / shrink[i])
-            vals.append(cur)
-
-    # if user toggles oddly, make sure we still have a last value
-    if len(vals) < len(selected):
-        vals.append(cur_count)
-
-    # if only start is selected, add a PFR step to make the flow visible
-    if len(selected) == 1:
-        vals = [total_count, cur_count]
-        selected.append("PFR")
+    node_labels = [f"{nm}: {t:.0f}" for nm, t in zip(names, totals)]
+    source, target, value, color = [], [], [], []
+    for i in range(len(stages) - 1):
+        kept, dropped = totals[i + 1], totals[i] - totals[i + 1]
+        source.append(i); target.append(i + 1); value.append(kept); color.append("rgba(41,182,246,0.5)")
+        if dropped > 0:
+            node_labels.append(f"Out before {names[i + 1]}: {dropped:.0f}")
+            source.append(i); target.append(len(node_labels) - 1); value.append(dropped)
+            color.append("rgba(189,189,189,0.5)")
 
     fig = go.Figure(go.Sankey(
         arrangement="snap",
         node=dict(
             pad=15, thickness=22, line=dict(color="black", width=0.5),
-            label=[s for s in selected],
-            color=["#90caf9"] * len(selected)
+            label=node_labels,
+            color=["#90caf9"] * len(stages) + ["#e0e0e0"] * (len(node_labels) - len(stages))
         ),
-        link=dict(
-            source=list(range(len(selected)-1)),
-            target=list(range(1, len(selected))),
-            value=[v for v in vals[1:]]
-        )
+        link=dict(source=source, target=target, value=value, color=color)
     ))
-    fig.update_layout(title="Range Narrowing Process (Sankey)",
+    fig.update_layout(title="Range Narrowing Process (Sankey, combos)",
                       height=300, margin=dict(l=10, r=10, t=30, b=10))
     return fig
 
 
 
-def quality_stats_panel(current_range):
-    """Range composition text + pie (fallback safe)."""
-    counts = {"Strong Pair":0, "Suited Broadway":0, "Suited Connector":0, "Air/Other":0}
-    for h in current_range:
-        counts[hand_type_dict[h]] += 1
+def quality_stats_panel(stage):
+    """Range composition on the current street: combos per made-hand / draw bucket."""
+    counts = dict(zip(BUCKETS, stage["counts"].tolist()))
 
-    total = sum(counts.values())
+    total = float(stage["weights"].sum())
     shown_total = total if total > 0 else 1   # avoid divide-by-zero
 
     # simple text block. I like preformatted because it lines up nicely.
-    text = f"Remaining hand types: {total}, covering approximately {100*total/169:.1f}% of all starting hands\n"
+    text = (f"Remaining combos: {total:g} of 1326, covering approximately "
+            f"{100*total/1326:.1f}% of all starting hands\n")
     for k in counts:
-        text += f"{k}: {counts[k]} combos, {100*counts[k]/shown_total:.1f}%\n"
+        text += f"{k}: {counts[k]:g} combos, {100*counts[k]/shown_total:.1f}%\n"
 
     # pie needs at least one non-zero
     safe_values = list(counts.values())
     if sum(safe_values) == 0:
-        safe_values = [1, 0, 0, 0]
+        safe_values = [0] * (len(BUCKETS) - 1) + [1]
 
     fig = go.Figure(data=[go.Pie(
         labels=list(counts.keys()), values=safe_values,
-        marker_colors=["#43a047","#1e88e5","#fbc02d","#bdbdbd"],
-        textinfo='label+percent', hole=.4
+        marker_colors=BUCKET_COLORS,
+        textinfo='label+percent', hole=.4, sort=False
     )])
     fig.update_layout(height=220, margin=dict(t=10, b=10, l=10, r=10))
     return text, fig
@@ -187,7 +175,8 @@ header = html.H2(
 
 intro = html.P(
     "This module shows how opponent ranges shrink as actions progress. "
-    "The matrix, the Sankey flow, and the small pie help you build intuition."
+    "The matrix, the Sankey flow, and the small pie help you build intuition. "
+    "Pick a board: every hand is sorted into made hands and draws on it, and all numbers are real combo counts."
 )
 
 checkboxes = dbc.Checklist(
@@ -201,6 +190,34 @@ checkboxes = dbc.Checklist(
     inline=True
 )
 
+board_controls = dbc.Row([
+    dbc.Col([html.Label("Board (flop + turn)"),
+             dbc.Input(id="ch5-board", value=DEFAULT_BOARD, debounce=True)], width=3),
+    dbc.Col([html.Label("Board presets"),
+             dcc.Dropdown(id="ch5-board-preset",
+                          options=[{"label": k, "value": v} for k, v in BOARD_PRESETS.items()],
+                          value=DEFAULT_BOARD, clearable=False)], width=3),
+], style={"marginTop": "10px"})
+
+range_controls = dbc.Row([
+    dbc.Col([html.Label("Raising range"),
+             dbc.RadioItems(id="ch5-range-source",
+                            options=[{"label": "Hand-picked preset", "value": "preset"},
+                                     {"label": "Top X% of hands", "value": "percent"}],
+                            value="preset")], width=3),
+    dbc.Col([html.Label("Top X% (by the chapter 2 table)"),
+             dcc.Slider(id="ch5-range-pct", min=1, max=100, step=1, value=15,
+                        marks={p: f"{p}%" for p in (1, 5, 10, 15, 25, 50, 75, 100)})], width=5),
+    dbc.Col([html.Label("Ranked for"),
+             dcc.Dropdown(id="ch5-range-players",
+                          options=[{"label": f"{p} players", "value": p} for p in range(2, 11)],
+                          value=6, clearable=False)], width=2),
+    dbc.Col([html.Label("Ranked by"),
+             dcc.Dropdown(id="ch5-range-metric",
+                          options=[{"label": "Win rate", "value": "win"}, {"label": "EV", "value": "ev"}],
+                          value="win", clearable=False)], width=2),
+], style={"marginTop": "10px"})
+
 preset_buttons = html.Div([
     dbc.Button("Tight Aggressive: PFR+CBet", id="preset-tight", color="primary",   outline=True, className="me-2"),
     dbc.Button("Loose Passive: Only PFR",    id="preset-loose", color="secondary", outline=True),
@@ -221,6 +238,8 @@ layout = dbc.Container([
     header,
     intro,
     checkboxes,
+    board_controls,
+    range_controls,
     preset_buttons,
 
     dbc.Row([
@@ -255,22 +274,45 @@ def register_callbacks(app):
 
 
 
+    @app.callback(
+        Output("ch5-board", "value"),
+        Input("ch5-board-preset", "value"),
+        prevent_initial_call=True
+    )
+    def apply_board_preset(board_text):
+        return board_text
+
+
+
     @app.callback(
         [Output("range-matrix", "figure"),
          Output("sankey-flow", "figure"),
          Output("range-stats", "children"),
          Output("range-quality-chart", "figure")],
-        Input("filter-actions", "value")
+        Input("filter-actions", "value"),
+        Input("ch5-board", "value"),
+        Input("ch5-range-source", "value"),
+        Input("ch5-range-pct", "value"),
+        Input("ch5-range-players", "value"),
+        Input("ch5-range-metric", "value")
     )
-    def update_visuals(selected_filters):
+    def update_visuals(selected_filters, board_text, source="preset", pct=15, players=6, metric="win"):
+        # unreadable board → fall back to the default one and say so
+        board = parse_board(board_text)
+        note = ""
+        if board is None:
+            board = parse_board(DEFAULT_BOARD)
+            note = f"Could not read board {board_text!r} (need 3 or 4 cards), showing {DEFAULT_BOARD}.\n\n"
+
         # compute current range → then update all three visuals
-        cur_range = get_range(selected_filters)
+        stages = get_range(selected_filters, board, preflop_range(source, pct, players, metric))
+        cur = stages[-1]
 
-        fig_matrix = hand_matrix_figure(cur_range)
-        sankey     = sankey_figure(selected_filters, len(cur_range), 169)
-        text, qual_fig = quality_stats_panel(cur_range)
+        fig_matrix = hand_matrix_figure(cur["weights"])
+        sankey     = sankey_figure(stages)
+        text, qual_fig = quality_stats_panel(cur)
 
-        return fig_matrix, sankey, text, qual_fig
+        return fig_matrix, sankey, note + text, qual_fig
 
 
 
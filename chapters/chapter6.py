@@ -1,6 +1,7 @@
 # chapters/chapter6.py
-from dash import dcc, html, Input, Output
+from dash import dcc, html, Input, Output, State, ClientsideFunction
 import plotly.graph_objs as go
+import plotly.io as pio
 
 # simple slider config (pot-size bet as a ratio)
 slider_marks = {0: '0%', 0.25: '25%', 0.5: '50%', 1: '100%', 1.5: '150%'}
@@ -43,6 +44,51 @@ def get_warning(bet_pot_ratio):
     return ""
 
 
+def update_bluff_pie(bet_pot_ratio):
+    """
+    main updater (runs in the browser, assets/chapter6.js; this is the reference
+    it is checked against with python -m utils.clientside_check):
+    - compute value/bluff mix
+    - draw a donut chart
+    - write small text lines
+    """
+    value_ratio, bluff_ratio = calc_bluff_ratio(bet_pot_ratio)
+
+    labels = ['Value bet', 'Bluff']
+    values = [value_ratio, bluff_ratio]
+
+    # Okabe–Ito colorblind-friendly pair (blue/orange)
+    # Value = blue, Bluff = orange
+    colors = ['#0072B2', '#E69F00']
+
+    fig = go.Figure(data=[go.Pie(
+        labels=labels, values=values, hole=0.45,
+        marker=dict(colors=colors),
+        textinfo='label+percent', sort=False,
+        pull=[0.01, 0.01]
+    )])
+
+    fig.update_layout(
+        showlegend=True,
+        legend=dict(orientation='h', y=-0.13, x=0.21, font=dict(size=15)),
+        margin=dict(l=10, r=10, t=20, b=20),
+        annotations=[dict(
+            text=f"{int(round(value_ratio*100))}% : {int(round(bluff_ratio*100))}%",
+            x=0.5, y=0.5, font_size=28, showarrow=False
+        )]
+    )
+
+    ratio_str   = f"Current bet size: {int(round(bet_pot_ratio*100))}% of pot — Value bet: {int(round(value_ratio*100))}%, Bluff: {int(round(bluff_ratio*100))}%"
+    example_str = get_example(value_ratio, bluff_ratio, value_count=30)
+    warning     = get_warning(bet_pot_ratio)
+
+    return fig, ratio_str, example_str, warning
+
+
+# plotly.js has no named templates; the browser gets the one python figures use
+PIE_TEMPLATE = pio.templates[pio.templates.default].to_plotly_json()
+
+
 # keep all ids with prefix "chapter6-" so they do not clash with other chapters
 layout = html.Div([
 
@@ -76,6 +122,7 @@ layout = html.Div([
     ], style={'margin': '18px 0 16px 0'}),
 
     dcc.Graph(id='chapter6-bluff-pie',      style={'height': '330px'}),
+    dcc.Store(id='chapter6-template', data=PIE_TEMPLATE),
 
     html.Div(id='chapter6-ratio-output',    style={'fontSize': '18px', 'marginTop': '18px'}),
     html.Div(id='chapter6-example-output',  style={'fontSize': '16px', 'margin': '8px 0 0 0', 'color': '#23689b'}),
@@ -102,52 +149,17 @@ layout = html.Div([
 # register interactions
 def register_callbacks(app):
 
-    @app.callback(
+    # b / (1 + b) is arithmetic: done in the browser, the slider never waits on the server
+    app.clientside_callback(
+        ClientsideFunction(namespace='chapter6', function_name='update_bluff_pie'),
         Output('chapter6-bluff-pie', 'figure'),
         Output('chapter6-ratio-output', 'children'),
         Output('chapter6-example-output', 'children'),
         Output('chapter6-warning-output', 'children'),
-        Input('chapter6-bet-slider', 'value')
+        Input('chapter6-bet-slider', 'value'),
+        State('chapter6-template', 'data')
     )
-    def update_bluff_pie(bet_pot_ratio):
-        """
-        main updater:
-        - compute value/bluff mix
-        - draw a donut chart
-        - write small text lines
-        """
-        value_ratio, bluff_ratio = calc_bluff_ratio(bet_pot_ratio)
-
-        labels = ['Value bet', 'Bluff']
-        values = [value_ratio, bluff_ratio]
-
-        # Okabe–Ito colorblind-friendly pair (blue/orange)
-        # Value = blue, Bluff = orange
-        colors = ['#0072B2', '#E69F00']
-
-        fig = go.Figure(data=[go.Pie(
-            labels=labels, values=values, hole=0.45,
-            marker=dict(colors=colors),
-            textinfo='label+percent', sort=False,
-            pull=[0.01, 0.01]
-        )])
-
-        fig.update_layout(
-            showlegend=True,
-            legend=dict(orientation='h', y=-0.13, x=0.21, font=dict(size=15)),
-            margin=dict(l=10, r=10, t=20, b=20),
-            annotations=[dict(
-                text=f"{int(round(value_ratio*100))}% : {int(round(bluff_ratio*100))}%",
-                x=0.5, y=0.5, font_size=28, showarrow=False
-            )]
-        )
-
-        ratio_str   = f"Current bet size: {int(round(bet_pot_ratio*100))}% of pot — Value bet: {int(round(value_ratio*100))}%, Bluff: {int(round(bluff_ratio*100))}%"
-        example_str = get_example(value_ratio, bluff_ratio, value_count=30)
-        warning     = get_warning(bet_pot_ratio)
-
-        return fig, ratio_str, example_str, warning
 
 
 # optional, I like being explicit when importing modules elsewhere
-__all__ = ["layout", "register_callbacks"]
+__all__ = ["layout", "register_callbacks", "update_bluff_pie"]
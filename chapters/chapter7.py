@@ -1,13 +1,40 @@
 # chapters/chapter7.py
-from dash import dcc, html, Input, Output, State
+from urllib.parse import urlencode, parse_qs
+from dash import dcc, html, Input, Output, State, ctx, no_update
 import dash_bootstrap_components as dbc
 import plotly.graph_objs as go
 import numpy as np
 
+from utils import bankroll, risk, sim_cache
+from utils.downsample import merge_paths
+
+
+# hands per simulated step (the model is the same, the curve just gets finer)
+GRANULARITY = [{"label": "per hand", "value": 1}, {"label": "per 10 hands", "value": 10},
+               {"label": "per 100 hands", "value": 100}]
+MAX_HANDS = 10_000_000
+MAX_SIMS = 20_000
+# "fan" streams the simulations into per-step percentiles (memory ~ steps, not sims), so its
+# limit is time, not memory: 200k sims of the shortest useful curve run in about 0.5 s
+# (bankroll.FAN_MAX_CELLS). "paths" only ever draws KEEP_PATHS curves, so it keeps the old cap
+MAX_FAN_SIMS = 200_000
+VIEWS = [{"label": "Every curve", "value": "paths"}, {"label": "Percentile fan", "value": "fan"}]
+RISK_SIMS = 5000                 # simulations behind the risk-of-ruin curve (every roll size shares them)
+# move-down walks every roll size step by step, so its cells are sims x rolls x steps
+MOVE_DOWN_SIMS = bankroll.MAX_CELLS // (len(risk.BUYIN_GRID) * bankroll.MIN_STEPS)
+
+# one run = these fields; they go in the URL (?winrate=2&...&seed=...) and key the cache
+REQUEST_FIELDS = {"winrate": float, "stdev": float, "hands": int, "sims": int, "seed": int,
+                  "hands_per_step": int, "view": str, "stop_loss": int, "move_down": int}
+
 
 # layout: keep ids the same so other modules work
 layout = dbc.Container([
 
+    # chapter-local url: ?winrate=..&seed=.. reruns (or re-reads from the cache) a shared result
+    dcc.Location(id="chapter7-url", refresh=False),
+    dcc.Store(id="chapter7-request"),
+
     html.H2("Chapter 7: Variance and Bankroll Management",
             style={'fontSize': '36px', 'fontWeight': 'bold', 'textAlign': 'center'}),
 
@@ -33,14 +60,32 @@ layout = dbc.Container([
 
             html.Div([
                 html.Label("Hands to Simulate:", style={'marginRight': '6px'}),
-                dcc.Input(id="chapter7-numhands", type="number", value=5000, min=500, max=100000, step=100,
+                dcc.Input(id="chapter7-numhands", type="number", value=5000, min=500, max=MAX_HANDS, step=100,
                           style={'width': '100px', 'marginRight': '18px'}),
             ], style={"marginBottom": "8px"}),
 
             html.Div([
                 html.Label("Simulations:", style={'marginRight': '6px'}),
-                dcc.Input(id="chapter7-numsim", type="number", value=50, min=10, max=200, step=1,
+                dcc.Input(id="chapter7-numsim", type="number", value=50, min=10, max=MAX_SIMS, step=1,
                           style={'width': '80px'}),
+            ], style={"marginBottom": "8px"}),
+
+            html.Div([
+                html.Label("Step:", style={'marginRight': '6px'}),
+                dcc.Dropdown(id="chapter7-granularity", options=GRANULARITY, value=100, clearable=False,
+                             style={'width': '160px', 'display': 'inline-block', 'verticalAlign': 'middle'}),
+            ], style={"marginBottom": "8px"}),
+
+            html.Div([
+                html.Label("Seed:", style={'marginRight': '6px'}),
+                dcc.Input(id="chapter7-seed", type="number", value=None, min=0, step=1,
+                          placeholder="random", style={'width': '120px'}),
+            ], style={"marginBottom": "8px"}),
+
+            html.Div([
+                html.Label("Show:", style={'marginRight': '6px'}),
+                dcc.RadioItems(id="chapter7-view", options=VIEWS, value="paths", inline=True,
+                               inputStyle={'marginRight': '4px'}, labelStyle={'marginRight': '12px'}),
             ], style={"marginBottom": "12px"}),
 
             dbc.Button("Run Simulation", id="chapter7-run-sim", color="primary", className="mt-1"),
@@ -53,7 +98,8 @@ layout = dbc.Container([
                 type="circle",
                 children=[
                     dcc.Graph(id="chapter7-bankroll-curves", style={"height": "390px"}),
-                    dcc.Graph(id="chapter7-end-result-hist", style={"height": "200px"})
+                    dcc.Graph(id="chapter7-end-result-hist", style={"height": "200px"}),
+                    dcc.Graph(id="chapter7-drawdown-hist", style={"height": "200px"})
                 ]
             ),
             html.Div(id="chapter7-summary-output", style={'marginTop': '18px', 'fontSize': '16px'})
@@ -62,6 +108,34 @@ layout = dbc.Container([
 
     html.Hr(),
 
+    # risk of ruin: closed form + a simulation with the bankroll rules below
+    html.H4("Risk of Ruin", style={'marginTop': '10px'}),
+    dbc.Row([
+        dbc.Col([
+            html.Div([
+                html.Label("Stop-loss (buy-ins below start):", style={'marginRight': '6px'}),
+                dcc.Input(id="chapter7-stop-loss", type="number", value=None, min=1, max=100, step=1,
+                          placeholder="off", style={'width': '70px'}),
+            ], style={"marginBottom": "8px"}),
+            html.Div([
+                html.Label("Move down below (buy-ins):", style={'marginRight': '6px'}),
+                dcc.Input(id="chapter7-move-down", type="number", value=None, min=1, max=100, step=1,
+                          placeholder="off", style={'width': '70px'}),
+            ], style={"marginBottom": "8px"}),
+            html.Div("1 buy-in = 100 BB. Moving down drops to half, then quarter stakes while the roll is short, "
+                     "and back up once it recovers. Uses the settings above; press Run Simulation.",
+                     style={'fontSize': '13px', 'color': '#666'}),
+        ], width=4),
+        dbc.Col([
+            dcc.Loading(type="circle", children=[
+                dcc.Graph(id="chapter7-ror-curve", style={"height": "320px"}),
+                html.Div(id="chapter7-risk-output", style={'marginTop': '10px', 'fontSize': '16px'})
+            ])
+        ], width=8),
+    ]),
+
+    html.Hr(),
+
     html.Div([
         html.Strong("Teaching Tip: "),
         "Poker is a long-run game! Even with a winning strategy, downswings are inevitable. "
@@ -77,99 +151,328 @@ layout = dbc.Container([
 
 
 
+# --------------------- Figures ---------------------
+def _curves_layout(fig, title="Simulated Bankroll Curves"):
+    fig.update_layout(
+        title=title,
+        xaxis_title="Hands Played",
+        yaxis_title="Net Result (BB)",
+        height=390,
+        template="plotly_white",
+        margin=dict(l=20, r=20, t=50, b=10)
+    )
+    return fig
+
+
+def paths_figure(run):
+    """every kept curve (utils.bankroll.simulate) as one webgl trace, NaN between curves."""
+    x, y = merge_paths(run["paths_x"], run["paths"])
+    fig = go.Figure()
+    fig.add_trace(go.Scattergl(
+        x=x, y=y, mode='lines', connectgaps=False,
+        line=dict(width=1, color="#0072B2"), opacity=0.4, showlegend=False
+    ))
+    return _curves_layout(fig)
+
+
+def fan_figure(summary):
+    """5-95 / 25-75 bands, median, mean and a few example paths (utils.bankroll.summarize)."""
+    x, q = summary["x"], summary["quantiles"]
+    fig = go.Figure()
+    for lo, hi, color in [(5, 95, "rgba(67,160,71,0.18)"), (25, 75, "rgba(67,160,71,0.38)")]:
+        fig.add_trace(go.Scatter(x=x, y=q[lo], mode='lines', line=dict(width=0),
+                                 showlegend=False, hoverinfo='skip'))
+        fig.add_trace(go.Scatter(x=x, y=q[hi], mode='lines', line=dict(width=0), fill='tonexty',
+                                 fillcolor=color, name=f"{lo}–{hi}%"))
+    ex_x, ex_y = merge_paths(summary["examples_x"], summary["examples"])
+    fig.add_trace(go.Scattergl(x=ex_x, y=ex_y, mode='lines', connectgaps=False, line=dict(width=1, color="#999"),
+                               opacity=0.6, showlegend=False, hoverinfo='skip'))
+    fig.add_trace(go.Scatter(x=x, y=q[50], mode='lines', line=dict(width=2.5, color="#1B5E20"), name="Median"))
+    fig.add_trace(go.Scatter(x=x, y=summary["mean"], mode='lines',
+                             line=dict(width=1.5, color="#0072B2", dash="dash"), name="Mean"))
+    fig.update_layout(legend=dict(orientation="h", y=1.02, x=1, xanchor="right", yanchor="bottom"))
+    return _curves_layout(fig, "Bankroll Percentiles")
+
+
+def bars_figure(counts, edges, title, xaxis_title, color):
+    """histogram from counts already binned on the server."""
+    fig = go.Figure()
+    fig.add_trace(go.Bar(
+        x=(edges[:-1] + edges[1:]) / 2, y=counts, width=np.diff(edges),
+        marker_color=color, opacity=0.82
+    ))
+    fig.update_layout(
+        title=title,
+        xaxis_title=xaxis_title,
+        yaxis_title="Frequency",
+        height=200, bargap=0,
+        template="plotly_white",
+        margin=dict(l=20, r=20, t=38, b=10)
+    )
+    return fig
+
+
+def _final_stats(run):
+    """win / loss counts, extremes, mean and median of the final results, both views."""
+    if "paths" in run:
+        end_vals = run["final"]
+        return {"win": int(np.sum(end_vals > 0)), "loss": int(np.sum(end_vals < 0)),
+                "max": float(np.max(end_vals)), "min": float(np.min(end_vals)),
+                "mean": float(np.mean(end_vals)), "median": float(np.median(end_vals)),
+                "dd_max": float(run["drawdown"].max()), "dd_mean": float(run["drawdown"].mean())}
+    return dict(run["final"], mean=float(run["mean"][-1]), median=float(run["quantiles"][50][-1]),
+                dd_max=run["dd_max"], dd_mean=run["dd_mean"])
+
+
+
+def ror_figure(res, winrate, stdev, hands):
+    """risk of ruin against the starting roll: closed form (this run / forever) and simulated."""
+    bb = res["buyins"] * risk.BUY_IN
+    fig = go.Figure()
+    fig.add_trace(go.Scatter(x=res["buyins"], y=risk.ruin_probability(bb, winrate, stdev, hands) * 100,
+                             mode='lines', line=dict(color="#0072B2", width=2), name=f"Formula ({hands:,} hands)"))
+    fig.add_trace(go.Scatter(x=res["buyins"], y=risk.ruin_probability(bb, winrate, stdev) * 100,
+                             mode='lines', line=dict(color="#0072B2", width=1.5, dash="dot"), name="Formula (forever)"))
+    fig.add_trace(go.Scatter(x=res["buyins"], y=res["ruin"] * 100, mode='lines+markers',
+                             line=dict(color="#D84315", width=2), marker=dict(size=6), name="Simulated, with rules"))
+    if res["stopped"].any():
+        fig.add_trace(go.Scatter(x=res["buyins"], y=res["stopped"] * 100, mode='lines+markers',
+                                 line=dict(color="#E69F00", width=1.5, dash="dash"), name="Stopped out"))
+    fig.update_layout(
+        title="Chance of Going Broke by Starting Bankroll",
+        xaxis_title="Starting bankroll (buy-ins)",
+        yaxis=dict(title="Probability (%)", range=[0, 100]),
+        height=320,
+        template="plotly_white",
+        legend=dict(orientation="h", y=-0.25),
+        margin=dict(l=20, r=20, t=50, b=10)
+    )
+    return fig
+
+
+
+def _per(hands_per_step):
+    return "per hand" if hands_per_step == 1 else f"per {hands_per_step:,} hands"
+
+
+def request_from_query(search):
+    """?winrate=2&stdev=90&... -> request dict, or None when the query is not a run."""
+    q = {k: v[0] for k, v in parse_qs((search or "").lstrip("?")).items()}
+    if not all(k in q for k in ("winrate", "stdev", "hands", "sims", "seed")):
+        return None
+    try:
+        req = {k: conv(q[k]) for k, conv in REQUEST_FIELDS.items() if k in q}
+    except ValueError:
+        return None
+    return normalize_request(req)
+
+
+def normalize_request(req):
+    """clip to the UI limits and fill defaults, so equal runs get equal keys.
+    None for a request no run can come from (NaN / negative spread, negative
+    seed, a step outside 1..hands, a negative stop-loss / move-down)."""
+    view = req.get("view") if req.get("view") in ("paths", "fan") else "paths"
+    try:
+        winrate, stdev = float(req["winrate"]), float(req["stdev"])
+        hands = int(np.clip(req["hands"], 100, MAX_HANDS))
+        sims = int(np.clip(req["sims"], 1, MAX_FAN_SIMS if view == "fan" else MAX_SIMS))
+        hands_per_step = int(req.get("hands_per_step") or 100)
+        seed = int(req["seed"])
+        stop_loss = int(req["stop_loss"]) if req.get("stop_loss") else None
+        move_down = int(req["move_down"]) if req.get("move_down") else None
+    except (TypeError, ValueError, OverflowError):
+        return None
+    if not (np.isfinite(winrate) and np.isfinite(stdev)) or stdev < 0 or seed < 0:
+        return None
+    if not 1 <= hands_per_step <= hands or any(v is not None and v < 1 for v in (stop_loss, move_down)):
+        return None
+
+    return {
+        "winrate": winrate, "stdev": stdev, "hands": hands, "sims": sims, "seed": seed,
+        "hands_per_step": hands_per_step, "view": view, "stop_loss": stop_loss, "move_down": move_down,
+    }
+
+
+def request_query(req):
+    return "?" + urlencode({k: v for k, v in req.items() if v is not None})
+
+
+def _sim_params(req, sims=None):
+    # the cache key: exactly what the engine needs to reproduce the run
+    return {"winrate": req["winrate"], "stdev": req["stdev"], "hands": req["hands"],
+            "sims": sims or req["sims"], "seed": req["seed"], "hands_per_step": req["hands_per_step"]}
+
+
+
 # --------------------- Callback registration ---------------------
 def register_callbacks(app):
 
+    # a run starts from the button (seed from the box, or a fresh one) or from the
+    # url on page load; either way the request lands in the store and the url
     @app.callback(
-        Output("chapter7-bankroll-curves", "figure"),
-        Output("chapter7-end-result-hist", "figure"),
-        Output("chapter7-summary-output", "children"),
+        Output("chapter7-request", "data"),
+        Output("chapter7-url", "search"),
+        Output("chapter7-winrate", "value"),
+        Output("chapter7-stdev", "value"),
+        Output("chapter7-numhands", "value"),
+        Output("chapter7-numsim", "value"),
+        Output("chapter7-granularity", "value"),
+        Output("chapter7-view", "value"),
+        Output("chapter7-seed", "value"),
+        Output("chapter7-stop-loss", "value"),
+        Output("chapter7-move-down", "value"),
         Input("chapter7-run-sim", "n_clicks"),
+        Input("chapter7-url", "search"),
         State("chapter7-winrate", "value"),
         State("chapter7-stdev", "value"),
         State("chapter7-numhands", "value"),
-        State("chapter7-numsim", "value")
+        State("chapter7-numsim", "value"),
+        State("chapter7-granularity", "value"),
+        State("chapter7-view", "value"),
+        State("chapter7-seed", "value"),
+        State("chapter7-stop-loss", "value"),
+        State("chapter7-move-down", "value"),
+        State("chapter7-request", "data")
+    )
+    def make_request(n_clicks, search, winrate, stdev, numhands, numsim, hands_per_step, view, seed,
+                     stop_loss, move_down, current):
+        keep = [no_update] * 9
+        if ctx.triggered_id == "chapter7-url":
+            req = request_from_query(search)
+            if req is None or req == current:
+                return no_update, no_update, *keep
+            # show the shared parameters in the inputs too
+            return (req, no_update, req["winrate"], req["stdev"], req["hands"], req["sims"],
+                    req["hands_per_step"], req["view"], req["seed"], req["stop_loss"], req["move_down"])
+
+        if not n_clicks or winrate is None or stdev is None or numhands is None or numsim is None:
+            return no_update, no_update, *keep
+        req = normalize_request({
+            "winrate": winrate, "stdev": stdev, "hands": numhands, "sims": numsim,
+            "seed": bankroll.new_seed() if seed is None else seed,
+            "hands_per_step": hands_per_step, "view": view, "stop_loss": stop_loss, "move_down": move_down,
+        })
+        if req is None:
+            return no_update, no_update, *keep
+        return (req, request_query(req), *keep)
+
+
+
+    # the sim limit follows the view (the fan takes more)
+    @app.callback(
+        Output("chapter7-numsim", "max"),
+        Input("chapter7-view", "value")
+    )
+    def sims_limit(view):
+        return MAX_FAN_SIMS if view == "fan" else MAX_SIMS
+
+
+
+    @app.callback(
+        Output("chapter7-bankroll-curves", "figure"),
+        Output("chapter7-end-result-hist", "figure"),
+        Output("chapter7-drawdown-hist", "figure"),
+        Output("chapter7-summary-output", "children"),
+        Input("chapter7-request", "data")
     )
-    def simulate_curves(n_clicks, winrate, stdev, numhands, numsim):
+    def simulate_curves(req):
         """
-        run a simple Monte Carlo:
-        - treat result per 100 hands as Normal(winrate, stdev)
-        - accumulate to make a curve
-        - repeat many times to see variance
+        run a simple Monte Carlo (utils/bankroll.py):
+        - treat result per step as Normal(winrate, stdev) scaled to the step size
+        - all simulations at once as a matrix, cumsum along the hands
+        - "paths": plot the first curves; "fan": stream every simulation into
+          per-step percentiles, so the sim count is not bound by memory
+        - results are cached on disk by (winrate, stdev, hands, sims, seed, step)
         note: units are BB per 100 hands (BB/100)
         """
-        if not n_clicks or winrate is None or stdev is None or numhands is None or numsim is None:
+        if not req:
             # initial blank figures
-            fig1 = go.Figure(); fig2 = go.Figure()
-            return fig1, fig2, ""
-
-        winrate = float(winrate)
-        stdev   = float(stdev)
-        numhands = int(numhands)
-        numsim   = int(numsim)
-
-        # simulate in chunks of 100 hands
-        steps  = numhands // 100
-        curves = []
-        end_vals = []
-
-        for i in range(numsim):
-            per100_win = np.random.normal(loc=winrate, scale=stdev, size=steps)
-            cum_curve  = np.cumsum(per100_win)
-            full_curve = np.insert(cum_curve, 0, 0)   # start at 0 for nicer plot
-            curves.append(full_curve)
-            end_vals.append(full_curve[-1])
-
-        # bankroll curves figure
-        fig1 = go.Figure()
-        x_vals = np.arange(0, numhands + 1, 100)
-
-        for curve in curves:
-            fig1.add_trace(go.Scatter(
-                x=x_vals, y=curve, mode='lines',
-                line=dict(width=1.5), opacity=0.48, showlegend=False
-            ))
-
-        fig1.update_layout(
-            title="Simulated Bankroll Curves",
-            xaxis_title="Hands Played",
-            yaxis_title="Net Result (BB)",
-            height=390,
-            template="plotly_white",
-            margin=dict(l=20, r=20, t=50, b=10)
-        )
-
-        # histogram for final outcomes
-        fig2 = go.Figure()
-        fig2.add_trace(go.Histogram(
-            x=end_vals, nbinsx=22,
-            marker_color="#43A047", opacity=0.82
-        ))
-        fig2.update_layout(
-            title="Final Bankroll Distribution",
-            xaxis_title="Total Profit/Loss (BB)",
-            yaxis_title="Frequency",
-            height=200,
-            template="plotly_white",
-            margin=dict(l=20, r=20, t=38, b=10)
-        )
-
-        # quick text summary (kept same fields)
-        n_win   = sum(v > 0 for v in end_vals)
-        n_loss  = sum(v < 0 for v in end_vals)
-        max_win = int(np.max(end_vals))
-        max_loss = int(np.min(end_vals))
-        mean_val   = np.mean(end_vals)
-        median_val = np.median(end_vals)
+            return go.Figure(), go.Figure(), go.Figure(), ""
+
+        winrate, stdev = req["winrate"], req["stdev"]
+        numhands, numsim = req["hands"], req["sims"]
+        hands_per_step, view = req["hands_per_step"], req["view"]
+
+        try:
+            if view == "fan":
+                run, hit = sim_cache.cached("fan", _sim_params(req), bankroll.summarize)
+            else:
+                run, hit = sim_cache.cached("paths", _sim_params(req), bankroll.simulate)
+        except ValueError as e:
+            # bigger than one callback should take (bankroll.MAX_CELLS)
+            return go.Figure(), go.Figure(), go.Figure(), html.Span(str(e), style={'color': '#E53935'})
+
+        if view == "fan":
+            fig1 = fan_figure(run)
+            final_counts, final_edges = run["final_counts"], run["final_edges"]
+        else:
+            fig1 = paths_figure(run)
+            # binned here, so a big run ships as 22 bars, not every result
+            final_counts, final_edges = np.histogram(run["final"], bins=22)
+        st = _final_stats(run)
+
+        fig2 = bars_figure(final_counts, final_edges, "Final Bankroll Distribution",
+                           "Total Profit/Loss (BB)", "#43A047")
+        dd_counts, dd_edges = (run["dd_counts"], run["dd_edges"]) if view == "fan" else \
+            np.histogram(run["drawdown"], bins=22)
+        fig3 = bars_figure(dd_counts, dd_edges, "Largest Drawdown per Run",
+                           "Peak-to-trough drop (BB)", "#D84315")
+
+        step_note = ""
+        if run["hands_per_step"] != hands_per_step:
+            step_note = (f"  \nSimulated per {run['hands_per_step']:,} hands instead of {_per(hands_per_step)}: "
+                         f"{numsim:,} runs of {numhands:,} hands is more than one run may take at that step "
+                         f"(fewer simulations keep it finer).")
+        # what the downsampling (utils/downsample.py) left out of the plotted paths
+        shown = run["paths"].size if view != "fan" else run["examples"].size
+        dropped = run["points_total"] - shown
+        plot_note = f"  \nPlotted {shown:,} of {run['points_total']:,} path points ({dropped:,} dropped by downsampling)." \
+            if dropped else ""
 
         stats = f"""
 Simulations: {numsim} | Hands: {numhands} | Winrate: {winrate} BB/100 | Stdev: {stdev} BB/100  
-Profitable runs: {n_win} | Losing runs: {n_loss}  
-Max Profit: {max_win} BB | Max Loss: {max_loss} BB  
-Mean: {mean_val:.1f} BB | Median: {median_val:.1f} BB
+Profitable runs: {st['win']} | Losing runs: {st['loss']}  
+Max Profit: {int(st['max'])} BB | Max Loss: {int(st['min'])} BB  
+Mean: {st['mean']:.1f} BB | Median: {st['median']:.1f} BB  
+Largest drawdown: {st['dd_max']:.0f} BB | Average largest drawdown: {st['dd_mean']:.0f} BB{step_note}{plot_note}  
+Seed: {req['seed']}{" (cached result)" if hit else ""} – the page URL now reproduces this run
         """
 
-        return fig1, fig2, stats
+        return fig1, fig2, fig3, stats
+
+
+
+    @app.callback(
+        Output("chapter7-ror-curve", "figure"),
+        Output("chapter7-risk-output", "children"),
+        Input("chapter7-request", "data")
+    )
+    def ruin_curve(req):
+        """risk of ruin for the whole buy-in grid in one pass (utils/risk.py), cached like the curves."""
+        if not req:
+            return go.Figure(), ""
+
+        winrate, stdev, numhands = req["winrate"], req["stdev"], req["hands"]
+        sims = min(req["sims"], MOVE_DOWN_SIMS if req["move_down"] else RISK_SIMS)
+        params = dict(_sim_params(req, sims), stop_loss=req["stop_loss"], move_down=req["move_down"])
+        try:
+            res, _ = sim_cache.cached("ruin", params, risk.simulate_ruin)
+        except ValueError as e:
+            return go.Figure(), html.Span(str(e), style={'color': '#E53935'})
+
+        exp_dd = risk.expected_max_drawdown(winrate, stdev, numhands)
+        dd_bi = np.array([10, 20, 30])
+        p_dd = risk.drawdown_probability(dd_bi * risk.BUY_IN, winrate, stdev, numhands)
+        p_txt = " | ".join(f"{d} BI: {p * 100:.1f}%" for d, p in zip(dd_bi, p_dd) if np.isfinite(p))
+        safe = res["buyins"][res["ruin"] <= 0.05]
+        safe_txt = f"{safe[0]} buy-ins" if len(safe) else f"more than {res['buyins'][-1]} buy-ins"
+
+        text = f"""
+Expected largest drawdown over {numhands:,} hands: {exp_dd:,.0f} BB ({exp_dd / risk.BUY_IN:.1f} buy-ins)  
+Chance of a drawdown of at least {p_txt or "-"}  
+Smallest roll with at most 5% simulated risk of ruin ({sims:,} runs): {safe_txt}
+        """
+        return ror_figure(res, winrate, stdev, numhands), text
 
 
 __all__ = ["layout", "register_callbacks"]
@@ -1,7 +1,8 @@
 # poker/chapters/probability_simulator.py
 from dash import html, dcc, Input, Output
 import plotly.graph_objs as go
-import random
+
+from utils import probability
 
 def get_layout():
     return html.Div([
@@ -42,21 +43,13 @@ def register_callbacks(app):
         Input("method", "value")
     )
     def update_chart(outs, cards_left, method):
-        if method == "rule":
-            prob = outs * (4 if cards_left == 2 else 2)
-            method_text = "Rule of 4 and 2: Quick approximation used by players."
-        elif method == "exact":
-            if cards_left == 2:
-                prob = 1 - ((47 - outs) / 47) * ((46 - outs) / 46)
-            else:
-                prob = outs / 47
-            prob *= 100
-            method_text = "Exact probability based on combinatorics."
-        else:
-            base_prob = outs * (4 if cards_left == 2 else 2)
-            variance = 0.1 * base_prob
-            prob = max(0, min(100, random.gauss(base_prob, variance)))
-            method_text = "Monte Carlo simulation: Estimated with randomness."
+        # same engine (and same 47/46 denominators) as chapter 1
+        prob = float(probability.outs_curves(outs, cards_left)[method]) * 100
+        method_text = {
+            "rule":  "Rule of 4 and 2: Quick approximation used by players.",
+            "exact": "Exact probability based on combinatorics.",
+            "monte": "Monte Carlo simulation: Estimated with randomness."
+        }[method]
 
         fig = go.Figure(go.Indicator(
             mode="gauge+number",
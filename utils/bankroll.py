@@ -0,0 +1,280 @@
+# poker/utils/bankroll.py
+"""
+bankroll curves for chapter 7, done as whole matrices.
+
+model: every step of `hands_per_step` hands is Normal(winrate * h / 100,
+stdev * sqrt(h / 100)), units BB (winrate / stdev are BB/100 as usual). with
+hands_per_step=1 that is per-hand granularity, 100 is the old per-100 chunks.
+when hands_per_step does not divide hands, the last step is shorter, so every
+requested hand is simulated (step_hands / hands_axis).
+
+- one step matrix (sims x steps) per chunk from a single standard_normal call,
+  cumsum along the steps, no python loop per simulation
+- chunks are sized by CHUNK_CELLS, so memory stays bounded for big runs
+- a run blocks a dash worker, so it is capped by a time budget in cells
+  (sims x steps): MAX_CELLS for simulate(), FAN_MAX_CELLS for the streaming
+  summarize() (its memory only follows the steps, so it is the one for big
+  runs). past the cap the step gets coarser, and a run that would need fewer
+  than MIN_STEPS steps to fit is refused with a ValueError
+- randomness comes from SeedSequence(seed): chunk i uses child i, so a seed
+  always gives the same curves. seed=None draws fresh entropy, and the seed
+  that was used is returned so the run can be repeated
+"""
+import numpy as np
+
+from utils.downsample import PIXEL_WIDTH, downsample
+
+
+CHUNK_CELLS = 2_000_000          # floats per chunk (16 MB of float64)
+# measured: ~35 ns per cell for simulate(), ~55 ns for summarize() (lttb / histograms included)
+MAX_CELLS = 5_000_000            # simulate(): about 0.2 s; past that the step gets coarser
+FAN_MAX_CELLS = 10_000_000       # summarize(): about 0.5 s
+MIN_STEPS = 50                   # a curve needs at least this many steps (or every hand, if fewer)
+KEEP_PATHS = 100                 # curves kept for the plot
+MAX_POINTS = PIXEL_WIDTH         # points per kept curve (lttb) / per percentile line
+
+
+
+# ====== shape of a run ======
+def new_seed():
+    """fresh 32-bit seed (small enough to show in the UI and the URL)."""
+    return int(np.random.SeedSequence().generate_state(1)[0])
+
+
+def n_steps(hands, hands_per_step):
+    """steps of a run, counting a shorter last one."""
+    return -(-hands // hands_per_step)
+
+
+def fit_step(hands, sims, hands_per_step=100, max_cells=MAX_CELLS):
+    """smallest step >= hands_per_step with sims x steps inside the budget.
+    raised along 1-2-5 (100, 200, 500, 1000, ...) so the x axis stays readable.
+    raises ValueError when that leaves fewer than MIN_STEPS steps."""
+    step = max(1, int(hands_per_step))
+    nice = (m * 10 ** e for e in range(16) for m in (1, 2, 5))
+    while sims * n_steps(hands, step) > max_cells and step < hands:
+        step = next(n for n in nice if n > step)
+    step = min(step, max(1, hands))
+    if n_steps(hands, step) < min(MIN_STEPS, n_steps(hands, max(1, int(hands_per_step)))):
+        raise ValueError(f"{sims:,} simulations of {hands:,} hands is too big a run: "
+                         f"lower the simulations to {max_cells // MIN_STEPS:,} or fewer")
+    return step
+
+
+def step_params(winrate, stdev, hands_per_step):
+    """(mean, sd) in BB of one step (or of each, for an array of step lengths)."""
+    scale = np.asarray(hands_per_step) / 100.0
+    return winrate * scale, stdev * np.sqrt(scale)
+
+
+def step_hands(hands, hands_per_step):
+    """(steps,) hands in each step: hands_per_step, the last one takes the rest."""
+    sizes = np.full(n_steps(hands, hands_per_step), hands_per_step)
+    sizes[-1] = hands - hands_per_step * (len(sizes) - 1)
+    return sizes
+
+
+def hands_axis(hands, hands_per_step):
+    """(steps + 1,) hands played at every point of a curve, 0 .. hands."""
+    return np.concatenate([[0], np.cumsum(step_hands(hands, hands_per_step))])
+
+
+def chunk_rows(steps, chunk_cells=CHUNK_CELLS):
+    return max(1, chunk_cells // max(steps, 1))
+
+
+
+# ====== generation ======
+def iter_chunks(winrate, stdev, hands, sims, seed, hands_per_step=100, chunk_cells=CHUNK_CELLS):
+    """yield (first sim index, curves) with curves (n, steps + 1), starting at 0 BB."""
+    mu, sd = step_params(winrate, stdev, step_hands(hands, hands_per_step))
+    steps = len(mu)
+    rows = chunk_rows(steps, chunk_cells)
+    n_chunks = -(-sims // rows)
+    children = np.random.SeedSequence(seed).spawn(n_chunks)
+
+    for i, child in enumerate(children):
+        n = min(rows, sims - i * rows)
+        draws = np.random.default_rng(child).standard_normal((n, steps))
+        draws *= sd
+        draws += mu
+        curves = np.empty((n, steps + 1))
+        curves[:, 0] = 0.0
+        np.cumsum(draws, axis=1, out=curves[:, 1:])
+        yield i * rows, curves
+
+
+def point_index(steps, max_points=MAX_POINTS):
+    """which of the steps + 1 points a kept curve holds (even stride, ends kept)."""
+    if steps + 1 <= max_points:
+        return np.arange(steps + 1)
+    return np.unique(np.linspace(0, steps, max_points).round().astype(int))
+
+
+def simulate(winrate, stdev, hands, sims, seed=None, hands_per_step=100,
+             keep_paths=KEEP_PATHS, max_points=MAX_POINTS, chunk_cells=CHUNK_CELLS):
+    """run `sims` bankroll curves of `hands` hands.
+
+    returns dict:
+      paths_x, paths   (min(sims, keep_paths), <= max_points) the first curves,
+                       downsampled with lttb (so every curve has its own x)
+      points_total     points those curves had before downsampling
+      final       (sims,) result after the last hand, every simulation
+      drawdown    (sims,) largest peak-to-trough drop of every simulation
+      seed, hands_per_step, steps   what was actually run
+    hands_per_step is raised (fit_step) when sims x steps would pass MAX_CELLS.
+    """
+    seed = new_seed() if seed is None else int(seed)
+    hands_per_step = fit_step(hands, sims, hands_per_step)
+    x = hands_axis(hands, hands_per_step)
+    steps = len(x) - 1
+    n_keep = min(sims, keep_paths)
+    n_points = min(steps + 1, max_points)
+
+    final = np.empty(sims)
+    drawdown = np.empty(sims)
+    paths_x = np.empty((n_keep, n_points))
+    paths = np.empty((n_keep, n_points))
+    for start, curves in iter_chunks(winrate, stdev, hands, sims, seed, hands_per_step, chunk_cells):
+        final[start:start + len(curves)] = curves[:, -1]
+        drawdown[start:start + len(curves)] = max_drawdown(curves)
+        if start < n_keep:
+            take = curves[:n_keep - start]
+            paths_x[start:start + len(take)], paths[start:start + len(take)] = downsample(x, take, n_points)
+
+    return {"paths_x": paths_x, "paths": paths, "points_total": n_keep * (steps + 1),
+            "final": final, "drawdown": drawdown,
+            "seed": seed, "hands_per_step": hands_per_step, "steps": steps}
+
+
+
+# ====== drawdowns ======
+DD_SPAN = 4.0
+DD_BINS = 40
+
+
+def max_drawdown(curves):
+    """(n,) largest peak-to-trough drop of each curve (BB, >= 0)."""
+    return (np.maximum.accumulate(curves, axis=1) - curves).max(axis=1)
+
+
+def drawdown_edges(winrate, stdev, hands, bins=None):
+    """fixed histogram edges for max drawdowns: 0 .. DD_SPAN sd of the whole run,
+    plus the expected loss when the winrate is negative. the top bin takes overflow."""
+    mu, sd = step_params(winrate, stdev, hands)
+    return np.linspace(0.0, DD_SPAN * sd + max(-mu, 0.0), (bins or DD_BINS) + 1)
+
+
+
+# ====== streaming summary (memory ~ points, not sims) ======
+QUANTILES = (5, 25, 50, 75, 95)
+Z_MAX = 5.0                      # per-step histograms cover mean +- 5 sd
+Z_BINS = 200
+N_EXAMPLES = 5
+
+
+class FanSummary:
+    """folds chunks of curves into per-point histograms, sums and drawdown counts.
+
+    each kept point t gets Z_BINS fixed bins in standard units of the model,
+    (x - mean_t) / sd_t, so one set of edges fits every point and nothing
+    depends on how many curves come through. quantiles are read back from the
+    running counts (linear inside a bin, error < half a bin = 0.025 sd_t).
+    """
+
+    def __init__(self, x, idx, winrate, stdev, dd_edges):
+        self.x = np.asarray(x)                   # hands at every point of a curve
+        self.idx = np.asarray(idx)
+        self.center, self.scale = step_params(winrate, stdev, self.x[self.idx])
+        # the start point (and stdev 0) has no spread: any tiny width puts it in the middle bin
+        self.scale = np.maximum(self.scale, 1e-6)
+        self.counts = np.zeros((len(self.idx), Z_BINS), dtype=np.int64)
+        self.offsets = np.arange(len(self.idx)) * Z_BINS
+        self.total = np.zeros(len(self.idx))
+        self.n = 0
+        self.dd_edges = dd_edges
+        self.dd_counts = np.zeros(len(dd_edges) - 1, dtype=np.int64)
+        self.dd_max = 0.0
+        self.dd_sum = 0.0
+        self.final = {"win": 0, "loss": 0, "max": -np.inf, "min": np.inf}
+        self.examples = []
+
+    def add(self, curves):
+        pts = curves if len(self.idx) == curves.shape[1] else curves[:, self.idx]
+        # bin index in place: (x - mean) / sd -> 0..Z_BINS-1, offset by point
+        z = pts - self.center
+        z /= self.scale
+        z += Z_MAX
+        z *= Z_BINS / (2 * Z_MAX)
+        b = z.astype(np.int64)
+        np.clip(b, 0, Z_BINS - 1, out=b)
+        b += self.offsets
+        self.counts += np.bincount(b.ravel(), minlength=self.counts.size).reshape(self.counts.shape)
+        self.total += pts.sum(axis=0)
+        self.n += len(curves)
+
+        dd = max_drawdown(curves)
+        self.dd_counts += np.bincount(np.clip(np.searchsorted(self.dd_edges, dd, side="right") - 1,
+                                              0, len(self.dd_counts) - 1), minlength=len(self.dd_counts))
+        self.dd_max = max(self.dd_max, float(dd.max()))
+        self.dd_sum += float(dd.sum())
+
+        end = curves[:, -1]
+        self.final["win"] += int(np.sum(end > 0))
+        self.final["loss"] += int(np.sum(end < 0))
+        self.final["max"] = max(self.final["max"], float(end.max()))
+        self.final["min"] = min(self.final["min"], float(end.min()))
+        if len(self.examples) < N_EXAMPLES:
+            ex_x, ex_y = downsample(self.x, curves[:N_EXAMPLES - len(self.examples)], len(self.idx))
+            self.examples.extend(zip(ex_x, ex_y))
+
+    def quantile(self, q):
+        """(points,) estimate of the q-th percentile at every kept point."""
+        cum = np.cumsum(self.counts, axis=1)
+        target = q / 100.0 * self.n
+        b = np.minimum((cum < target).sum(axis=1), Z_BINS - 1)
+        rows = np.arange(len(b))
+        below = cum[rows, b] - self.counts[rows, b]
+        frac = (target - below) / np.maximum(self.counts[rows, b], 1)
+        z = -Z_MAX + (b + np.clip(frac, 0.0, 1.0)) * (2 * Z_MAX / Z_BINS)
+        out = self.center + z * self.scale
+        out[self.x[self.idx] == 0] = 0.0         # everyone starts at 0 BB
+        return out
+
+    def final_histogram(self, merge=5):
+        """(counts, edges) of the last point, Z_BINS / merge bins, empty tails cut."""
+        counts = self.counts[-1].reshape(-1, merge).sum(axis=1)
+        edges = self.center[-1] + np.linspace(-Z_MAX, Z_MAX, len(counts) + 1) * self.scale[-1]
+        nz = np.flatnonzero(counts)
+        lo, hi = (nz[0], nz[-1] + 1) if len(nz) else (0, len(counts))
+        return counts[lo:hi], edges[lo:hi + 1]
+
+
+def summarize(winrate, stdev, hands, sims, seed=None, hands_per_step=100,
+              max_points=MAX_POINTS, chunk_cells=CHUNK_CELLS, max_cells=FAN_MAX_CELLS):
+    """streaming version of simulate(): no curve matrix kept, only a FanSummary.
+
+    returns dict: x, quantiles {q: (points,)}, mean, examples_x / examples (lttb,
+    points_total before it), dd_counts / dd_edges,
+    dd_max, dd_mean, final (win / loss / max / min counts and extremes),
+    final_counts / final_edges, plus seed, hands_per_step, steps.
+    """
+    seed = new_seed() if seed is None else int(seed)
+    hands_per_step = fit_step(hands, sims, hands_per_step, max_cells)
+    x = hands_axis(hands, hands_per_step)
+    steps = len(x) - 1
+    idx = point_index(steps, max_points)
+
+    fan = FanSummary(x, idx, winrate, stdev, drawdown_edges(winrate, stdev, hands))
+    for _, curves in iter_chunks(winrate, stdev, hands, sims, seed, hands_per_step, chunk_cells):
+        fan.add(curves)
+
+    final_counts, final_edges = fan.final_histogram()
+    return {"x": x[idx], "quantiles": {q: fan.quantile(q) for q in QUANTILES},
+            "mean": fan.total / fan.n,
+            "examples_x": np.array([e[0] for e in fan.examples]), "examples": np.array([e[1] for e in fan.examples]),
+            "points_total": len(fan.examples) * (steps + 1),
+            "dd_counts": fan.dd_counts, "dd_edges": fan.dd_edges,
+            "dd_max": fan.dd_max, "dd_mean": fan.dd_sum / fan.n, "final": fan.final,
+            "final_counts": final_counts, "final_edges": final_edges,
+            "seed": seed, "hands_per_step": hands_per_step, "steps": steps}
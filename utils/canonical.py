@@ -0,0 +1,104 @@
+# poker/utils/canonical.py
+"""
+suit isomorphism: spots that only differ by renaming suits play the same.
+
+- canonical_groups / canonicalize map (hole, board, ...) to one representative
+  (the smallest relabelling over the 24 suit permutations) plus the permutation
+  used, so results computed on the representative can be mapped back; the
+  lookup itself is lru-cached on the sorted cards
+- weight gives how many raw spots a canonical form stands for
+- canonical_flops / canonical_hands list the distinct flops (1,755) and starting
+  hands (169) with how many raw combos each one stands for
+
+the outs, exact-equity and hand-type caches key on the canonical form, so e.g.
+A♠K♠ on Q♠J♠2♥ and A♥K♥ on Q♥J♥2♦ are computed once; chapter 4's flop texture
+odds walk the 1,755 flops with their weights instead of all 22,100.
+"""
+from functools import lru_cache
+from itertools import combinations, permutations
+import numpy as np
+
+
+SUIT_PERMS = list(permutations(range(4)))                 # 24, identity first
+
+# PERM_CARD[p][c] = card c with its suit renamed by permutation p
+PERM_CARD = np.array([[perm[c // 13] * 13 + c % 13 for c in range(52)] for perm in SUIT_PERMS], dtype=np.int16)
+_PERM_CARD = PERM_CARD.tolist()
+_INVERSE = [SUIT_PERMS.index(tuple(np.argsort(p).tolist())) for p in SUIT_PERMS]
+
+
+
+def canonical_groups(groups):
+    """smallest suit relabelling of a list of card groups (each group is unordered).
+
+    returns (canonical groups as tuple of sorted tuples, permutation index).
+    apply the permutation with `map_cards`, undo it with `unmap_cards`.
+    """
+    return _canonical_groups(tuple(tuple(sorted(g)) for g in groups))
+
+
+@lru_cache(maxsize=65536)
+def _canonical_groups(groups):
+    best, best_p = None, 0
+    for p, table in enumerate(_PERM_CARD):
+        key = tuple(tuple(sorted(table[c] for c in g)) for g in groups)
+        if best is None or key < best:
+            best, best_p = key, p
+    return best, best_p
+
+
+def canonicalize(hole, board):
+    """(canonical hole, canonical board, permutation index) for one spot."""
+    (h, b), p = canonical_groups([hole, board])
+    return h, b, p
+
+
+def map_cards(card_ids, perm):
+    return [_PERM_CARD[perm][c] for c in card_ids]
+
+
+def unmap_cards(card_ids, perm):
+    return [_PERM_CARD[_INVERSE[perm]][c] for c in card_ids]
+
+
+def weight(groups):
+    """how many raw spots share this canonical form (24 / size of its stabilizer)."""
+    base = tuple(frozenset(g) for g in groups)
+    same = sum(1 for table in _PERM_CARD
+               if tuple(frozenset(table[c] for c in g) for g in groups) == base)
+    return 24 // same
+
+
+
+# ====== distinct flops / starting hands ======
+def _canonical_sets(k):
+    """every k-card set, folded by suit: (canonical sets (n, k), weights)."""
+    raw = np.array(list(combinations(range(52), k)), dtype=np.int16)
+    # relabel under all 24 permutations, sort each set, keep the smallest encoding
+    keys = None
+    for p in range(len(SUIT_PERMS)):
+        mapped = np.sort(PERM_CARD[p][raw], axis=1).astype(np.int64)
+        key = np.zeros(len(raw), dtype=np.int64)
+        for j in range(k):
+            key = key * 52 + mapped[:, j]
+        keys = key if keys is None else np.minimum(keys, key)
+
+    uniq, counts = np.unique(keys, return_counts=True)
+    sets = np.zeros((len(uniq), k), dtype=np.int16)
+    rest = uniq.copy()
+    for j in range(k - 1, -1, -1):
+        sets[:, j] = rest % 52
+        rest //= 52
+    return sets, counts
+
+
+@lru_cache(maxsize=None)
+def canonical_flops():
+    """the 1,755 strategically distinct flops and how many of the 22,100 each covers."""
+    return _canonical_sets(3)
+
+
+@lru_cache(maxsize=None)
+def canonical_hands():
+    """169 distinct starting hands and their combo counts (6 / 4 / 12)."""
+    return _canonical_sets(2)
@@ -0,0 +1,143 @@
+# poker/utils/cards.py
+"""
+one card encoding for the whole book.
+
+- a card is an int 0..51: card = suit * 13 + rank, rank 0 = '2' ... 12 = 'A'
+- a set of cards (hand, board, dead cards) is a 64-bit mask: bit `card` is set
+- display strings stay "A♠", "T♥" ...; conversion is a table lookup both ways
+
+because suits are 13-bit fields of the mask, `(mask >> 13 * s) & 0x1FFF` is the
+rank mask of suit s, which is what flush / board-texture checks want.
+"""
+import random
+import numpy as np
+
+
+RANKS = "23456789TJQKA"
+SUITS = "♠♥♦♣"
+ASCII_SUITS = "shdc"
+
+FULL_DECK = (1 << 52) - 1
+SUIT_FIELD = 0x1FFF
+
+CARD_STRS = [r + s for s in SUITS for r in RANKS]     # index = card id
+
+# every spelling we accept on input -> card id ("A♠", "As", "AS", "10♠", "10s")
+_PARSE = {}
+for _c in range(52):
+    _r, _s = RANKS[_c % 13], _c // 13
+    for _rank in ([_r, "10"] if _r == "T" else [_r, _r.lower()]):
+        for _suit in (SUITS[_s], ASCII_SUITS[_s], ASCII_SUITS[_s].upper()):
+            _PARSE[_rank + _suit] = _c
+
+# numpy lookups for batch work
+RANK_OF = np.arange(52, dtype=np.int8) % 13
+SUIT_OF = np.arange(52, dtype=np.int8) // 13
+CARD_BIT = np.left_shift(np.uint64(1), np.arange(52, dtype=np.uint64))
+
+
+
+# ====== single cards ======
+def make_card(rank, suit):
+    return suit * 13 + rank
+
+
+def rank_of(card):
+    return card % 13
+
+
+def suit_of(card):
+    return card // 13
+
+
+def parse_card(text):
+    """'A♠' / 'As' / '10h' -> card id. raises ValueError on junk."""
+    try:
+        return _PARSE[str(text).strip()]
+    except KeyError:
+        raise ValueError(f"not a card: {text!r}") from None
+
+
+def parse_cards(texts):
+    """list of strings, or one string like 'A♠ K♦' / 'AsKd' -> list of card ids."""
+    if isinstance(texts, str):
+        s = texts.replace(",", " ")
+        parts = s.split()
+        if len(parts) == 1 and len(s.strip()) > 3:
+            # glued form: "AsKd", "10hJh" -> split on suit characters
+            parts, cur = [], ""
+            for ch in s.strip():
+                cur += ch
+                if ch in SUITS or ch.lower() in ASCII_SUITS:
+                    parts.append(cur)
+                    cur = ""
+        texts = parts
+    return [parse_card(t) for t in texts]
+
+
+def card_str(card):
+    return CARD_STRS[card]
+
+
+def cards_str(cards, sep=" "):
+    return sep.join(CARD_STRS[c] for c in cards)
+
+
+
+# ====== bitmasks ======
+def to_mask(cards):
+    m = 0
+    for c in cards:
+        m |= 1 << c
+    return m
+
+
+def from_mask(mask):
+    """card ids in a mask, low to high."""
+    out = []
+    while mask:
+        low = mask & -mask
+        out.append(low.bit_length() - 1)
+        mask ^= low
+    return out
+
+
+def popcount(mask):
+    return mask.bit_count()
+
+
+def suit_ranks(mask, suit):
+    """13-bit rank mask of one suit."""
+    return (mask >> (13 * suit)) & SUIT_FIELD
+
+
+def rank_mask(mask):
+    """13-bit mask of ranks present in any suit."""
+    return (mask | mask >> 13 | mask >> 26 | mask >> 39) & SUIT_FIELD
+
+
+def suit_counts(mask):
+    return [suit_ranks(mask, s).bit_count() for s in range(4)]
+
+
+def rank_counts(mask):
+    fields = [suit_ranks(mask, s) for s in range(4)]
+    return [sum(f >> r & 1 for f in fields) for r in range(13)]
+
+
+
+# ====== dealing ======
+def live_cards(dead_mask=0):
+    """card ids not in dead_mask, as a list."""
+    return from_mask(FULL_DECK & ~dead_mask)
+
+
+def live_array(dead_mask=0):
+    """same as live_cards but as an int8 numpy array (for batch sampling)."""
+    keep = (np.uint64(dead_mask) & CARD_BIT) == 0
+    return np.flatnonzero(keep).astype(np.int8)
+
+
+def deal(n, dead_mask=0, rng=random):
+    """n random cards that are not dead."""
+    return rng.sample(live_cards(dead_mask), n)
@@ -0,0 +1,180 @@
+# poker/utils/clientside_check.py
+"""
+keeps the clientside callbacks (assets/*.js) in step with their python versions.
+
+chapter 1's outs chart and chapter 6's bluff pie run in the browser; the python
+functions they replaced (chapter1.update_chart, chapter6.update_bluff_pie) stay as
+the reference. data/clientside_vectors.json holds inputs + the python outputs:
+
+    python -m utils.clientside_check --write   # rebuild the vectors from python
+    python -m utils.clientside_check           # python and js (node) vs the vectors
+
+numbers are compared with a small tolerance (the exact odds are summed in a
+different order in js), strings exactly. plotly templates are left out: the js
+gets the same template from a dcc.Store. exits 1 on any mismatch.
+"""
+import argparse
+import base64
+import json
+import math
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+
+import numpy as np
+
+
+CURRENT_DIR = os.path.dirname(__file__)
+ROOT = os.path.join(CURRENT_DIR, "..")
+VECTORS_PATH = os.path.join(ROOT, "data", "clientside_vectors.json")
+ASSETS = ["pyformat.js", "chapter1.js", "chapter6.js"]
+TOLERANCE = 1e-9
+
+
+
+# ====== python side ======
+def _plain(obj):
+    """figure / numpy bits -> plain json values, templates dropped."""
+    if hasattr(obj, "to_plotly_json"):
+        obj = obj.to_plotly_json()
+    if isinstance(obj, dict) and set(obj) == {"dtype", "bdata"}:
+        # plotly packs numpy arrays as base64 typed arrays; the js sends lists
+        return _plain(np.frombuffer(base64.b64decode(obj["bdata"]), dtype=obj["dtype"]))
+    if isinstance(obj, dict):
+        return {k: _plain(v) for k, v in obj.items() if k != "template"}
+    if isinstance(obj, (list, tuple)):
+        return [_plain(v) for v in obj]
+    if isinstance(obj, np.ndarray):
+        return _plain(obj.tolist())
+    if isinstance(obj, np.generic):
+        return obj.item()
+    return obj
+
+
+def _functions():
+    """name -> (python function, store data passed after the inputs, input cases)."""
+    from chapters import chapter1, chapter6
+    from utils import probability
+
+    ch1_cases = [[outs, cl, m] for cl in (1, 2) for m in probability.METHODS
+                 for outs in range(probability.MAX_OUTS + 1)]
+    # every slider stop, plus the warning edges and a few half-way combo counts
+    ch6_cases = [[round(i * 0.01, 2)] for i in range(151)] + [[0.049], [0.05], [1.51], [2.0], [0.15], [0.25]]
+    return {
+        "chapter1.update_chart": (chapter1.update_chart, [chapter1.CLIENT_CURVES], ch1_cases),
+        "chapter6.update_bluff_pie": (chapter6.update_bluff_pie, [chapter6.PIE_TEMPLATE], ch6_cases),
+    }
+
+
+def build_vectors():
+    out = {}
+    for name, (fn, state, cases) in _functions().items():
+        out[name] = {"state": state,
+                     "cases": [{"args": args, "expect": _plain(fn(*args))} for args in cases]}
+    return out
+
+
+
+# ====== compare ======
+def _diff(got, want, path="out"):
+    """first mismatch as a string, or None."""
+    if isinstance(want, bool) or want is None or isinstance(want, str):
+        return None if got == want else f"{path}: {got!r} != {want!r}"
+    if isinstance(want, (int, float)):
+        if isinstance(got, bool) or not isinstance(got, (int, float)):
+            return f"{path}: {got!r} != {want!r}"
+        if math.isnan(want) and math.isnan(got):
+            return None
+        ok = math.isclose(got, want, rel_tol=TOLERANCE, abs_tol=TOLERANCE)
+        return None if ok else f"{path}: {got!r} != {want!r}"
+    if isinstance(want, dict):
+        if not isinstance(got, dict) or set(got) != set(want):
+            return f"{path}: keys {sorted(got) if isinstance(got, dict) else got!r} != {sorted(want)}"
+        for k in want:
+            d = _diff(got[k], want[k], f"{path}.{k}")
+            if d:
+                return d
+        return None
+    if not isinstance(got, list) or len(got) != len(want):
+        return f"{path}: {got!r} != {want!r}"
+    for i, (g, w) in enumerate(zip(got, want)):
+        d = _diff(g, w, f"{path}[{i}]")
+        if d:
+            return d
+    return None
+
+
+# node script: a bare `window`, the asset files, then every case of every function
+_NODE_RUNNER = """
+const fs = require("fs"), path = require("path");
+global.window = {};
+for (const f of %(assets)s) {
+    eval.call(global, fs.readFileSync(path.join(%(assets_dir)s, f), "utf8"));
+}
+const vectors = JSON.parse(fs.readFileSync(%(vectors)s, "utf8"));
+const out = {};
+for (const [name, spec] of Object.entries(vectors)) {
+    const [ns, fn] = name.split(".");
+    out[name] = spec.cases.map(c => window.dash_clientside[ns][fn](...c.args, ...spec.state));
+}
+process.stdout.write(JSON.stringify(out));
+"""
+
+
+def run_js(vectors_path):
+    node = shutil.which("node")
+    if node is None:
+        return None
+    script = _NODE_RUNNER % {"assets": json.dumps(ASSETS),
+                             "assets_dir": json.dumps(os.path.abspath(os.path.join(ROOT, "assets"))),
+                             "vectors": json.dumps(os.path.abspath(vectors_path))}
+    with tempfile.NamedTemporaryFile("w", suffix=".js", delete=False) as f:
+        f.write(script)
+    try:
+        res = subprocess.run([node, f.name], capture_output=True, text=True, check=True)
+    finally:
+        os.remove(f.name)
+    return json.loads(res.stdout)
+
+
+def check(vectors, label, outputs):
+    """count + print mismatches of one side (python or js) against the vectors."""
+    bad = 0
+    for name, spec in vectors.items():
+        for case, got in zip(spec["cases"], outputs[name]):
+            d = _diff(_plain(got), case["expect"])
+            if d:
+                bad += 1
+                if bad <= 10:
+                    print(f"[{label}] {name}{tuple(case['args'])} {d}")
+    n = sum(len(spec["cases"]) for spec in vectors.values())
+    print(f"{label}: {n - bad}/{n} cases match")
+    return bad
+
+
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser(description="check clientside callbacks against their python versions")
+    ap.add_argument("--write", action="store_true", help="rebuild data/clientside_vectors.json from python")
+    args = ap.parse_args()
+
+    if args.write:
+        with open(VECTORS_PATH, "w") as f:
+            json.dump(build_vectors(), f, separators=(",", ":"))
+        print(f"wrote {VECTORS_PATH}")
+
+    with open(VECTORS_PATH) as f:
+        vectors = json.load(f)
+
+    funcs = _functions()
+    py_out = {name: [fn(*c["args"]) for c in vectors[name]["cases"]] for name, (fn, _, _) in funcs.items()}
+    bad = check(vectors, "python", py_out)
+
+    js_out = run_js(VECTORS_PATH)
+    if js_out is None:
+        print("js: node not found, skipped")
+    else:
+        bad += check(vectors, "js", js_out)
+    sys.exit(1 if bad else 0)
@@ -0,0 +1,75 @@
+# poker/utils/downsample.py
+"""
+shrink curves before they go to the browser (chapter 7).
+
+- lttb: largest-triangle-three-buckets. the first and last points stay, every
+  bucket in between keeps the point that makes the biggest triangle with the
+  point kept before it and the average of the next bucket, so spikes and
+  drawdowns survive where an even stride would skip them. batched: many curves
+  on one x axis go through the same python loop over buckets
+- merge_paths: many curves -> one x / y pair with NaN gaps, so a figure ships a
+  single Scattergl trace instead of one trace per curve
+"""
+import numpy as np
+
+
+PIXEL_WIDTH = 1200               # about the width of the chapter 7 plot; more points add nothing
+
+
+
+def lttb(x, y, n_out=PIXEL_WIDTH):
+    """indices of the points to keep.
+
+    x: (N,) shared axis, y: (m, N) curves (or (N,) for one). returns (m, n_out)
+    int indices (or (n_out,)), every row sorted, first / last point included.
+    """
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    single = y.ndim == 1
+    y = np.atleast_2d(y)
+    m, n = y.shape
+    if n <= n_out or n_out < 3:
+        idx = np.broadcast_to(np.arange(n), (m, n)).copy()
+        return idx[0] if single else idx
+
+    rows = np.arange(m)
+    out = np.empty((m, n_out), dtype=np.int64)
+    out[:, 0] = 0
+    out[:, -1] = n - 1
+    # bucket b covers [edges[b], edges[b + 1]); the first / last point have their own
+    edges = (np.arange(n_out - 1) * ((n - 2) / (n_out - 2))).astype(np.int64) + 1
+    edges[-1] = n - 1
+
+    a = np.zeros(m, dtype=np.int64)
+    for b in range(n_out - 2):
+        lo, hi = edges[b], edges[b + 1]
+        # average of the next bucket (the last point for the last bucket)
+        nlo, nhi = hi, (edges[b + 2] if b + 2 < len(edges) else n)
+        avg_x = x[nlo:nhi].mean()
+        avg_y = y[:, nlo:nhi].mean(axis=1)
+
+        xa, ya = x[a], y[rows, a]
+        area = np.abs((xa - avg_x)[:, None] * (y[:, lo:hi] - ya[:, None])
+                      - (xa[:, None] - x[lo:hi]) * (avg_y - ya)[:, None])
+        a = lo + area.argmax(axis=1)
+        out[:, b + 1] = a
+    return out[0] if single else out
+
+
+def downsample(x, y, n_out=PIXEL_WIDTH):
+    """(xs, ys) with the kept points: each (m, n_out) (or 1-D for one curve)."""
+    x = np.asarray(x)
+    idx = lttb(x, y, n_out)
+    y = np.asarray(y)
+    if y.ndim == 1:
+        return x[idx], y[idx]
+    return x[idx], np.take_along_axis(y, idx, axis=1)
+
+
+def merge_paths(xs, ys, dtype=np.float32):
+    """rows of (xs, ys) -> one x / y pair, a NaN after every row (plotly breaks the line there).
+    float32 by default: plotly ships numpy arrays as packed binary, so this halves the
+    payload and is still far finer than a pixel."""
+    xs, ys = np.atleast_2d(xs).astype(dtype), np.atleast_2d(ys).astype(dtype)
+    gap = np.full((len(xs), 1), np.nan, dtype=dtype)
+    return np.hstack([xs, gap]).ravel(), np.hstack([ys, gap]).ravel()
@@ -0,0 +1,283 @@
+# poker/utils/equity.py
+"""
+exact multiway equity by full enumeration of the remaining board.
+
+- known cards go into one bitmask; the live deck comes from it
+- suits that no known card uses are interchangeable, so runouts are relabelled
+  to a canonical suit order and only distinct ones are evaluated (with weights)
+- every player's 7-card hand for every runout is scored in one evaluate_batch
+- caches key on the suit-canonical spot (utils/canonical.py)
+- ties split the pot, so equities always sum to 1
+"""
+import time
+from functools import lru_cache
+from itertools import combinations
+import numpy as np
+
+from utils import cards, canonical
+from utils.poker_tools import evaluate_batch
+
+
+STREETS = ["Flop", "Turn", "River"]
+
+
+def canonical_runouts(runouts, known_mask):
+    """fold suit-isomorphic runouts together.
+
+    runouts: (R, k) card ids. returns (unique runouts, weights).
+    only suits absent from every known card are relabelled (in order of first
+    appearance), so results for the known hands are unchanged.
+    """
+    runouts = np.asarray(runouts, dtype=np.int16)
+    used = [s for s in range(4) if cards.suit_ranks(known_mask, s)]
+    free = [s for s in range(4) if s not in used]
+    if len(free) < 2 or runouts.size == 0:
+        return runouts, np.ones(len(runouts))
+
+    # walk each runout by rank, so {2h 3d} and {2d 3h} get the same labels
+    runouts = np.take_along_axis(runouts, np.argsort(runouts % 13, axis=1, kind="stable"), axis=1)
+
+    n, k = runouts.shape
+    rows = np.arange(n)
+    mapping = np.full((n, 4), -1, dtype=np.int16)
+    mapping[:, used] = used
+    nxt = np.zeros(n, dtype=np.int16)          # index into `free` of the next label
+    free_arr = np.array(free, dtype=np.int16)
+
+    suits = runouts // 13
+    for j in range(k):
+        s = suits[:, j]
+        new = mapping[rows, s] < 0
+        mapping[rows[new], s[new]] = free_arr[nxt[new]]
+        nxt += new
+
+    relabelled = mapping[rows[:, None], suits] * 13 + runouts % 13
+    keys = np.bitwise_or.reduce(np.left_shift(np.int64(1), relabelled.astype(np.int64)), axis=1)
+    _, first, weights = np.unique(keys, return_index=True, return_counts=True)
+    return np.sort(relabelled[first], axis=1), weights.astype(float)
+
+
+def _equity(players, board, dead):
+    known = cards.to_mask([c for p in players for c in p] + list(board) + list(dead))
+    need = 5 - len(board)
+    live = cards.live_array(known).tolist()
+
+    if need:
+        runouts = np.array(list(combinations(live, need)), dtype=np.int16)
+        runouts, weights = canonical_runouts(runouts, known)
+    else:
+        runouts, weights = np.empty((1, 0), dtype=np.int16), np.ones(1)
+
+    r = len(runouts)
+    full_board = np.hstack([np.broadcast_to(np.array(board, dtype=np.int16), (r, len(board))), runouts])
+    hands = np.concatenate([np.hstack([np.broadcast_to(np.array(p, dtype=np.int16), (r, 2)), full_board])
+                            for p in players])
+    scores = evaluate_batch(hands).reshape(len(players), r)
+
+    winners = scores == scores.max(axis=0)
+    share = winners / winners.sum(axis=0)
+    return (share * weights).sum(axis=1) / weights.sum()
+
+
+@lru_cache(maxsize=512)
+def _equity_cached(players, board, dead):
+    return tuple(_equity(players, board, dead).tolist())
+
+
+def exact_equity(hero, villains, board, dead=()):
+    """equity of hero and every villain (card ids). returns np.array [hero, v1, v2, ...]."""
+    groups, _ = canonical.canonical_groups([hero, *villains, board, dead])
+    players, board, dead = groups[:-2], groups[-2], groups[-1]
+    return np.array(_equity_cached(players, board, dead))
+
+
+def street_equity(hero, villains, board):
+    """exact equities at flop, turn and river for a full 5-card board.
+
+    returns (hero array [flop, turn, river], [villain arrays ...]).
+    """
+    per_street = np.array([exact_equity(hero, villains, board[:n]) for n in (3, 4, 5)])
+    return per_street[:, 0], [per_street[:, i] for i in range(1, per_street.shape[1])]
+
+
+
+# ====== final hand-type distribution (hero's view) ======
+HANDTYPE_LABELS = ["High Card", "Pair", "Two Pair", "Trips/Set", "Straight",
+                   "Flush", "Full House", "Quads/Str. Flush", "Missed Draw"]
+MISSED_DRAW = len(HANDTYPE_LABELS) - 1
+
+
+@lru_cache(maxsize=256)
+def _flop_runouts(hole, flop):
+    """every turn+river from the flop with hero's final hand type. hero only knows
+    hero's own cards, so villains' cards stay in the deck (it is hero's view)."""
+    from utils.outs import count_outs
+
+    known = cards.to_mask(hole + flop)
+    pairs = np.array(list(combinations(cards.live_cards(known), 2)), dtype=np.int16)
+    r = len(pairs)
+    base = np.broadcast_to(np.array(hole + flop, dtype=np.int16), (r, 5))
+    cat = evaluate_batch(np.hstack([base, pairs])) >> 12
+    label = np.minimum(cat, 7).astype(np.int8)          # quads and straight flush share a slice
+
+    # flush / straight draw on the flop that ended with nothing (high card) -> "missed draw";
+    # a draw that paired up on the way is reported as the pair / two pair / trips it made
+    by_cat = count_outs(hole, flop)["by_category"]
+    if "Flush" in by_cat or "Straight" in by_cat:
+        label[cat == 0] = MISSED_DRAW
+    return pairs, label
+
+
+def handtype_distribution(hole, board, street):
+    """share of each final hand type, given the board seen so far.
+
+    street 0 = flop (all turn+river pairs), 1 = turn, 2 = river. turn and river
+    reuse the flop enumeration: they just keep the rows holding the known cards.
+    returns {label: share} with zero entries dropped.
+    """
+    h, flop, perm = canonical.canonicalize(hole, board[:3])
+    pairs, label = _flop_runouts(h, flop)
+    keep = np.ones(len(pairs), dtype=bool)
+    for card in canonical.map_cards(board[3:3 + street], perm):
+        keep &= (pairs == card).any(axis=1)
+
+    counts = np.bincount(label[keep], minlength=len(HANDTYPE_LABELS))
+    total = counts.sum()
+    return {HANDTYPE_LABELS[i]: float(counts[i] / total) for i in range(len(HANDTYPE_LABELS)) if counts[i]}
+
+
+
+# ====== any spot, inside a time budget ======
+# villains are given as lists of possible 2-card combos (one combo = known hand).
+# small spots are enumerated exactly; big ones run monte carlo batches until the
+# deadline and report a 95% interval. one batch is sized so it always fits.
+EXACT_WORK_LIMIT = 250000        # player-hands we are happy to score exactly
+MC_BATCH = 2048
+
+
+def _assignments(villain_combos, known):
+    """every non-clashing way to give each villain one combo (product over ranges)."""
+    out = [((), known)]
+    for combos in villain_combos:
+        nxt = []
+        for chosen, mask in out:
+            for c in combos:
+                m = cards.to_mask(c)
+                if not m & mask:
+                    nxt.append((chosen + (tuple(c),), mask | m))
+        out = nxt
+    return [chosen for chosen, _ in out]
+
+
+def _monte_batch(hero, villain_combos, board, rng, n):
+    """hero/villain pot shares for n random deals; rows with clashing combos are dropped."""
+    known = cards.to_mask(list(hero) + list(board))
+    need = 5 - len(board)
+
+    masks = np.full(n, np.uint64(known))
+    ok = np.ones(n, dtype=bool)
+    picked = []
+    for combos in villain_combos:
+        arr = np.asarray(combos, dtype=np.int64)
+        pick = arr[rng.integers(len(arr), size=n)]
+        m = cards.CARD_BIT[pick[:, 0]] | cards.CARD_BIT[pick[:, 1]]
+        ok &= (masks & m) == 0
+        masks |= m
+        picked.append(pick)
+
+    # runout: random keys, dead cards pushed to the back, take the `need` smallest
+    keys = rng.random((n, 52))
+    keys[(masks[:, None] & cards.CARD_BIT[None, :]) != 0] = 2.0
+    runout = np.argpartition(keys, need, axis=1)[:, :need] if need else np.empty((n, 0), dtype=np.int64)
+
+    full_board = np.hstack([np.broadcast_to(np.array(board, dtype=np.int64), (n, len(board))), runout])
+    players = [np.broadcast_to(np.array(hero, dtype=np.int64), (n, 2))] + picked
+    scores = evaluate_batch(np.concatenate([np.hstack([p, full_board]) for p in players]))
+    scores = scores.reshape(len(players), n)[:, ok]
+
+    winners = scores == scores.max(axis=0)
+    return winners / winners.sum(axis=0)
+
+
+def _exact_many(hero, assigns, board):
+    """exact equity over every (villain assignment, runout) pair in one batch.
+    every full deal is equally likely, so the plain mean over valid pairs is right."""
+    known = cards.to_mask(list(hero) + list(board))
+    need = 5 - len(board)
+    live = cards.live_cards(known)
+    runouts = list(combinations(live, need))
+    runouts = np.array(runouts, dtype=np.int64).reshape(len(runouts), need)
+    run_mask = np.bitwise_or.reduce(cards.CARD_BIT[runouts], axis=1) if need else np.zeros(1, dtype=np.uint64)
+
+    villains = np.array(assigns, dtype=np.int64)                  # (A, V, 2)
+    a_mask = np.bitwise_or.reduce(cards.CARD_BIT[villains].reshape(len(villains), -1), axis=1)
+    ai, ri = np.nonzero((a_mask[:, None] & run_mask[None, :]) == 0)
+
+    m = len(ai)
+    full_board = np.hstack([np.broadcast_to(np.array(board, dtype=np.int64), (m, len(board))), runouts[ri]])
+    players = [np.broadcast_to(np.array(hero, dtype=np.int64), (m, 2))] + \
+              [villains[ai, v] for v in range(villains.shape[1])]
+    scores = evaluate_batch(np.concatenate([np.hstack([p, full_board]) for p in players]))
+    scores = scores.reshape(len(players), m)
+
+    winners = scores == scores.max(axis=0)
+    return (winners / winners.sum(axis=0)).mean(axis=1), m
+
+
+def equity_anytime(hero, villain_combos, board=(), budget_ms=150, rng=None):
+    """equity for hero vs villains given as combo lists, within `budget_ms`.
+
+    returns dict(equity=[hero, v1, ...], half_width=[...], method, samples, elapsed_ms).
+    exact when (assignments x runouts x players) is under EXACT_WORK_LIMIT,
+    otherwise monte carlo batches until the deadline. raises ValueError when no
+    deal is possible (every way to seat the villains clashes).
+    """
+    start = time.perf_counter()
+    deadline = start + 0.95 * budget_ms / 1000.0     # leave a little for the caller
+    hero, board = tuple(hero), tuple(board)
+    n_players = len(villain_combos) + 1
+
+    # ---- exact if small ----
+    known = cards.to_mask(hero + board)
+    space = 1
+    for combos in villain_combos:
+        space *= len(combos)
+    live = 52 - len(hero) - len(board) - 2 * len(villain_combos)
+    need = 5 - len(board)
+    n_runouts = int(np.prod([live - i for i in range(need)]) / max(1, np.prod(range(1, need + 1))))
+
+    if space * n_runouts * n_players <= EXACT_WORK_LIMIT:
+        assigns = _assignments(villain_combos, known)
+        if not assigns:
+            raise ValueError("no possible deal: the villain hands clash with each other")
+        eq, samples = _exact_many(hero, assigns, board)
+        return {"equity": eq, "half_width": np.zeros(n_players), "method": "exact",
+                "samples": samples, "elapsed_ms": (time.perf_counter() - start) * 1000}
+
+    # ---- monte carlo until the deadline ----
+    rng = rng if rng is not None else np.random.default_rng()
+    total = np.zeros(n_players)
+    total_sq = np.zeros(n_players)
+    n = 0
+    batch = 256                 # small first batch: we learn the per-batch cost before going big
+    while True:
+        t0 = time.perf_counter()
+        share = _monte_batch(hero, villain_combos, board, rng, batch)
+        total += share.sum(axis=1)
+        total_sq += (share ** 2).sum(axis=1)
+        n += share.shape[1]
+
+        now = time.perf_counter()
+        per_row = (now - t0) / batch
+        # next batch must end before the deadline (with some slack); stop if it can't be useful
+        batch = int(min(MC_BATCH * 4, 0.8 * (deadline - now) / per_row))
+        if batch < 64:
+            break
+
+    if n == 0:
+        # too big to enumerate, and not one random deal came out clash-free
+        raise ValueError("no possible deal found: the villain hands (almost) always clash")
+    eq = total / n
+    var = np.maximum(total_sq / n - eq ** 2, 0.0)
+    return {"equity": eq, "half_width": 1.96 * np.sqrt(var / n), "method": "monte",
+            "samples": n, "elapsed_ms": (time.perf_counter() - start) * 1000}
@@ -0,0 +1,49 @@
+# poker/utils/hand_classes.py
+"""
+the 169 starting-hand classes and the 1,326 combos behind them.
+
+class order / names follow data/date_ready_for_using.csv: a 13x13 grid, rows and
+columns A..2, upper triangle suited ("AKs"), lower triangle offsuit written row
+first ("KAo"), pairs with an "o" ("AAo"). STD_LABELS has the usual names
+("AA", "AKs", "AKo") in the same order.
+
+combos are (low card, high card) id pairs in itertools.combinations order.
+"""
+from itertools import combinations
+import numpy as np
+
+from utils import cards
+
+
+GRID_ORDER = "AKQJT98765432"
+_RANK = {r: cards.RANKS.index(r) for r in GRID_ORDER}
+
+CLASS_LABELS = []       # csv names
+STD_LABELS = []         # "AA" / "AKs" / "AKo"
+CLASS_SPEC = []         # (high rank, low rank, suited) with rank ids 0..12
+for i, r in enumerate(GRID_ORDER):
+    for j, c in enumerate(GRID_ORDER):
+        hi, lo = (r, c) if i <= j else (c, r)
+        suited = i < j
+        CLASS_LABELS.append(f"{r}{c}{'s' if suited else 'o'}")
+        STD_LABELS.append(hi + lo if i == j else f"{hi}{lo}{'s' if suited else 'o'}")
+        CLASS_SPEC.append((_RANK[hi], _RANK[lo], suited))
+
+N_CLASSES = len(CLASS_LABELS)     # 169
+
+COMBOS = np.array(list(combinations(range(52), 2)), dtype=np.int8)        # (1326, 2)
+N_COMBOS = len(COMBOS)
+COMBO_MASK = cards.CARD_BIT[COMBOS[:, 0]] | cards.CARD_BIT[COMBOS[:, 1]]
+
+
+def _combo_class(a, b):
+    ra, rb = cards.rank_of(a), cards.rank_of(b)
+    hi, lo = max(ra, rb), min(ra, rb)
+    suited = ra != rb and cards.suit_of(a) == cards.suit_of(b)
+    return CLASS_SPEC.index((hi, lo, suited))
+
+
+COMBO_CLASS = np.array([_combo_class(int(a), int(b)) for a, b in COMBOS], dtype=np.int16)
+CLASS_COMBO_COUNT = np.bincount(COMBO_CLASS, minlength=N_CLASSES)         # 6 / 4 / 12
+# combos of each class as index arrays into COMBOS
+CLASS_COMBOS = [np.flatnonzero(COMBO_CLASS == k) for k in range(N_CLASSES)]
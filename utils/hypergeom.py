@@ -0,0 +1,146 @@
+# poker/utils/hypergeom.py
+"""
+exact odds for drawing from the unseen deck (hypergeometric), table-backed.
+
+- COMB[n, k] holds every binomial up to 52 (exact in float64, C(52, 26) < 2**53)
+- AT_LEAST[unseen, outs, draws, k] = P(at least k outs in `draws` cards),
+  built once at import, so single queries are an index, not factorial math
+
+on top of that: several out classes at once (runner-runner, "one of A and one
+of B") and outs that are discounted because they also help the villain.
+all functions take scalars or numpy arrays (they broadcast).
+
+    python -m utils.hypergeom   # every function vs brute-force enumeration
+"""
+import numpy as np
+
+
+DECK = 52
+MAX_DRAWS = 7
+
+# pascal's triangle
+COMB = np.zeros((DECK + 1, DECK + 1))
+COMB[:, 0] = 1.0
+for _n in range(1, DECK + 1):
+    COMB[_n, 1:] = COMB[_n - 1, 1:] + COMB[_n - 1, :-1]
+
+
+def comb(n, k):
+    """C(n, k), 0 when k < 0 or k > n."""
+    n, k = np.asarray(n), np.asarray(k)
+    ok = (k >= 0) & (k <= n) & (n >= 0)
+    return np.where(ok, COMB[np.clip(n, 0, DECK), np.clip(k, 0, DECK)], 0.0)
+
+
+def pmf(hits, outs, draws, unseen):
+    """P(exactly `hits` outs among `draws` cards)."""
+    return comb(outs, hits) * comb(np.asarray(unseen) - outs, np.asarray(draws) - hits) / comb(unseen, draws)
+
+
+def _build_at_least():
+    u, o, d, k = np.ogrid[:DECK + 1, :DECK + 1, :MAX_DRAWS + 1, :MAX_DRAWS + 1]
+    hits = np.arange(MAX_DRAWS + 1)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        # p[u, o, d, h] = exact pmf, then reverse-cumsum over h for "at least"
+        p = pmf(hits[None, None, None, :], o, d, u)
+    p = np.nan_to_num(np.where((o <= u) & (d <= u), p, 0.0))
+    tail = np.flip(np.cumsum(np.flip(p, axis=3), axis=3), axis=3)
+    return np.where(k <= d, tail, 0.0)
+
+
+AT_LEAST = _build_at_least()
+
+
+def p_at_least(k, outs, draws, unseen):
+    """P(at least k of `outs` show up in `draws` cards from `unseen`). table lookup.
+
+    outs are clipped to [0, unseen] (as probability.exact_hit does), k < 0 reads
+    as 0 and k > draws gives 0. unseen outside 0..52 or draws outside
+    0..MAX_DRAWS raise ValueError (the table has no such rows).
+    """
+    k, outs, draws, unseen = np.broadcast_arrays(*(np.asarray(a, dtype=int) for a in (k, outs, draws, unseen)))
+    if ((unseen < 0) | (unseen > DECK) | (draws < 0) | (draws > MAX_DRAWS)).any():
+        raise ValueError(f"need 0 <= unseen <= {DECK} and 0 <= draws <= {MAX_DRAWS}")
+    p = AT_LEAST[unseen, np.clip(outs, 0, unseen), draws, np.clip(k, 0, MAX_DRAWS)]
+    return np.where(k > draws, 0.0, p)[()]
+
+
+def p_hit(outs, draws, unseen):
+    """the usual "hit at least one out"."""
+    return p_at_least(1, outs, draws, unseen)
+
+
+def p_none(outs, draws, unseen):
+    return comb(np.asarray(unseen) - outs, draws) / comb(unseen, draws)
+
+
+def p_one_of_each(a, b, draws, unseen):
+    """at least one card of class A *and* one of class B (disjoint classes).
+
+    e.g. runner-runner straight that needs one 9 and one T: a = b = 4, draws = 2.
+    inclusion-exclusion on the "none of" events.
+    """
+    return 1.0 - p_none(a, draws, unseen) - p_none(b, draws, unseen) + p_none(np.asarray(a) + b, draws, unseen)
+
+
+def p_runner_runner(outs, unseen=47):
+    """both of the next two cards from the same class (e.g. backdoor flush: outs = 10)."""
+    return p_at_least(2, outs, 2, unseen)
+
+
+def p_clean_hit(clean, dirty, draws, unseen):
+    """hit at least one clean out and no "dirty" card.
+
+    dirty = cards that also help the villain (pair the board for the villain's
+    set, fill the villain's bigger flush, ...). multivariate hypergeometric:
+    P(no dirty) - P(no dirty and no clean).
+    """
+    total = comb(unseen, draws)
+    return (comb(np.asarray(unseen) - dirty, draws) - comb(np.asarray(unseen) - dirty - clean, draws)) / total
+
+
+def discounted_outs(clean, tainted, discount=0.5):
+    """outs to quote when some outs are tainted: each tainted out counts `discount`."""
+    return np.asarray(clean) + discount * np.asarray(tainted)
+
+
+
+# ====== check the table against brute force ======
+def _brute(draws, unseen, hit):
+    """share of all `draws`-card sets from cards 0..unseen-1 where hit(cards) holds."""
+    from itertools import combinations
+    sets = list(combinations(range(unseen), draws))
+    return sum(1 for c in sets if hit(c)) / len(sets)
+
+
+def check(log=print):
+    """every engine function against direct enumeration; returns the number of misses."""
+    a, b, unseen = 4, 8, 47                      # class A = cards [0, a), class B = [a, a + b)
+    in_a = lambda c: sum(x < a for x in c)
+    in_b = lambda c: sum(a <= x < a + b for x in c)
+    cases = [
+        ("runner-runner flush", p_runner_runner(10), 10 / 47 * 9 / 46),
+        ("p_runner_runner(10)", p_runner_runner(10), _brute(2, unseen, lambda c: sum(x < 10 for x in c) == 2)),
+        ("p_one_of_each(4, 8)", p_one_of_each(a, b, 2, unseen), _brute(2, unseen, lambda c: in_a(c) and in_b(c))),
+        ("p_clean_hit(4, 8, 2)", p_clean_hit(a, b, 2, unseen), _brute(2, unseen, lambda c: in_a(c) and not in_b(c))),
+        ("p_clean_hit(4, 8, 3)", p_clean_hit(a, b, 3, unseen), _brute(3, unseen, lambda c: in_a(c) and not in_b(c))),
+        ("p_at_least(2, 8, 3)", p_at_least(2, b, 3, unseen), _brute(3, unseen, lambda c: in_b(c) >= 2)),
+        ("p_hit(9, 1, 46)", p_hit(9, 1, 46), 9 / 46),
+        ("p_hit(-3, 2, 47)", p_hit(-3, 2, unseen), 0.0),
+        ("p_hit(60, 2, 47)", p_hit(60, 2, unseen), 1.0),
+        # tainted outs count between nothing and a full out
+        ("discounted_outs(4, 8)", float(p_hit(int(discounted_outs(a, b)), 2, unseen) > p_clean_hit(a, b, 2, unseen)), 1.0),
+    ]
+    bad = 0
+    for name, got, want in cases:
+        if not abs(float(got) - want) < 1e-12:
+            bad += 1
+            log(f"[hypergeom] {name}: {float(got)!r} != {want!r}")
+    log(f"hypergeom: {len(cases) - bad}/{len(cases)} checks match")
+    return bad
+
+
+if __name__ == "__main__":
+    # python -m utils.hypergeom: exits 1 when a function disagrees with enumeration
+    import sys
+    sys.exit(1 if check() else 0)
@@ -0,0 +1,144 @@
+# poker/utils/narrowing.py
+"""
+board-aware range narrowing (chapter 5).
+
+every one of the 1,326 combos gets a bucket on a concrete board:
+- made hand from one evaluate_batch call (combo + board), compared with what the
+  board alone already shows, so a paired board does not make everyone "two pair"
+- draws from rank / suit bitmasks: flush draw = 4 to a suit using a hole card,
+  straight draw = how many ranks would complete a straight that needs a hole card
+
+an action line is then a list of boolean masks over buckets (which buckets keep
+betting), applied to the range weights street by street. classifying a board is
+cached, so toggling a checkbox is a few numpy ops on 1,326 floats.
+"""
+from functools import lru_cache
+import numpy as np
+
+from utils import cards
+from utils.hand_classes import COMBOS, COMBO_MASK, N_COMBOS
+from utils.outs import made_category
+from utils.poker_tools import evaluate_batch, PAIR, TWO_PAIR
+
+
+BUCKETS = ["Two Pair+", "Top Pair / Overpair", "Weak Pair", "Strong Draw", "Weak Draw", "Air"]
+MONSTER, TOP_PAIR, WEAK_PAIR, STRONG_DRAW, WEAK_DRAW, AIR = range(len(BUCKETS))
+
+# which buckets keep firing on each street (True = continue)
+CONTINUE_RULES = {
+    "CBet": np.array([True, True, False, True, True, False]),     # value + any draw
+    "Turn": np.array([True, True, False, True, False, False]),    # value + strong draws
+}
+STREET_CARDS = {"CBet": 3, "Turn": 4}
+
+
+
+# ====== straight table ======
+# _STRAIGHT[m] = 13-bit rank mask m holds a straight (wheel included)
+_WINDOWS = [0b11111 << i for i in range(9)] + [0b1000000001111]
+_STRAIGHT = np.zeros(1 << 13, dtype=bool)
+for _w in _WINDOWS:
+    _STRAIGHT[np.flatnonzero((np.arange(1 << 13) & _w) == _w)] = True
+_RANK_BITS = 1 << np.arange(13)
+
+
+def _rank_mask(card_ids):
+    """(n, k) card ids -> (n,) 13-bit rank masks."""
+    return np.bitwise_or.reduce(_RANK_BITS[cards.RANK_OF[card_ids]], axis=1)
+
+
+def _completing_ranks(mask):
+    """(n,) how many ranks would turn each rank mask into a straight."""
+    now = _STRAIGHT[mask]
+    return sum((_STRAIGHT[mask | bit] & ~now) for bit in _RANK_BITS).astype(np.int8)
+
+
+
+# ====== classify every combo on one board ======
+@lru_cache(maxsize=64)
+def classify_board(board):
+    """bucket index for all 1,326 combos on a 3..5 card board (tuple of ids).
+    combos that hold a board card get -1."""
+    board = tuple(board)
+    n = N_COMBOS
+    board_arr = np.broadcast_to(np.array(board, dtype=np.int64), (n, len(board)))
+    hole = COMBOS.astype(np.int64)
+    cat = evaluate_batch(np.hstack([hole, board_arr])) >> 12
+
+    # ---- pairs: made with a hole card, and is it top pair / an overpair? ----
+    board_ranks = cards.RANK_OF[list(board)]
+    top = board_ranks.max()
+    r1, r2 = cards.RANK_OF[hole[:, 0]], cards.RANK_OF[hole[:, 1]]
+    on_board = np.zeros(13, dtype=bool)
+    on_board[board_ranks] = True
+    pocket = r1 == r2
+    pair_rank = np.where(pocket, r1, np.maximum(np.where(on_board[r1], r1, -1), np.where(on_board[r2], r2, -1)))
+    uses_hole = pocket | on_board[r1] | on_board[r2]
+
+    board_cat = made_category(list(board))
+
+    bucket = np.full(n, AIR, dtype=np.int8)
+    # two pair or better, at least two steps above the board: on a paired board
+    # "two pair" is really one pair, trips / a full house is the real thing
+    strong = (cat >= TWO_PAIR) & (cat - board_cat >= 2)
+    made_pair = (cat >= PAIR) & uses_hole & ~strong
+    bucket[made_pair & (pair_rank >= top)] = TOP_PAIR
+    bucket[made_pair & (pair_rank < top)] = WEAK_PAIR
+    bucket[strong] = MONSTER
+
+    # ---- draws (only for hands that are not made, and not on the river) ----
+    if len(board) < 5:
+        suits = cards.SUIT_OF[np.hstack([hole, board_arr])]
+        suit_n = np.stack([(suits == s).sum(axis=1) for s in range(4)], axis=1)
+        hole_suit = np.stack([(cards.SUIT_OF[hole] == s).any(axis=1) for s in range(4)], axis=1)
+        flush_draw = ((suit_n == 4) & hole_suit).any(axis=1)
+
+        hero_mask = _rank_mask(np.hstack([hole, board_arr]))
+        board_mask = int(_rank_mask(np.array([board]))[0])
+        outs = _completing_ranks(hero_mask)
+        board_outs = int(_completing_ranks(np.array([board_mask]))[0])
+        straight_outs = np.where(_STRAIGHT[hero_mask], 0, np.maximum(outs - board_outs, 0))
+        overcards = (np.minimum(r1, r2) > top) & ~pocket
+
+        unmade = bucket == AIR
+        bucket[unmade & (flush_draw | (straight_outs >= 2))] = STRONG_DRAW
+        bucket[unmade & ~flush_draw & (straight_outs == 1)] = WEAK_DRAW
+        bucket[unmade & ~flush_draw & (straight_outs == 0) & overcards] = WEAK_DRAW
+
+    dead = np.uint64(cards.to_mask(board))
+    bucket[(COMBO_MASK & dead) != 0] = -1
+    return bucket
+
+
+def bucket_counts(weights, bucket):
+    """weighted combo count per bucket (dead combos skipped)."""
+    live = bucket >= 0
+    return np.bincount(bucket[live], weights=weights[live], minlength=len(BUCKETS))
+
+
+
+# ====== action line ======
+def narrow(range_weights, board, actions):
+    """apply an action line to a preflop range on a concrete board.
+
+    range_weights: (1326,) from utils.ranges.Range. board: card ids (3 or 4).
+    actions: subset of CONTINUE_RULES keys, applied in street order.
+    returns a list of stages: dict(name, weights, counts) - the first stage is
+    the range after card removal, each later stage is what keeps betting.
+    """
+    board = tuple(board)
+    dead = np.uint64(cards.to_mask(board))
+    w = np.where((COMBO_MASK & dead) != 0, 0.0, np.asarray(range_weights, dtype=float))
+    first = classify_board(board[:3])
+    stages = [{"name": "Preflop", "weights": w, "counts": bucket_counts(w, first), "bucket": first}]
+
+    for name in ("CBet", "Turn"):
+        if name not in actions or len(board) < STREET_CARDS[name]:
+            continue
+        bucket = classify_board(board[:STREET_CARDS[name]])
+        keep = np.zeros(N_COMBOS, dtype=bool)
+        live = bucket >= 0
+        keep[live] = CONTINUE_RULES[name][bucket[live]]
+        w = np.where(keep, w, 0.0)
+        stages.append({"name": name, "weights": w, "counts": bucket_counts(w, bucket), "bucket": bucket})
+    return stages
@@ -0,0 +1,125 @@
+# poker/utils/outs.py
+"""
+exact outs: try every unseen card with the real evaluator.
+
+a card is an out when it lifts hero's hand category *more* than it lifts the
+board on its own. that one rule covers the usual cases:
+- flush / straight / combo draws, overcards, sets that fill up -> counted
+- a card that only pairs the board (77 on K92, turn K) -> not counted
+- pairing an undercard (hole 4 on a K92 board) is not an out either: from
+  high card, only a pair above every board card counts (overcards)
+
+results are memoized on the suit-canonical (hole, board) form (utils/canonical.py),
+so asking twice for the same spot - or a suit-swapped copy of it - is a dict lookup.
+"""
+from functools import lru_cache
+from itertools import combinations
+import numpy as np
+
+from utils import cards, canonical
+from utils.poker_tools import evaluate_batch, hand_category, HAND_CATEGORIES, \
+    HIGH_CARD, PAIR, TWO_PAIR, TRIPS, FULL_HOUSE, QUADS
+
+
+def made_category(card_ids):
+    """hand category of any 2..7 cards. under 5 cards only pairs/trips/quads count."""
+    if len(card_ids) >= 5:
+        return int(hand_category(evaluate_batch([card_ids])[0]))
+
+    counts = sorted(cards.rank_counts(cards.to_mask(card_ids)), reverse=True)
+    if counts[0] == 4:
+        return QUADS
+    if counts[0] == 3:
+        return FULL_HOUSE if counts[1] >= 2 else TRIPS
+    if counts[0] == 2:
+        return TWO_PAIR if counts[1] == 2 else PAIR
+    return HIGH_CARD
+
+
+def _small_categories(board, extra):
+    # board + each extra card (or pair of cards) -> category, for short boards
+    return np.array([made_category(list(board) + list(e)) for e in extra], dtype=np.int8)
+
+
+def _categories(board, hole, extra):
+    """(hero categories, board-only categories) for every row of `extra`."""
+    extra = np.asarray(extra, dtype=np.int8).reshape(len(extra), -1)
+    n = len(extra)
+    base = np.broadcast_to(np.array(list(hole) + list(board), dtype=np.int8), (n, len(hole) + len(board)))
+    hero = hand_category(evaluate_batch(np.hstack([base, extra])))
+
+    if len(board) + extra.shape[1] >= 5:
+        only_board = np.broadcast_to(np.array(board, dtype=np.int8), (n, len(board)))
+        board_cat = hand_category(evaluate_batch(np.hstack([only_board, extra])))
+    else:
+        board_cat = _small_categories(board, extra.tolist())
+    return hero.astype(np.int8), board_cat.astype(np.int8)
+
+
+@lru_cache(maxsize=20000)
+def _outs_cached(hole, board, two_cards):
+    dead = cards.to_mask(hole + board)
+    unseen = cards.live_array(dead)
+
+    cur = made_category(list(hole + board))
+    cur_board = made_category(list(board))
+
+    # ---- one card ----
+    hero, board_cat = _categories(board, hole, unseen[:, None])
+    hits = (hero > cur) & ((hero - cur) > (board_cat - cur_board))
+    if cur == HIGH_CARD:
+        top = max(cards.rank_of(c) for c in board)
+        hits &= (hero != PAIR) | (cards.RANK_OF[unseen] > top)
+
+    by_cat = {}
+    for c, cat in zip(unseen[hits].tolist(), hero[hits].tolist()):
+        by_cat.setdefault(HAND_CATEGORIES[cat], []).append(c)
+
+    result = {
+        "current": HAND_CATEGORIES[cur],
+        "outs": tuple(unseen[hits].tolist()),
+        "by_category": {k: tuple(v) for k, v in sorted(by_cat.items(),
+                                                       key=lambda kv: -HAND_CATEGORIES.index(kv[0]))},
+        "unseen": len(unseen),
+    }
+
+    # ---- turn + river (optional) ----
+    if two_cards and len(board) <= 3:
+        pairs = np.array(list(combinations(unseen.tolist(), 2)), dtype=np.int8)
+        hero2, board2 = _categories(board, hole, pairs)
+        hit2 = (hero2 > cur) & ((hero2 - cur) > (board2 - cur_board))
+
+        # runner-runner = both cards needed, i.e. neither card alone was an out
+        one_card = np.zeros(52, dtype=bool)
+        one_card[list(result["outs"])] = True
+        runner = hit2 & ~one_card[pairs[:, 0]] & ~one_card[pairs[:, 1]]
+
+        cats, cnt = np.unique(hero2[hit2], return_counts=True)
+        result.update({
+            "pairs_total": len(pairs),
+            "pairs_improving": int(hit2.sum()),
+            "pairs_by_category": {HAND_CATEGORIES[c]: int(n) for c, n in zip(cats[::-1], cnt[::-1])},
+            "runner_runner": int(runner.sum()),
+        })
+
+    return result
+
+
+def count_outs(hole, board, two_cards=False):
+    """exact outs for hero's hole cards on a 3 or 4 card board (card ids).
+
+    returns a dict: current category, `outs` (card ids), `by_category`
+    (category it improves to -> card ids) and the number of unseen cards.
+    with two_cards=True on the flop it also counts improving turn+river pairs.
+    """
+    h, b, perm = canonical.canonicalize(hole, board)
+    res = dict(_outs_cached(h, b, bool(two_cards)))
+
+    # the cache holds the canonical spot; rename suits back to the caller's cards
+    def back(ids):
+        return tuple(sorted(canonical.unmap_cards(ids, perm)))
+    res["outs"] = back(res["outs"])
+    res["by_category"] = {k: back(v) for k, v in res["by_category"].items()}
+    if "pairs_by_category" in res:
+        res["pairs_by_category"] = dict(res["pairs_by_category"])
+    return res
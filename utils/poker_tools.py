@@ -0,0 +1,272 @@
+# poker/utils/poker_tools.py
+"""
+table-driven hand evaluator (5, 6 or 7 cards).
+
+cards are plain ints 0..51 (see utils/cards.py): card = suit * 13 + rank.
+
+how it works:
+- non-flush hands only depend on the rank multiset, so every multiset of 5..7
+  ranks gets a perfect-hash slot (combinatorial index over the 13 rank counts)
+  and the table stores its best 5-card value.
+- flushes are read from a second table indexed by the 13-bit rank mask of the
+  flush suit (8192 entries).
+- score = max(non-flush value, flush value). with 7 cards a flush can never
+  sit next to quads / a full house, so the max is always right.
+
+a score is `category << 12 | index` where index orders hands inside a category,
+so bigger score = better hand and `score >> 12` gives the category.
+
+tables are built once, saved as .npy next to the csv data and memory-mapped on
+import, so gunicorn workers share the same pages instead of rebuilding them.
+"""
+import os
+import numpy as np
+
+from utils.cards import RANKS, SUITS, make_card, suit_ranks, rank_counts    # noqa: F401  (re-exported)
+
+HAND_CATEGORIES = [
+    "High Card", "Pair", "Two Pair", "Three of a Kind", "Straight",
+    "Flush", "Full House", "Four of a Kind", "Straight Flush"
+]
+HIGH_CARD, PAIR, TWO_PAIR, TRIPS, STRAIGHT, FLUSH, FULL_HOUSE, QUADS, STRAIGHT_FLUSH = range(9)
+CATEGORY_SHIFT = 12
+
+CURRENT_DIR = os.path.dirname(__file__)
+TABLE_DIR = os.path.join(CURRENT_DIR, "..", "data")
+NOFLUSH_PATH = os.path.join(TABLE_DIR, "hand_eval_noflush.npy")
+FLUSH_PATH = os.path.join(TABLE_DIR, "hand_eval_flush.npy")
+
+BATCH_CHUNK = 1 << 16     # rows per pass in evaluate_batch; keeps temporaries small
+
+
+
+# ====== perfect hash over rank counts ======
+# _N[n][k] = number of count vectors of length n (entries 0..4) that sum to k
+_N = [[0] * 8 for _ in range(14)]
+_N[0][0] = 1
+for _n in range(1, 14):
+    for _k in range(8):
+        _N[_n][_k] = sum(_N[_n - 1][_k - c] for c in range(min(4, _k) + 1))
+
+# _BASE[k]: first slot for hands with k cards, so 5/6/7-card hands share one table
+_BASE = [sum(_N[13][j] for j in range(k)) for k in range(9)]
+TABLE_SIZE = _BASE[8]
+
+# _OFF[i][q][k]: how many vectors come before "q cards of rank i" with k cards left
+_OFF = [[[sum(_N[12 - i][k - c] for c in range(min(q, k + 1)))
+          for k in range(8)] for q in range(5)] for i in range(13)]
+_OFF_FLAT = np.array(_OFF, dtype=np.int32).ravel()     # index: i*40 + q*8 + k
+_RANK_OF = np.arange(52, dtype=np.int32) % 13
+
+
+def _count_key(counts, k):
+    """slot of a rank-count vector that sums to k."""
+    key = _BASE[k]
+    for i, q in enumerate(counts):
+        if q:
+            key += _OFF[i][q][k]
+            k -= q
+    return key
+
+
+
+# ====== best 5-card hand from counts / flush mask (table build only) ======
+def _straight_high(mask):
+    # highest straight in a 13-bit rank mask, wheel (A2345) counts as 5-high
+    for high in range(12, 3, -1):
+        window = 0b11111 << (high - 4)
+        if mask & window == window:
+            return high
+    if mask & 0b1000000001111 == 0b1000000001111:
+        return 3
+    return None
+
+
+def _best_from_counts(counts):
+    desc = [r for r in range(12, -1, -1) if counts[r]]
+    quads = [r for r in desc if counts[r] == 4]
+    trips = [r for r in desc if counts[r] == 3]
+    pairs = [r for r in desc if counts[r] == 2]
+
+    if quads:
+        q = quads[0]
+        return QUADS, (q, next(r for r in desc if r != q))
+
+    if trips and (len(trips) > 1 or pairs):
+        t = trips[0]
+        return FULL_HOUSE, (t, max(trips[1:] + pairs))
+
+    mask = sum(1 << r for r in desc)
+    high = _straight_high(mask)
+    if high is not None:
+        return STRAIGHT, (high,)
+
+    if trips:
+        t = trips[0]
+        return TRIPS, (t, *[r for r in desc if r != t][:2])
+
+    if len(pairs) >= 2:
+        p1, p2 = pairs[:2]
+        return TWO_PAIR, (p1, p2, next(r for r in desc if r not in (p1, p2)))
+
+    if pairs:
+        p = pairs[0]
+        return PAIR, (p, *[r for r in desc if r != p][:3])
+
+    return HIGH_CARD, tuple(desc[:5])
+
+
+def _best_from_flush_mask(mask):
+    high = _straight_high(mask)
+    if high is not None:
+        return STRAIGHT_FLUSH, (high,)
+    return FLUSH, tuple([r for r in range(12, -1, -1) if mask >> r & 1][:5])
+
+
+def _count_vectors(k):
+    # all rank-count vectors (entries 0..4) summing to k
+    def rec(i, left):
+        if i == 12:
+            if left <= 4:
+                yield (left,)
+            return
+        for c in range(min(4, left) + 1):
+            for tail in rec(i + 1, left - c):
+                yield (c,) + tail
+    return rec(0, k)
+
+
+def build_tables():
+    """enumerate every rank pattern once and return (noflush, flush) uint16 tables."""
+    # every best-5 result also shows up as a plain 5-card hand, so the
+    # 5-card patterns are enough to number the hands inside each category
+    seen = {_best_from_counts(c) for c in _count_vectors(5)}
+    seen |= {_best_from_flush_mask(m) for m in range(1 << 13) if bin(m).count("1") == 5}
+
+    index = {}
+    for cat in range(9):
+        inside = sorted(kick for c, kick in seen if c == cat)
+        for i, kick in enumerate(inside):
+            index[(cat, kick)] = (cat << CATEGORY_SHIFT) | i
+
+    noflush = np.zeros(TABLE_SIZE, dtype=np.uint16)
+    for k in (5, 6, 7):
+        for counts in _count_vectors(k):
+            noflush[_count_key(counts, k)] = index[_best_from_counts(counts)]
+
+    flush = np.zeros(1 << 13, dtype=np.uint16)
+    for m in range(1 << 13):
+        if bin(m).count("1") >= 5:
+            flush[m] = index[_best_from_flush_mask(m)]
+
+    return noflush, flush
+
+
+def _save_atomic(path, arr):
+    # write to a temp file then rename, so a worker never maps a half-written table
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, "wb") as fh:
+        np.save(fh, arr)
+    os.replace(tmp, path)
+
+
+def _load_tables():
+    if not (os.path.exists(NOFLUSH_PATH) and os.path.exists(FLUSH_PATH)):
+        noflush, flush = build_tables()
+        os.makedirs(TABLE_DIR, exist_ok=True)
+        _save_atomic(NOFLUSH_PATH, noflush)
+        _save_atomic(FLUSH_PATH, flush)
+    return np.load(NOFLUSH_PATH, mmap_mode="r"), np.load(FLUSH_PATH, mmap_mode="r")
+
+
+NOFLUSH_TABLE, FLUSH_TABLE = _load_tables()
+
+
+
+# ====== public API ======
+def evaluate(cards):
+    """score one 5/6/7-card hand (ints). bigger is better."""
+    counts = [0] * 13
+    masks = [0, 0, 0, 0]
+    for c in cards:
+        r = c % 13
+        counts[r] += 1
+        masks[c // 13] |= 1 << r
+
+    best = int(NOFLUSH_TABLE[_count_key(counts, len(cards))])
+    for m in masks:
+        if m.bit_count() >= 5:     # only a 5+ card suit can make a flush
+            best = max(best, int(FLUSH_TABLE[m]))
+    return best
+
+
+def evaluate_mask(mask):
+    """score a hand given as a card bitmask (5..7 bits)."""
+    counts = rank_counts(mask)
+    best = int(NOFLUSH_TABLE[_count_key(counts, sum(counts))])
+    for s in range(4):
+        m = suit_ranks(mask, s)
+        if m.bit_count() >= 5:
+            best = max(best, int(FLUSH_TABLE[m]))
+    return best
+
+
+def evaluate_batch(hands):
+    """score an (n, k) int array of hands, k in 5..7. returns uint16 scores."""
+    hands = np.asarray(hands)
+    n, k = hands.shape
+    if not 5 <= k <= 7:
+        raise ValueError(f"evaluate_batch needs 5 to 7 cards per hand, got {k}")
+
+    out = np.empty(n, dtype=np.uint16)
+    for lo in range(0, n, BATCH_CHUNK):
+        out[lo:lo + BATCH_CHUNK] = _evaluate_chunk(hands[lo:lo + BATCH_CHUNK], k)
+    return out
+
+
+def _evaluate_chunk(hands, k):
+    hands = hands.astype(np.int32, copy=False)
+    m = hands.shape[0]
+    ranks = _RANK_OF.take(hands)
+
+    # rank counts in one bincount, laid out rank-major so each row below is contiguous
+    rows = np.arange(m, dtype=np.int32)[:, None]
+    counts = np.bincount((ranks * m + rows).ravel(), minlength=13 * m).reshape(13, m).astype(np.int32)
+
+    key = np.full(m, _BASE[k], dtype=np.int32)
+    left = np.full(m, k, dtype=np.int32)
+    idx = np.empty(m, dtype=np.int32)
+    for i in range(13):
+        q = counts[i]
+        np.multiply(q, 8, out=idx)
+        idx += left
+        idx += i * 40
+        key += _OFF_FLAT.take(idx)
+        left -= q
+
+    best = NOFLUSH_TABLE[key]
+
+    # cards are distinct, so summing 1 << card is the same as OR-ing them;
+    # each suit then sits in its own 13-bit field of the 52-bit mask
+    full = np.left_shift(np.int64(1), hands.astype(np.int64)).sum(axis=1)
+    for s in range(4):
+        best = np.maximum(best, FLUSH_TABLE[(full >> (13 * s)) & 0x1FFF])
+    return best
+
+
+def hand_category(score):
+    """category index (0 = high card .. 8 = straight flush); works on arrays too."""
+    return score >> CATEGORY_SHIFT
+
+
+def category_name(score):
+    return HAND_CATEGORIES[int(score) >> CATEGORY_SHIFT]
+
+
+if __name__ == "__main__":
+    # rebuild the tables on disk: python -m utils.poker_tools
+    nf, fl = build_tables()
+    os.makedirs(TABLE_DIR, exist_ok=True)
+    _save_atomic(NOFLUSH_PATH, nf)
+    _save_atomic(FLUSH_PATH, fl)
+    print(f"saved {NOFLUSH_PATH} ({nf.size} slots) and {FLUSH_PATH} ({fl.size} slots)")
@@ -0,0 +1,105 @@
+# poker/utils/preflop_data.py
+"""
+the preflop table (data/date_ready_for_using.csv), loaded once and indexed.
+
+rows are matched to the 169 classes of utils/hand_classes.py, so row k is class
+k everywhere (grid cell row * 13 + col).
+
+percentile ranges: for every player count and metric ("win" or "ev") the
+classes are sorted best first, with a running total of combos. "top X% for N
+players" is then one searchsorted on that running total.
+"""
+import os
+import numpy as np
+import pandas as pd
+
+from utils.hand_classes import CLASS_LABELS, CLASS_COMBO_COUNT, N_COMBOS
+
+
+CURRENT_DIR = os.path.dirname(__file__)
+DATA_PATH = os.path.join(CURRENT_DIR, "..", "data", "date_ready_for_using.csv")
+
+PLAYER_COUNTS = list(range(2, 11))
+METRICS = {"win": "{n}_win", "ev": "EV_{n}p"}
+
+
+def _load():
+    df = pd.read_csv(DATA_PATH)
+    df.columns = df.columns.str.strip()
+    df["hand"] = df["hand"].str.strip()
+    # put rows in class order (the csv already is, but do not rely on it)
+    pos = {h: i for i, h in enumerate(df["hand"])}
+    return df.iloc[[pos[h] for h in CLASS_LABELS]].reset_index(drop=True)
+
+
+TABLE = _load()
+
+
+
+# ====== percentile index ======
+def _build_order():
+    order, cum = {}, {}
+    for n in PLAYER_COUNTS:
+        for metric, col in METRICS.items():
+            values = TABLE[col.format(n=n)].to_numpy(dtype=float)
+            idx = np.argsort(-values, kind="stable")
+            order[(n, metric)] = idx
+            cum[(n, metric)] = np.cumsum(CLASS_COMBO_COUNT[idx])
+    return order, cum
+
+
+RANK_ORDER, CUM_COMBOS = _build_order()
+
+
+def top_classes(percent, players=6, metric="win"):
+    """class indices of the best `percent` % of combos (whole classes, rounded to
+    the nearest class boundary). binary search on the running combo total."""
+    cum = CUM_COMBOS[(players, metric)]
+    target = float(np.clip(percent, 0, 100)) / 100.0 * N_COMBOS
+    if target <= 0:
+        return RANK_ORDER[(players, metric)][:0]
+    k = int(np.searchsorted(cum, target))
+    # take the class that crosses the target if that lands closer to it
+    if k < len(cum) and (k == 0 or cum[k] - target < target - cum[k - 1]):
+        k += 1
+    return RANK_ORDER[(players, metric)][:k]
+
+
+def top_percent_combos(percent, players=6, metric="win"):
+    """(class indices, combo count) for the top `percent` % range."""
+    classes = top_classes(percent, players, metric)
+    return classes, int(CLASS_COMBO_COUNT[classes].sum())
+
+
+
+# ====== hand aliases -> row ======
+# every way people write a class: AKs / KAs, AKo / KAo / AK, AA / AAs / AAo.
+# "10" is folded to "T" before the lookup. a bare non-pair ("AK") goes to the
+# first matching row, like the old dataframe scan did (the suited one).
+def _build_aliases():
+    aliases = {}
+    for k, label in enumerate(CLASS_LABELS):
+        a, b, suffix = label[0], label[1], label[2].upper()
+        if a == b:
+            names = [a + b, a + b + "S", a + b + "O"]
+        else:
+            names = [a + b + suffix, b + a + suffix, a + b, b + a]
+        for name in names:
+            aliases.setdefault(name, k)
+    return aliases
+
+
+HAND_INDEX = _build_aliases()
+
+
+def hand_index(hand_str):
+    """row / class index for any alias of a hand, or None."""
+    return HAND_INDEX.get(str(hand_str).strip().upper().replace("10", "T"))
+
+
+
+# ====== per player count columns as arrays (row k = class k) ======
+WIN = {n: TABLE[f"{n}_win"].to_numpy(dtype=float) for n in PLAYER_COUNTS}
+TIE = {n: TABLE[f"{n}_tie"].to_numpy(dtype=float) for n in PLAYER_COUNTS}
+EV = {n: TABLE[f"EV_{n}p"].to_numpy(dtype=float) for n in PLAYER_COUNTS}
+REC = {n: TABLE[f"rec_{n}p"].astype(str).to_numpy() for n in PLAYER_COUNTS}
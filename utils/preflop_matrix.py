@@ -0,0 +1,143 @@
+# poker/utils/preflop_matrix.py
+"""
+169 x 169 heads-up all-in equity, class against class.
+
+- EQUITY[i, j] = equity of class i against class j, averaged over every pair of
+  combos that do not share a card (card removal: AKs vs AKo leaves 24 such
+  pairs, not 4 x 12). class order is utils/hand_classes.py (the chapter 2 grid order).
+- PAIR_WEIGHT[i, j] = how many of those combo pairs exist; exact, and built on
+  import from the (169, 52) per-card combo counts (one small matmul, < 1 ms).
+- the equity table is built offline (python -m utils.preflop_matrix), saved as
+  .npy and memory-mapped on import.
+
+hand vs range is then a weighted row average: weight each class by how much of
+it is in the range times the combo pairs it leaves, see `equity_vs_range`. the
+weights are applied per query, so EQUITY stays the mmap'd file (no copy per worker).
+"""
+import argparse
+import os
+import numpy as np
+
+from utils.hand_classes import N_CLASSES, COMBOS, COMBO_CLASS, CLASS_COMBOS, CLASS_COMBO_COUNT
+from utils.poker_tools import evaluate_batch
+
+
+CURRENT_DIR = os.path.dirname(__file__)
+MATRIX_PATH = os.path.join(CURRENT_DIR, "..", "data", "preflop_hu_equity.npy")
+
+BUILD_SAMPLES = 6000        # deals per class pair (SE of one cell < 0.0065)
+BUILD_SEED = 169
+BUILD_CHUNK = 1 << 17       # deals per evaluate pass
+
+
+
+# ====== exact combo-pair weights ======
+def _pair_weights():
+    # card_count[k, c] = combos of class k holding card c. two combos clash when they
+    # share a card, so clashing pairs are sum_c card_count[i, c] card_count[j, c],
+    # except that a combo against itself shares both cards and is counted twice
+    card_count = np.zeros((N_CLASSES, 52))
+    np.add.at(card_count, (np.repeat(COMBO_CLASS, 2), COMBOS.ravel()), 1.0)
+    n = CLASS_COMBO_COUNT.astype(float)
+    return np.outer(n, n) - card_count @ card_count.T + np.diag(n)
+
+
+PAIR_WEIGHT = _pair_weights()
+
+
+
+# ====== offline build ======
+# ragged CLASS_COMBOS as a padded (169, 12) table
+_CLASS_TABLE = np.zeros((N_CLASSES, CLASS_COMBO_COUNT.max()), dtype=np.int64)
+for _k, _idx in enumerate(CLASS_COMBOS):
+    _CLASS_TABLE[_k, :len(_idx)] = _idx
+
+
+def _sample_combos(classes, rng):
+    # one random combo of each requested class
+    pick = (rng.random(len(classes)) * CLASS_COMBO_COUNT[classes]).astype(np.int64)
+    return COMBOS[_CLASS_TABLE[classes, pick]].astype(np.int64)
+
+
+def build_matrix(samples=BUILD_SAMPLES, seed=BUILD_SEED, log=None):
+    """monte carlo class-vs-class equity. only i < j is simulated; the rest is
+    1 - transpose, and the diagonal is 0.5 by symmetry."""
+    rng = np.random.default_rng(seed)
+    iu, ju = np.triu_indices(N_CLASSES, 1)
+    pair_of_row = np.repeat(np.arange(len(iu)), samples)
+
+    share = np.zeros(len(iu))
+    valid = np.zeros(len(iu))
+    for start in range(0, len(pair_of_row), BUILD_CHUNK):
+        rows = pair_of_row[start:start + BUILD_CHUNK]
+        n = len(rows)
+        a = _sample_combos(iu[rows], rng)
+        b = _sample_combos(ju[rows], rng)
+        ok = (a[:, :, None] != b[:, None, :]).all(axis=(1, 2))
+
+        # board: random keys, the four hole cards pushed last, take the 5 smallest
+        keys = rng.random((n, 52))
+        keys[np.arange(n)[:, None], np.hstack([a, b])] = 2.0
+        board = np.argpartition(keys, 5, axis=1)[:, :5]
+        scores = evaluate_batch(np.vstack([np.hstack([a, board]), np.hstack([b, board])])).reshape(2, n)
+
+        win = (scores[0] > scores[1]) + 0.5 * (scores[0] == scores[1])
+        share += np.bincount(rows[ok], weights=win[ok], minlength=len(iu))
+        valid += np.bincount(rows[ok], minlength=len(iu))
+        if log:
+            log(f"{min(start + BUILD_CHUNK, len(pair_of_row))} / {len(pair_of_row)} deals")
+
+    eq = np.full((N_CLASSES, N_CLASSES), 0.5)
+    eq[iu, ju] = share / valid
+    eq[ju, iu] = 1.0 - eq[iu, ju]
+    return eq.astype(np.float32)
+
+
+def _save_atomic(path, arr):
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, "wb") as fh:
+        np.save(fh, arr)
+    os.replace(tmp, path)
+
+
+def _load():
+    if not os.path.exists(MATRIX_PATH):
+        _save_atomic(MATRIX_PATH, build_matrix())
+    return np.load(MATRIX_PATH, mmap_mode="r")
+
+
+EQUITY = _load()
+
+
+
+# ====== lookups ======
+def range_vector(classes, fractions=None):
+    """(169,) vector of how much of each class is in the range (0..1)."""
+    vec = np.zeros(N_CLASSES)
+    vec[list(classes)] = 1.0 if fractions is None else fractions
+    return vec
+
+
+def equity_vs_range(range_vec):
+    """equity of every class against a range vector (NaN for an empty range)."""
+    range_vec = np.asarray(range_vec, dtype=float)
+    # weight the range per row here; a weighted copy of EQUITY would undo the mmap
+    weights = PAIR_WEIGHT * range_vec
+    num = np.einsum("ij,ij->i", EQUITY, weights)
+    den = weights.sum(axis=1)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return np.where(den > 0, num / den, np.nan)
+
+
+def equity_vs_class(i, j):
+    return float(EQUITY[i, j])
+
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser(description="rebuild the 169x169 heads-up equity matrix")
+    ap.add_argument("--samples", type=int, default=BUILD_SAMPLES)
+    ap.add_argument("--seed", type=int, default=BUILD_SEED)
+    args = ap.parse_args()
+    eq = build_matrix(args.samples, args.seed, log=print)
+    _save_atomic(MATRIX_PATH, eq)
+    print(f"saved {MATRIX_PATH}")
@@ -0,0 +1,212 @@
+# poker/utils/preflop_pipeline.py
+"""
+rebuild data/date_ready_for_using.csv from first principles.
+
+    python -m utils.preflop_pipeline --players 2-10 --target-se 0.002 --workers 4
+
+- work is split into shards of (player count, shard number); every shard deals
+  `--trials` all-in hands per class (169 classes) with the batch evaluator
+- each shard has its own seed, SeedSequence([seed, players, shard]), so results
+  do not depend on worker count or the order shards finish in
+- finished shards are saved under --checkpoint-dir and skipped on the next run,
+  so a killed run just resumes. the file name carries seed and trials, so a run
+  with other settings never picks up (or mixes in) those shards
+- shards are added in waves until the worst class' win-rate standard error is
+  under --target-se (or --max-shards is hit)
+
+like the source table, `tie` is the pot share won in split pots (1/k for a k-way
+tie), so win + tie is the hand's equity. EV / recommendation / tag columns use
+the same rules as "data grabbing.py".
+"""
+import argparse
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from utils.hand_classes import CLASS_LABELS, CLASS_COMBOS, COMBOS, N_CLASSES
+from utils.poker_tools import evaluate_batch
+
+
+CURRENT_DIR = os.path.dirname(__file__)
+DATA_DIR = os.path.join(CURRENT_DIR, "..", "data")
+DEFAULT_CKPT = os.path.join(DATA_DIR, "preflop_checkpoints")
+DEFAULT_OUT = os.path.join(DATA_DIR, "preflop_rebuilt.csv")
+
+# same thresholds as "data grabbing.py"
+THRESH_RAISE = 0.30
+THRESH_CALL = 0.00
+
+
+
+# ====== one shard ======
+def simulate_class(k, players, trials, rng):
+    """(wins, tie share) for `trials` all-in deals of class k against players-1 random hands."""
+    combos = COMBOS[CLASS_COMBOS[k]]
+    hero = combos[rng.integers(len(combos), size=trials)].astype(np.int64)
+
+    # deal the rest from the deck minus hero: random keys, hero cards pushed last
+    need = 2 * (players - 1) + 5
+    keys = rng.random((trials, 52))
+    keys[np.arange(trials)[:, None], hero] = 2.0
+    dealt = np.argpartition(keys, need, axis=1)[:, :need]
+
+    board = dealt[:, -5:]
+    hands = [hero] + [dealt[:, 2 * i:2 * i + 2] for i in range(players - 1)]
+    scores = evaluate_batch(np.concatenate([np.hstack([h, board]) for h in hands])).reshape(players, trials)
+
+    best_villain = scores[1:].max(axis=0)
+    wins = int((scores[0] > best_villain).sum())
+    tied = scores[0] == best_villain
+    ties = float((1.0 / (1 + (scores[1:, tied] == best_villain[tied]).sum(axis=0))).sum())
+    return wins, ties
+
+
+def shard_prefix(players, trials, seed):
+    """file name start shared by every shard of one (players, trials, seed) run."""
+    return f"p{players}_t{trials}_seed{seed}_s"
+
+
+def run_shard(task):
+    players, shard, trials, seed, ckpt_dir = task
+    path = os.path.join(ckpt_dir, f"{shard_prefix(players, trials, seed)}{shard:04d}.npz")
+    if os.path.exists(path):
+        return path
+
+    rng = np.random.default_rng(np.random.SeedSequence([seed, players, shard]))
+    wins = np.zeros(N_CLASSES, dtype=np.int64)
+    ties = np.zeros(N_CLASSES)
+    for k in range(N_CLASSES):
+        wins[k], ties[k] = simulate_class(k, players, trials, rng)
+
+    tmp = f"{path}.{os.getpid()}.tmp.npz"
+    np.savez(tmp, wins=wins, ties=ties, trials=np.int64(trials))
+    os.replace(tmp, path)
+    return path
+
+
+
+# ====== aggregation ======
+def load_totals(ckpt_dir, players, trials, seed):
+    """summed wins / ties / trials over every finished shard of one player count and run."""
+    wins = np.zeros(N_CLASSES, dtype=np.int64)
+    ties = np.zeros(N_CLASSES)
+    n = 0
+    prefix = shard_prefix(players, trials, seed)
+    for name in sorted(os.listdir(ckpt_dir)):
+        if name.startswith(prefix) and name.endswith(".npz") and ".tmp" not in name:
+            with np.load(os.path.join(ckpt_dir, name)) as z:
+                wins += z["wins"]
+                ties += z["ties"]
+                n += int(z["trials"])
+    return wins, ties, n
+
+
+def worst_se(wins, n):
+    if n == 0:
+        return np.inf
+    p = wins / n
+    return float(np.sqrt(p * (1 - p) / n).max())
+
+
+def rec(ev):
+    if ev >= THRESH_RAISE:
+        return "Raise"
+    elif ev >= THRESH_CALL:
+        return "Call"
+    return "Fold"
+
+
+def tag(ev):
+    if ev >= 0.50:
+        return "Premium"
+    elif ev >= 0.10:
+        return "Strong"
+    elif ev >= -0.20:
+        return "Speculative"
+    return "Marginal"
+
+
+def build_frame(ckpt_dir, player_counts, trials, seed):
+    """csv frame in the same column layout as date_ready_for_using.csv."""
+    df = pd.DataFrame({"hand": CLASS_LABELS})
+    totals = {p: load_totals(ckpt_dir, p, trials, seed) for p in player_counts}
+    for p in player_counts:
+        wins, _, n = totals[p]
+        df[f"{p}_win"] = wins / n
+    for p in player_counts:
+        _, ties, n = totals[p]
+        df[f"{p}_tie"] = ties / n
+    for p in player_counts:
+        # EV = win*N + tie*N/2 - 1 (in BB), as in "data grabbing.py"
+        ev = df[f"{p}_win"] * p + df[f"{p}_tie"] * (p / 2) - 1
+        df[f"EV_{p}p"] = ev
+        df[f"rec_{p}p"] = ev.apply(rec)
+        df[f"tag_{p}p"] = ev.apply(tag)
+    return df
+
+
+
+# ====== driver ======
+def parse_players(text):
+    out = []
+    for part in text.split(","):
+        if "-" in part:
+            a, b = part.split("-")
+            out.extend(range(int(a), int(b) + 1))
+        else:
+            out.append(int(part))
+    return sorted(set(out))
+
+
+def run(player_counts, trials=2000, shards_per_wave=4, max_shards=64, target_se=None,
+        seed=2024, workers=None, ckpt_dir=DEFAULT_CKPT, log=print):
+    os.makedirs(ckpt_dir, exist_ok=True)
+    next_shard = {p: 0 for p in player_counts}
+    pending = list(player_counts)
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        while pending:
+            tasks = []
+            for p in pending:
+                # without a target one wave is the whole job
+                count = shards_per_wave if target_se else max_shards
+                for s in range(next_shard[p], min(next_shard[p] + count, max_shards)):
+                    tasks.append((p, s, trials, seed, ckpt_dir))
+                next_shard[p] = min(next_shard[p] + count, max_shards)
+            list(pool.map(run_shard, tasks))
+
+            still = []
+            for p in pending:
+                wins, _, n = load_totals(ckpt_dir, p, trials, seed)
+                se = worst_se(wins, n)
+                log(f"{p} players: {n} deals per class, worst win-rate SE {se:.4f}")
+                if target_se and se > target_se and next_shard[p] < max_shards:
+                    still.append(p)
+            pending = still
+
+    return build_frame(ckpt_dir, player_counts, trials, seed)
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="rebuild preflop win / tie / EV table")
+    ap.add_argument("--players", default="2-10", help="e.g. 2-10 or 2,6,9")
+    ap.add_argument("--trials", type=int, default=2000, help="deals per class per shard")
+    ap.add_argument("--shards-per-wave", type=int, default=4)
+    ap.add_argument("--max-shards", type=int, default=64)
+    ap.add_argument("--target-se", type=float, default=None, help="stop once every class is this precise")
+    ap.add_argument("--seed", type=int, default=2024)
+    ap.add_argument("--workers", type=int, default=None)
+    ap.add_argument("--checkpoint-dir", default=DEFAULT_CKPT)
+    ap.add_argument("--out", default=DEFAULT_OUT)
+    args = ap.parse_args(argv)
+
+    df = run(parse_players(args.players), args.trials, args.shards_per_wave, args.max_shards,
+             args.target_se, args.seed, args.workers, args.checkpoint_dir)
+    df.to_csv(args.out, index=False)
+    print(f"saved {args.out}")
+
+
+if __name__ == "__main__":
+    main()
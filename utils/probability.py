@@ -0,0 +1,174 @@
+# poker/utils/probability.py
+"""
+"did I hit one of my outs?" odds, done with NumPy. chapter 1 (and the old
+probability_simulator page) read every number from here.
+
+- monte_carlo_hit draws whole batches of deals as arrays (no python loop per
+  trial) and can stop early once the confidence interval is tight enough
+  (sample_to_target, which the table build below uses too).
+- outs_curves returns rule / exact / monte for whole arrays of spots at once,
+  from a table built at import.
+"""
+import numpy as np
+
+from utils import hypergeom
+
+
+Z_95 = 1.959963984540054
+
+
+def default_unseen(cards_left):
+    """unseen cards when counting from the flop (2 to come) or the turn (1 to come)."""
+    return 47 if cards_left == 2 else 46
+
+
+def wilson_interval(hits, n, z=Z_95):
+    """(low, high) score interval for a binomial rate; behaves at p = 0 or 1.
+    hits may be an array (one interval per entry)."""
+    if n == 0:
+        return 0.0, 1.0
+    p = hits / n
+    denom = 1 + z * z / n
+    mid = (p + z * z / (2 * n)) / denom
+    half = z * np.sqrt(p * (1 - p) / n + z * z / (4 * n * n)) / denom
+    return np.maximum(0.0, mid - half), np.minimum(1.0, mid + half)
+
+
+def sample_min_index(n, cards_left, unseen, rng):
+    """lowest deck position among `cards_left` cards dealt without replacement.
+
+    outs sit at positions [0, outs), so "hit" is just `min_index < outs`;
+    one batch therefore answers every outs count at once.
+    """
+    picks = np.empty((n, 0), dtype=np.int16)
+    for j in range(cards_left):
+        # pick among the unseen - j cards still left, then step over the ones
+        # already taken (ascending order) to get the real deck position
+        x = rng.integers(0, unseen - j, size=n, dtype=np.int16)
+        for col in range(j):
+            x += x >= picks[:, col]
+        picks = np.sort(np.column_stack([picks, x]), axis=1)
+    return picks[:, 0]
+
+
+def sample_to_target(draw, trials=20000, target_ci=None, max_trials=500000):
+    """add up draw(n) -> hit counts (scalar or array) batch by batch.
+
+    - fixed size: one batch of `trials` deals
+    - target_ci (e.g. 0.005 = ±0.5%): keep adding batches sized from the current
+      estimate until every 95% wilson half-width is under target (or max_trials)
+
+    returns (hits, trials done).
+    """
+    n_done, hits = 0, 0
+    batch = trials if target_ci is None else min(trials, 4000)
+    while True:
+        hits = hits + draw(batch)
+        n_done += batch
+        if target_ci is None or n_done >= max_trials:
+            break
+        low, high = wilson_interval(hits, n_done)
+        if np.max((high - low) / 2) <= target_ci:
+            break
+
+        # normal-approx trials needed for the target at the widest entry, minus what we have
+        p = np.clip(hits / n_done, 1e-3, 1 - 1e-3)
+        need = int(Z_95 * Z_95 * np.max(p * (1 - p)) / (target_ci * target_ci)) - n_done
+        batch = int(min(max(need, 1000), max_trials - n_done))
+    return hits, n_done
+
+
+def monte_carlo_hit(outs, cards_left, unseen=None, trials=20000, target_ci=None,
+                    max_trials=500000, rng=None):
+    """chance to hit at least one out, by simulation (see sample_to_target for
+    trials / target_ci / max_trials).
+
+    returns dict(p, low, high, trials); p/low/high are fractions in [0, 1].
+    """
+    unseen = unseen or default_unseen(cards_left)
+    rng = rng if rng is not None else np.random.default_rng()
+
+    draw = lambda n: int((sample_min_index(n, cards_left, unseen, rng) < outs).sum())
+    hits, n_done = sample_to_target(draw, trials, target_ci, max_trials)
+    low, high = wilson_interval(hits, n_done)
+    return {"p": hits / n_done, "low": float(low), "high": float(high), "trials": n_done}
+
+
+
+# ====== one engine for every method ======
+# rule of 4 and 2 / exact / monte carlo, for whole arrays of (outs, cards_left, unseen).
+# the common cases live in a table built once at import (monte part seeded, so all
+# workers agree), so a full 0..20 outs curve is just a gather.
+METHODS = ("rule", "exact", "monte")
+MAX_OUTS = 20
+UNSEEN_RANGE = (40, 52)          # covers flop/turn with a few known dead cards
+TABLE_TARGET_CI = 0.003         # every monte entry of the table is this tight (95%)
+FALLBACK_TARGET_CI = 0.005      # spots outside the table, sampled on demand
+TABLE_SEED = 20240817
+
+
+def rule_of_4_and_2(outs, cards_left):
+    outs, cards_left = np.asarray(outs), np.asarray(cards_left)
+    return np.clip(outs * np.where(cards_left == 2, 4, 2) / 100.0, 0.0, 1.0)
+
+
+def exact_hit(outs, cards_left, unseen):
+    """1 - P(miss every card), read from the hypergeometric table."""
+    outs, cards_left, unseen = np.broadcast_arrays(*(np.asarray(a, dtype=int) for a in (outs, cards_left, unseen)))
+    return hypergeom.p_hit(np.clip(outs, 0, unseen), cards_left, unseen)
+
+
+def _build_table():
+    u_lo, u_hi = UNSEEN_RANGE
+    outs = np.arange(MAX_OUTS + 1)
+    shape = (len(METHODS), 3, u_hi - u_lo + 1, MAX_OUTS + 1)       # method, cards_left, unseen, outs
+    table = np.zeros(shape)
+    monte_half = np.zeros(shape[1:])
+    rng = np.random.default_rng(TABLE_SEED)
+
+    for cl in (1, 2):
+        for u in range(u_lo, u_hi + 1):
+            table[0, cl, u - u_lo] = rule_of_4_and_2(outs, cl)
+            table[1, cl, u - u_lo] = exact_hit(outs, cl, u)
+
+            # one batch answers every outs count: hit <=> lowest dealt position < outs
+            draw = lambda n: np.concatenate([[0], np.cumsum(
+                np.bincount(sample_min_index(n, cl, u, rng), minlength=u))])[:MAX_OUTS + 1]
+            hits, n = sample_to_target(draw, target_ci=TABLE_TARGET_CI)
+            table[2, cl, u - u_lo] = hits / n
+            low, high = wilson_interval(hits, n)
+            monte_half[cl, u - u_lo] = (high - low) / 2
+    return table, monte_half
+
+
+PROB_TABLE, MONTE_HALF_WIDTH = _build_table()
+
+
+def outs_curves(outs=None, cards_left=2, unseen=None):
+    """every method's hit chance for arrays of outs / cards_left / unseen (broadcast).
+
+    outs defaults to 0..20, unseen to 47 (two to come) / 46 (one to come).
+    returns {"rule", "exact", "monte", "monte_half_width"} as fraction arrays.
+    table hits are a gather; anything outside the table falls back to the formulas
+    plus a fresh monte batch.
+    """
+    outs = np.arange(MAX_OUTS + 1) if outs is None else np.asarray(outs)
+    cards_left = np.asarray(cards_left)
+    unseen = np.where(cards_left == 2, 47, 46) if unseen is None else np.asarray(unseen)
+    outs, cards_left, unseen = np.broadcast_arrays(outs, cards_left, unseen)
+
+    u_lo, u_hi = UNSEEN_RANGE
+    in_table = ((outs >= 0) & (outs <= MAX_OUTS) & np.isin(cards_left, (1, 2))
+                & (unseen >= u_lo) & (unseen <= u_hi))
+    if in_table.all():
+        idx = (cards_left, unseen - u_lo, outs)
+        return {"rule": PROB_TABLE[0][idx], "exact": PROB_TABLE[1][idx],
+                "monte": PROB_TABLE[2][idx], "monte_half_width": MONTE_HALF_WIDTH[idx]}
+
+    monte = np.empty(outs.shape)
+    half = np.empty(outs.shape)
+    for i in np.ndindex(outs.shape):
+        res = monte_carlo_hit(int(outs[i]), int(cards_left[i]), int(unseen[i]), target_ci=FALLBACK_TARGET_CI)
+        monte[i], half[i] = res["p"], (res["high"] - res["low"]) / 2
+    return {"rule": rule_of_4_and_2(outs, cards_left), "exact": exact_hit(outs, cards_left, unseen),
+            "monte": monte, "monte_half_width": half}
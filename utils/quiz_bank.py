@@ -0,0 +1,151 @@
+# poker/utils/quiz_bank.py
+"""
+precomputed "count the outs" questions for chapter 1.
+
+build offline (python -m utils.quiz_bank), load on import:
+- sample hole + flop spots with a fixed seed
+- exact outs from utils.outs, plus a draw type and a difficulty bucket
+- rows sorted by (difficulty, outs), with start offsets per difficulty
+
+serving a question is one random index into a bucket, and checking an answer
+reads the stored outs / category counts for that row.
+"""
+import argparse
+import os
+import numpy as np
+
+from utils.poker_tools import HAND_CATEGORIES
+
+
+CURRENT_DIR = os.path.dirname(__file__)
+BANK_PATH = os.path.join(CURRENT_DIR, "..", "data", "outs_quiz_bank.npz")
+
+DRAW_TYPES = ["No Draw", "Overcards", "Gutshot", "Open-Ended", "Flush Draw",
+              "Combo Draw", "Made Hand Improving"]
+DIFFICULTIES = ["easy", "medium", "hard"]
+
+# random flops are mostly "pair that can improve"; cap each draw type so the
+# bank stays varied, and keep a few "0 outs" questions (a good lesson too)
+TYPE_CAP = 3000
+NO_DRAW_CAP = 600
+
+
+
+# ====== classify one spot ======
+def classify(res):
+    """(draw type index, difficulty index) from a utils.outs result."""
+    by_cat = {k: len(v) for k, v in res["by_category"].items()}
+    flush, straight = by_cat.get("Flush", 0), by_cat.get("Straight", 0)
+
+    if not by_cat:
+        draw = 0
+    elif flush and straight:
+        draw = 5
+    elif flush:
+        draw = 4
+    elif straight:
+        # flush-suited straight cards are counted as flush outs, so 6+ is still open-ended
+        draw = 3 if straight >= 6 else 2
+    elif res["current"] != HAND_CATEGORIES[0]:
+        draw = 6
+    else:
+        draw = 1
+
+    # easy: one clean idea; hard: combo draws or 3+ kinds of improvement
+    if draw in (0, 1, 4) and len(by_cat) <= 2:
+        level = 0
+    elif draw == 5 or len(by_cat) >= 3:
+        level = 2
+    else:
+        level = 1
+    return draw, level
+
+
+
+# ====== offline build ======
+def build_bank(samples=40000, seed=7):
+    from utils.outs import count_outs     # only needed offline
+
+    rng = np.random.default_rng(seed)
+    rows = []
+    per_type = [0] * len(DRAW_TYPES)
+    for _ in range(samples):
+        dealt = rng.choice(52, size=5, replace=False).tolist()
+        res = count_outs(dealt[:2], dealt[2:])
+        draw, level = classify(res)
+
+        counts = [0] * len(HAND_CATEGORIES)
+        for cat, ids in res["by_category"].items():
+            counts[HAND_CATEGORIES.index(cat)] = len(ids)
+        if per_type[draw] >= (NO_DRAW_CAP if draw == 0 else TYPE_CAP):
+            continue
+        per_type[draw] += 1
+        rows.append((level, len(res["outs"]), draw, dealt, counts))
+
+    rows.sort(key=lambda r: (r[0], r[1]))
+
+    level = np.array([r[0] for r in rows], dtype=np.uint8)
+    return {
+        "cards":      np.array([r[3] for r in rows], dtype=np.uint8),
+        "outs":       np.array([r[1] for r in rows], dtype=np.uint8),
+        "draw_type":  np.array([r[2] for r in rows], dtype=np.uint8),
+        "difficulty": level,
+        "by_category": np.array([r[4] for r in rows], dtype=np.uint8),
+        # offsets[d] .. offsets[d+1] = rows of difficulty d
+        "offsets":    np.searchsorted(level, np.arange(len(DIFFICULTIES) + 1)).astype(np.int32),
+    }
+
+
+def save_bank(bank, path=BANK_PATH):
+    tmp = f"{path}.{os.getpid()}.tmp.npz"
+    np.savez_compressed(tmp, **bank)
+    os.replace(tmp, path)
+
+
+def _load():
+    if not os.path.exists(BANK_PATH):
+        save_bank(build_bank())
+    with np.load(BANK_PATH) as z:
+        return {k: z[k] for k in z.files}
+
+
+BANK = _load()
+
+
+
+# ====== serving ======
+def pick_question(difficulty=None, rng=np.random):
+    """random row id, optionally inside one difficulty bucket ('easy' / 'medium' / 'hard')."""
+    off = BANK["offsets"]
+    if difficulty in DIFFICULTIES:
+        d = DIFFICULTIES.index(difficulty)
+        lo, hi = int(off[d]), int(off[d + 1])
+    else:
+        lo, hi = 0, int(off[-1])
+    return int(rng.randint(lo, hi))
+
+
+def question(qid):
+    """hole / flop card ids for one row (json-friendly ints)."""
+    row = BANK["cards"][qid].tolist()
+    return {"id": int(qid), "hole": row[:2], "flop": row[2:]}
+
+
+def answer(qid):
+    """(outs, explain lines, draw type name) for one row; nothing is recomputed."""
+    counts = BANK["by_category"][qid]
+    explain = [f"{HAND_CATEGORIES[c]} → {int(counts[c])} outs"
+               for c in range(len(HAND_CATEGORIES) - 1, -1, -1) if counts[c]]
+    return int(BANK["outs"][qid]), explain, DRAW_TYPES[int(BANK["draw_type"][qid])]
+
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser(description="rebuild the chapter 1 outs quiz bank")
+    ap.add_argument("--samples", type=int, default=40000)
+    ap.add_argument("--seed", type=int, default=7)
+    args = ap.parse_args()
+
+    bank = build_bank(args.samples, args.seed)
+    save_bank(bank)
+    sizes = np.diff(bank["offsets"]).tolist()
+    print(f"saved {BANK_PATH}: {len(bank['outs'])} questions, per difficulty {dict(zip(DIFFICULTIES, sizes))}")
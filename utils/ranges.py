@@ -0,0 +1,205 @@
+# poker/utils/ranges.py
+"""
+combo-level hand ranges.
+
+a Range is 1,326 weights (0..1), one per 2-card combo in utils/hand_classes.py
+order, so "AKo" is 12 combos and half of "AKs" is 2 combos. set-style ops are
+plain numpy on that vector:
+
+    r = Range.parse("QQ+, ATs+, KQo, 76s-54s")
+    r | other, r & other   # union = max, intersection = min
+    r * 0.5                # scale (mixed strategies)
+    r.remove(board)        # card removal: drop combos that use a dead card
+    r.n_combos, r.combos(), r.class_weights()
+
+notation (comma or space separated):
+- pairs: "QQ", "QQ+", "55-22"
+- non-pairs: "AKs", "AKo", "AK" (both), "ATs+" (kicker up to K), "A5s-A2s",
+  "76s-54s" (both ranks step down together)
+- exact combos: "AsKd", "A♠K♦"
+- "random" / "any" for every combo, and "AKs:0.5" for a weight
+
+parsing is memoized on the text, so the same preset string costs a dict lookup.
+"""
+import re
+from functools import lru_cache
+import numpy as np
+
+from utils import cards
+from utils.hand_classes import (N_COMBOS, N_CLASSES, COMBOS, COMBO_MASK, COMBO_CLASS,
+                                CLASS_COMBO_COUNT, CLASS_SPEC)
+
+
+# (hi, lo, suited) -> class index; pairs are stored with suited=False
+_CLASS_OF_SPEC = {spec: k for k, spec in enumerate(CLASS_SPEC)}
+_COMBO_INDEX = {(int(a), int(b)): i for i, (a, b) in enumerate(COMBOS)}
+
+_RANK_CHARS = "".join(cards.RANKS)
+_TOKEN = re.compile(rf"^([{_RANK_CHARS}])([{_RANK_CHARS}])([SO]?)(\+?)$")
+
+
+
+class Range:
+    """weighted set of the 1,326 combos."""
+
+    def __init__(self, weights=None):
+        self.weights = np.zeros(N_COMBOS) if weights is None else np.asarray(weights, dtype=float)
+
+    # ---- builders ----
+    @classmethod
+    def parse(cls, text):
+        """standard range notation -> Range. raises ValueError on junk."""
+        return cls(_parse_cached(_normalize(text)).copy())
+
+    @classmethod
+    def from_classes(cls, classes, weight=1.0):
+        """every combo of the given class indices (0..168)."""
+        return cls(np.where(np.isin(COMBO_CLASS, list(classes)), weight, 0.0))
+
+    @classmethod
+    def full(cls):
+        return cls(np.ones(N_COMBOS))
+
+    # ---- set-style ops ----
+    def __or__(self, other):
+        return Range(np.maximum(self.weights, other.weights))
+
+    def __and__(self, other):
+        return Range(np.minimum(self.weights, other.weights))
+
+    def __sub__(self, other):
+        return Range(np.clip(self.weights - other.weights, 0.0, 1.0))
+
+    def __mul__(self, k):
+        return Range(np.clip(self.weights * k, 0.0, 1.0))
+
+    __rmul__ = __mul__
+
+    def remove(self, dead_cards):
+        """drop every combo holding one of the dead card ids (board, hero's hand)."""
+        dead = np.uint64(cards.to_mask(dead_cards))
+        return Range(np.where((COMBO_MASK & dead) != 0, 0.0, self.weights))
+
+    # ---- read-outs ----
+    @property
+    def n_combos(self):
+        return float(self.weights.sum())
+
+    @property
+    def fraction(self):
+        """share of all 1,326 combos."""
+        return self.n_combos / N_COMBOS
+
+    def combo_indices(self):
+        return np.flatnonzero(self.weights > 0)
+
+    def combos(self):
+        """[card, card] pairs with non-zero weight."""
+        return COMBOS[self.combo_indices()].astype(int).tolist()
+
+    def class_combos(self):
+        """(169,) weighted combo count per class."""
+        return np.bincount(COMBO_CLASS, weights=self.weights, minlength=N_CLASSES)
+
+    def class_weights(self):
+        """(169,) share of each class in the range (what the 13x13 grid shows)."""
+        return self.class_combos() / CLASS_COMBO_COUNT
+
+    def __len__(self):
+        return int(np.count_nonzero(self.weights))
+
+    def __repr__(self):
+        return f"Range({self.n_combos:g} combos)"
+
+
+
+# ====== parser ======
+def _normalize(text):
+    # "QQ+ , ATs+" -> "QQ+,ATs+"; case is kept, exact combos need their suit letters
+    parts = re.split(r"[,\s]+", str(text or "").strip())
+    return ",".join(p for p in parts if p)
+
+
+def _rank(ch):
+    return cards.RANKS.index(ch)
+
+
+def _class_span(token):
+    """one token without weight -> list of class indices."""
+    t = token.upper().replace("10", "T")
+    if t in ("RANDOM", "ANY", "100%"):
+        return list(range(N_CLASSES))
+
+    if "-" in t:
+        a, b = (_TOKEN.match(x) for x in t.split("-"))
+        if not a or not b or a.group(4) or b.group(4) or a.group(3) != b.group(3):
+            raise ValueError(f"bad range span {token!r}")
+        hi1, lo1, hi2, lo2 = (_rank(a.group(1)), _rank(a.group(2)), _rank(b.group(1)), _rank(b.group(2)))
+        suffix = a.group(3)
+        if hi1 - hi2 != lo1 - lo2 and hi1 != hi2:
+            raise ValueError(f"bad range span {token!r}")
+        steps = max(abs(hi1 - hi2), abs(lo1 - lo2))
+        sign = -1 if (hi1 + lo1) > (hi2 + lo2) else 1
+        out = []
+        for s in range(steps + 1):
+            hi = hi1 + sign * s if hi1 != hi2 else hi1
+            lo = lo1 + sign * s
+            out += _classes_for(hi, lo, suffix)
+        return out
+
+    m = _TOKEN.match(t)
+    if not m:
+        raise ValueError(f"bad range token {token!r}")
+    hi, lo, suffix, plus = _rank(m.group(1)), _rank(m.group(2)), m.group(3), m.group(4)
+    hi, lo = max(hi, lo), min(hi, lo)
+    if not plus:
+        return _classes_for(hi, lo, suffix)
+    if hi == lo:                                # QQ+ -> QQ..AA
+        return [k for r in range(hi, 13) for k in _classes_for(r, r, "")]
+    # ATs+ -> ATs..AKs (kicker climbs, high card stays)
+    return [k for r in range(lo, hi) for k in _classes_for(hi, r, suffix)]
+
+
+def _classes_for(hi, lo, suffix):
+    hi, lo = max(hi, lo), min(hi, lo)
+    if hi == lo:
+        return [_CLASS_OF_SPEC[(hi, lo, False)]]
+    if suffix == "S":
+        return [_CLASS_OF_SPEC[(hi, lo, True)]]
+    if suffix == "O":
+        return [_CLASS_OF_SPEC[(hi, lo, False)]]
+    return [_CLASS_OF_SPEC[(hi, lo, True)], _CLASS_OF_SPEC[(hi, lo, False)]]
+
+
+def _exact_combo(token):
+    # "AsKd" / "A♠K♦" -> combo index, or None if it is not an exact hand
+    try:
+        pair = cards.parse_cards(token)
+    except ValueError:
+        return None
+    if len(pair) != 2 or pair[0] == pair[1]:
+        return None
+    return _COMBO_INDEX[tuple(sorted(pair))]
+
+
+@lru_cache(maxsize=256)
+def _parse_cached(text):
+    w = np.zeros(N_COMBOS)
+    for token in text.split(","):
+        weight = 1.0
+        if ":" in token:
+            token, _, raw = token.partition(":")
+            try:
+                weight = float(raw)
+            except ValueError:
+                raise ValueError(f"bad range weight {raw!r}") from None
+
+        idx = _exact_combo(token)
+        if idx is not None:
+            w[idx] = max(w[idx], weight)
+            continue
+        hit = np.isin(COMBO_CLASS, _class_span(token))
+        w[hit] = np.maximum(w[hit], weight)
+    w = np.clip(w, 0.0, 1.0)
+    w.setflags(write=False)
+    return w
@@ -0,0 +1,265 @@
+# poker/utils/risk.py
+"""
+risk of ruin and drawdowns for chapter 7.
+
+same model as utils/bankroll.py: results are a random walk with drift winrate
+and spread stdev per 100 hands (both BB). two ways to answer "how likely is it
+that I go broke / lose d BB from a peak":
+
+closed form (brownian motion, continuous time, t in units of 100 hands):
+- ruin_probability: P(the walk ever drops `bankroll` BB below the start),
+  exp(-2 mu B / sigma^2) for an endless run, the reflection formula for a
+  finite number of hands
+- drawdown_probability: P(max drawdown >= d within the run). the drawdown is a
+  brownian motion reflected at 0, so this is its survival in [0, d), written as
+  an eigenfunction series (roots of tan(theta) = theta / a, a = mu d / sigma^2)
+- expected_max_drawdown: integral of that tail
+
+simulation (simulate_ruin): every starting bankroll of a grid against the same
+sampled results (common random numbers), with absorbing barriers for ruin and
+an optional stop-loss, and an optional move-down rule that drops to lower
+stakes while the roll is short. without move-down every answer comes from the
+running minimum of each curve, so the whole grid is one comparison.
+
+    python -m utils.risk       # formulas vs simulation (CHECKS), exits 1 on a miss
+"""
+from functools import lru_cache
+from math import erf, sqrt
+import numpy as np
+
+from utils import bankroll
+
+
+BUY_IN = 100                                 # BB per buy-in
+BUYIN_GRID = np.arange(5, 105, 5)            # starting rolls, in buy-ins
+STAKE_LEVELS = (1.0, 0.5, 0.25)              # move-down ladder (fraction of the original stake)
+N_TERMS = 400                                # eigen terms in the drawdown series
+SERIES_LIMIT = 1e8                           # bigger terms cancel badly; those points fall back
+A_FLAT = 1e-7                                # |a - 1| below this takes the a == 1 (linear) mode
+
+
+
+# ====== closed form ======
+def _norm_cdf(x):
+    return 0.5 * (1.0 + np.vectorize(erf)(np.asarray(x, dtype=float) / sqrt(2.0)))
+
+
+def ruin_probability(bankroll_bb, winrate, stdev, hands=None):
+    """P(ever down `bankroll_bb` BB from the start). hands=None: an endless run."""
+    B = np.asarray(bankroll_bb, dtype=float)
+    mu, sigma = float(winrate), float(stdev)
+    if hands is None:
+        if mu <= 0:
+            return np.ones_like(B)
+        return np.exp(-2.0 * mu * B / sigma ** 2)
+    T = hands / 100.0
+    s = sigma * np.sqrt(T)
+    with np.errstate(over="ignore", invalid="ignore"):
+        tail = np.exp(-2.0 * mu * B / sigma ** 2) * _norm_cdf((-B + mu * T) / s)
+    tail = np.nan_to_num(tail, nan=0.0, posinf=0.0)
+    return np.clip(_norm_cdf((-B - mu * T) / s) + tail, 0.0, 1.0)
+
+
+def _bisect(f, lo, hi, iters=60):
+    """vectorized bisection of f on [lo, hi] (sign change assumed)."""
+    f_lo = np.sign(f(lo))
+    for _ in range(iters):
+        mid = 0.5 * (lo + hi)
+        same = np.sign(f(mid)) == f_lo
+        lo, hi = np.where(same, mid, lo), np.where(same, hi, mid)
+    return 0.5 * (lo + hi)
+
+
+def drawdown_probability(d, winrate, stdev, hands, n_terms=N_TERMS):
+    """P(max drawdown >= d BB within `hands`) for an array of d.
+
+    the drawdown D = running max - result is a brownian motion with drift -mu,
+    reflected at 0. P(D stays below d) solves the backward equation with
+    u'(0) = 0, u(d) = 0; with u = e^(k x) g (k = mu / sigma^2) the eigenfunctions
+    are g = sin(theta (d - x) / d), tan(theta) = theta / a, a = k d (plus one sinh
+    mode when a > 1, or the linear g = (d - x) / d when a == 1). points where the
+    series cancels badly come back NaN.
+    """
+    with np.errstate(over="ignore", invalid="ignore", divide="ignore"):
+        return _drawdown_probability(d, winrate, stdev, hands, n_terms)
+
+
+def _drawdown_probability(d, winrate, stdev, hands, n_terms):
+    scalar = np.ndim(d) == 0
+    d = np.atleast_1d(np.asarray(d, dtype=float))
+    mu, sigma, T = float(winrate), float(stdev), hands / 100.0
+    k = mu / sigma ** 2
+    out = np.full(d.shape, np.nan)
+    pos = d > 0
+    out[~pos] = 1.0
+    dd = d[pos][:, None]
+    a = k * dd
+    # a == 1: the small trig root and the sinh root both shrink to 0 and that mode
+    # turns linear; its weight tends to 3 from either side, so use the limit right there
+    flat = np.abs(a - 1) < A_FLAT
+
+    # trig modes: one root per branch of tan, n = 1..N, plus (0, pi/2) when 0 < a < 1
+    n = np.arange(1, n_terms + 1)[None, :]
+    F = lambda th: a * np.sin(th) - th * np.cos(th)
+    theta = _bisect(F, (n - 0.5) * np.pi + 0 * a, (n + 0.5) * np.pi + 0 * a)
+    first = _bisect(F, np.full_like(a, 1e-9), np.full_like(a, np.pi / 2))
+    theta = np.hstack([np.where((a > 0) & (a < 1) & ~flat, first, np.nan), theta])
+
+    beta = theta / dd
+    I2 = dd / 2 - np.sin(2 * theta) / (4 * beta)
+    expo = -a - 0.5 * sigma ** 2 * (k ** 2 + beta ** 2) * T
+    terms = np.sin(theta) * beta / ((k ** 2 + beta ** 2) * I2) * np.exp(expo)
+    terms = np.where(np.isnan(theta), 0.0, terms)
+
+    # sinh mode (a > 1): tanh(eta) = eta / a. eta sits right under a, so
+    # k^2 - (eta / d)^2 is taken from the root itself, (eta / d)^2 / sinh(eta)^2,
+    # and the weight 2 sinh^3 / (sinh cosh - eta) is kept in logs (it overflows)
+    H = lambda eta: a * np.tanh(eta) - eta
+    eta = _bisect(H, np.full_like(a, 1e-9), np.maximum(a, 1e-9))
+    big = eta > 20
+    log_sinh = np.where(big, eta - np.log(2), np.log(np.sinh(np.minimum(eta, 20))))
+    log_s2 = np.where(big, 2 * eta - np.log(4),
+                      np.log(np.sinh(np.minimum(eta, 20)) * np.cosh(np.minimum(eta, 20)) - eta))
+    gap = (eta / dd) ** 2 * np.exp(-2 * log_sinh)
+    hyper = np.where((a > 1) & ~flat, np.exp(np.log(2) + 3 * log_sinh - log_s2 - a - 0.5 * sigma ** 2 * gap * T), 0.0)
+
+    linear = np.where(flat, 3.0 * np.exp(-a - 0.5 * sigma ** 2 * k ** 2 * T), 0.0)
+
+    terms = np.hstack([terms, np.nan_to_num(hyper, nan=0.0, posinf=0.0, neginf=0.0), linear])
+    survive = terms.sum(axis=1)
+    ok = np.abs(terms).max(axis=1) < SERIES_LIMIT
+    out[np.flatnonzero(pos)[ok]] = np.clip(1.0 - survive[ok], 0.0, 1.0)
+    return out[0] if scalar else out
+
+
+@lru_cache(maxsize=256)
+def expected_max_drawdown(winrate, stdev, hands, n_grid=400):
+    """E[max drawdown] in BB over `hands`.
+
+    integral of drawdown_probability up to where the tail is gone. if the series
+    cannot be trusted there (big losing drift), the large-run limit
+    |mu| T + sigma^2 / |mu| is used instead.
+    """
+    mu, sigma, T = float(winrate), float(stdev), hands / 100.0
+    if T <= 0:
+        return 0.0
+    # find where the tail dies on a log grid first (a big winrate keeps drawdowns
+    # far below sigma sqrt(T)), then integrate on an even grid up to there
+    top = 8.0 * sigma * np.sqrt(T) + max(-mu * T, 0.0)
+    probe = np.geomspace(top * 1e-6, top, 120)
+    p = drawdown_probability(probe, mu, sigma, hands)
+    if np.isnan(p).any():
+        return -mu * T + sigma ** 2 / -mu if mu < 0 else float("nan")
+    live = np.flatnonzero(p > 1e-9)
+    end = probe[min(live[-1] + 1, len(probe) - 1)] if len(live) else probe[0]
+    grid = np.linspace(0.0, end, n_grid)
+    p = drawdown_probability(grid, mu, sigma, hands)
+    return float(np.sum((p[1:] + p[:-1]) / 2 * np.diff(grid)))
+
+
+
+# ====== simulation ======
+def stake_for(roll_bb, move_down):
+    """stake fraction per roll: the biggest level with at least `move_down` of its buy-ins."""
+    stake = np.full(np.shape(roll_bb), STAKE_LEVELS[-1])
+    for level in reversed(STAKE_LEVELS[:-1]):
+        stake = np.where(roll_bb >= move_down * BUY_IN * level, level, stake)
+    return stake
+
+
+def simulate_ruin(winrate, stdev, hands, sims, buyins=BUYIN_GRID, seed=None, hands_per_step=100,
+                  stop_loss=None, move_down=None, chunk_cells=bankroll.CHUNK_CELLS):
+    """ruin / stop-loss frequencies for every starting roll in `buyins`.
+
+    stop_loss: quit once this many buy-ins below the start (absorbing, counted apart).
+    move_down: play STAKE_LEVELS lower while the roll is under this many buy-ins of
+               the current stake (results scale with the stake; back up once it recovers).
+    returns dict(buyins, ruin, stopped, drawdown (sims,), seed, hands_per_step).
+    with move-down every roll size is walked step by step in python, so the step
+    is fitted to sims x len(buyins) (bankroll.fit_step raises past MIN_STEPS).
+    """
+    seed = bankroll.new_seed() if seed is None else int(seed)
+    hands_per_step = bankroll.fit_step(hands, sims * (len(buyins) if move_down else 1), hands_per_step)
+    start = np.asarray(buyins, dtype=float) * BUY_IN                # (g,)
+    floor = np.zeros_like(start)
+    if stop_loss:
+        floor = np.maximum(start - stop_loss * BUY_IN, 0.0)
+
+    ruined = np.zeros(len(start))
+    stopped = np.zeros(len(start))
+    drawdown = np.empty(sims)
+    for first, curves in bankroll.iter_chunks(winrate, stdev, hands, sims, seed, hands_per_step,
+                                              chunk_cells // max(1, len(start) if move_down else 1)):
+        drawdown[first:first + len(curves)] = bankroll.max_drawdown(curves)
+        if not move_down:
+            # the first barrier a curve reaches is the one its running minimum crosses
+            low = curves.min(axis=1)[None, :]                        # (1, n)
+            hit = low <= (floor - start)[:, None]                    # (g, n)
+            is_ruin = (floor == 0)[:, None]
+            ruined += (hit & is_ruin).sum(axis=1)
+            stopped += (hit & ~is_ruin).sum(axis=1)
+            continue
+
+        # move-down: the stake depends on the roll, so walk the steps with (g, n) state
+        steps = np.diff(curves, axis=1)                               # (n, steps) at full stake
+        roll = np.broadcast_to(start[:, None], (len(start), len(curves))).copy()
+        alive = np.ones_like(roll, dtype=bool)
+        for t in range(steps.shape[1]):
+            roll += np.where(alive, stake_for(roll, move_down) * steps[None, :, t], 0.0)
+            alive &= roll > floor[:, None]
+        done = ~alive
+        is_ruin = (floor == 0)[:, None]
+        ruined += (done & is_ruin).sum(axis=1)
+        stopped += (done & ~is_ruin).sum(axis=1)
+
+    return {"buyins": np.asarray(buyins), "ruin": ruined / sims, "stopped": stopped / sims,
+            "drawdown": drawdown, "seed": seed, "hands_per_step": hands_per_step}
+
+
+
+# ====== check the closed form against simulation ======
+# discrete steps only see the barrier at step ends, which acts like a barrier
+# about 0.5826 sd(step) further out (broadie-glasserman); the formula gets that
+# shift, twice for drawdowns (the peak is missed between steps too)
+BARRIER_SHIFT = 0.5826
+CHECKS = [
+    # (winrate, stdev, hands, drawdown levels in BB)
+    (2.0, 90.0, 20000, [1000, 2000, 3000]),
+    (5.0, 100.0, 10000, [1500, 2000, 2500]),       # a == 1 at 2000 BB
+    (-1.0, 80.0, 20000, [1000, 2000, 3000]),
+]
+
+
+def check(sims=20000, seed=7, log=print):
+    """formula vs simulated frequencies for CHECKS; returns the number of misses."""
+    bad = 0
+    for winrate, stdev, hands, levels in CHECKS:
+        res = simulate_ruin(winrate, stdev, hands, sims, seed=seed, hands_per_step=10)
+        shift = BARRIER_SHIFT * bankroll.step_params(winrate, stdev, res["hands_per_step"])[1]
+        levels = np.asarray(levels, dtype=float)
+        rows = [("drawdown", levels, drawdown_probability(levels + 2 * shift, winrate, stdev, hands),
+                 (res["drawdown"][:, None] >= levels).mean(axis=0)),
+                ("ruin", res["buyins"] * BUY_IN, ruin_probability(res["buyins"] * BUY_IN + shift, winrate, stdev, hands),
+                 res["ruin"])]
+        for name, x, want, got in rows:
+            tol = 4 * np.sqrt(want * (1 - want) / sims) + 0.003
+            miss = ~(np.abs(got - want) <= tol)
+            bad += int(miss.sum())
+            for xi, w, g in zip(x[miss], want[miss], got[miss]):
+                log(f"[{name}] winrate {winrate} stdev {stdev} hands {hands} at {xi:.0f} BB: "
+                    f"formula {w:.4f}, simulated {g:.4f}")
+        if winrate > 0:
+            # a == 1 (d = stdev^2 / winrate) sits between the trig and sinh modes: no jump there
+            d1 = stdev ** 2 / winrate
+            p = drawdown_probability(np.array([d1 * (1 - 1e-4), d1, d1 * (1 + 1e-4)]), winrate, stdev, hands)
+            if not abs(p[1] - (p[0] + p[2]) / 2) < 1e-4:
+                bad += 1
+                log(f"[a == 1] winrate {winrate} stdev {stdev} hands {hands} at {d1:.0f} BB: {p}")
+        log(f"winrate {winrate} / stdev {stdev} / {hands:,} hands: checked")
+    return bad
+
+
+if __name__ == "__main__":
+    # python -m utils.risk: exits 1 when the formulas and the simulation disagree
+    import sys
+    sys.exit(1 if check() else 0)
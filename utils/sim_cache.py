@@ -0,0 +1,112 @@
+# poker/utils/sim_cache.py
+"""
+disk cache for chapter 7 simulation results, shared by every worker.
+
+a run is fully defined by its parameters (winrate, stdev, hands, sims, seed and
+the step size), because utils/bankroll.py seeds everything from the seed. so a
+result is stored once under a hash of those parameters and any worker (or a
+reload of a shared URL) reads it back instead of simulating again.
+
+- one .npz per result in CACHE_DIR; nested dicts are flattened to "a.b" keys
+- writes go to a temp file + os.replace, so readers never see half a file
+- reads bump the file time; after a write the oldest files are removed until
+  the directory is under MAX_BYTES (least recently used first)
+"""
+import hashlib
+import json
+import os
+import numpy as np
+
+
+CURRENT_DIR = os.path.dirname(__file__)
+CACHE_DIR = os.environ.get("POKER_SIM_CACHE", os.path.join(CURRENT_DIR, "..", "data", "sim_cache"))
+MAX_BYTES = 256 * 1024 ** 2
+
+
+
+def key(kind, params):
+    """stable file name for one result: kind + sha1 of the sorted parameters."""
+    blob = json.dumps(params, sort_keys=True, default=float)
+    return f"{kind}-{hashlib.sha1(blob.encode()).hexdigest()[:20]}"
+
+
+def _path(kind, params):
+    return os.path.join(CACHE_DIR, key(kind, params) + ".npz")
+
+
+def _flatten(d, prefix=""):
+    out = {}
+    for k, v in d.items():
+        name = f"{prefix}{k}"
+        if isinstance(v, dict):
+            out.update(_flatten(v, name + "."))
+        else:
+            out[name] = np.asarray(v)
+    return out
+
+
+def _unflatten(arrays):
+    out = {}
+    for name, arr in arrays.items():
+        *parents, leaf = name.split(".")
+        node = out
+        for p in parents:
+            node = node.setdefault(int(p) if p.isdigit() else p, {})
+        node[int(leaf) if leaf.isdigit() else leaf] = arr.item() if arr.ndim == 0 else arr
+    return out
+
+
+
+# ====== read / write ======
+def load(kind, params):
+    """cached result dict, or None."""
+    path = _path(kind, params)
+    try:
+        with np.load(path, allow_pickle=False) as z:
+            result = _unflatten({k: z[k] for k in z.files})
+        os.utime(path)                          # recently used
+        return result
+    except (FileNotFoundError, OSError, ValueError):
+        return None
+
+
+def save(kind, params, result):
+    os.makedirs(CACHE_DIR, exist_ok=True)
+    path = _path(kind, params)
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, "wb") as fh:
+        np.savez(fh, **_flatten(result))
+    os.replace(tmp, path)
+    _evict()
+
+
+def _evict(max_bytes=MAX_BYTES):
+    """drop least recently used results until the cache fits."""
+    files = []
+    for entry in os.scandir(CACHE_DIR):
+        if entry.name.endswith(".npz"):
+            try:
+                st = entry.stat()
+            except FileNotFoundError:
+                continue                        # another worker got there first
+            files.append((st.st_mtime, st.st_size, entry.path))
+    total = sum(size for _, size, _ in files)
+    for _, size, path in sorted(files):
+        if total <= max_bytes:
+            break
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+        total -= size
+
+
+def cached(kind, params, fn):
+    """result of fn(**params) from the cache, computing and storing it on a miss.
+    returns (result, hit)."""
+    result = load(kind, params)
+    if result is not None:
+        return result, True
+    result = fn(**params)
+    save(kind, params, result)
+    return result, False